@@ -1,7 +1,154 @@
-from .ui.cli import run_cli
+import argparse
 
-def main():
-    run_cli()
+from .ui.options import (add_library_options, library_kwargs, add_render_options, raster_cache, add_reload_options,
+                         add_profile_options, profiling)
+from .io.export import add_export_parser, run_export
+from .web import add_serve_parser, run_serve
+from .audio import add_wav_parser, run_wav, add_listen_parser, run_listen
+from .render.songbook import add_songbook_parser, run_songbook
+from .theory.library import load_library
+
+# Only commands that draw import matplotlib/tkinter (inside their branch below);
+# listing, validation and export planning stay light. tests/test_startup.py guards this.
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cavacohero", description="Study cavaco chord shapes.")
+    add_library_options(parser)
+    add_render_options(parser)
+    add_profile_options(parser)
+    parser.add_argument("--renderer", choices=("mpl", "ansi"), default="mpl",
+                        help="interactive viewer output: a matplotlib window or text in the terminal")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND",
+                                help="omit to start the interactive viewer")
+    add_reload_options(sub.add_parser("tk", help="start the Tk interface"))
+    p = sub.add_parser("list", help="print the chords of a set")
+    p.add_argument("--set", default="all", help="set name or query (default: all)")
+    p.add_argument("--long", action="store_true", help="also show quality, tags and shapes")
+    sub.add_parser("validate", help="parse the library and report problems")
+    p = sub.add_parser("voicings", help="generate playable shapes for a chord")
+    p.add_argument("root", help="root note, e.g. C, F#, Bb")
+    p.add_argument("quality", nargs="?", default="major", help="chord quality (default: major; 'list' to see all)")
+    p.add_argument("--limit", type=int, default=8, help="how many shapes to show (default: 8)")
+    p.add_argument("--span", type=int, default=3, help="max fret span (default: 3)")
+    p = sub.add_parser("identify", help="name the chord of fret tuples")
+    p.add_argument("shapes", nargs="*", metavar="FRETS",
+                   help="frets low to high, e.g. 2,0,1,2 or x,5,5,5 (default: every library shape)")
+    p.add_argument("--all", action="store_true", help="show every reading, not just the best")
+    add_export_parser(sub)
+    add_songbook_parser(sub)
+    add_serve_parser(sub)
+    add_wav_parser(sub)
+    add_listen_parser(sub)
+    return parser
+
+
+def list_chords(lib, selection="all", long=False) -> int:
+    from .theory.select import select_chords
+    names = select_chords(lib.shapes_by_name, lib.meta_by_name, lib.sets, selection)
+    for name in names:
+        if not long:
+            print(name)
+            continue
+        meta = lib.meta_by_name[name]
+        shapes = " ".join("[" + " ".join(map(str, s.frets)) + "]" for s in lib.shapes_by_name[name])
+        print(f"{name:<10} {meta.get('quality') or '-':<10} {','.join(sorted(meta.get('tags', ()))) or '-':<16} {shapes}")
+    return 0 if names else 1
+
+
+def validate(paths) -> int:
+    from .theory.library import LibraryError
+    path = ", ".join(map(str, paths)) if isinstance(paths, (list, tuple)) else paths
+    try:
+        lib = load_library(paths, use_cache=False)
+    except LibraryError as e:
+        for issue in e.issues:
+            where = issue.file or path
+            print(f"{where}:{issue.line}: {issue.message}" if issue.line else f"{where}: {issue.message}")
+        print(f"{path}: {len(e.issues)} problem(s)")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"{path}: {e}")
+        return 1
+    print(f"{path}: OK, {len(lib.shapes_by_name)} chords, {lib.store.n_shapes} shapes, {len(lib.sets)} sets")
+    return 0
+
+
+def show_voicings(root, quality, limit=8, span=3) -> int:
+    from .theory.voicings import FORMULAS, Rules, voicings
+    if quality == "list":
+        for f in FORMULAS.values():
+            print(f"{f.quality:<16} {root}{f.suffix}")
+        return 0
+    try:
+        shapes = voicings(root, quality, rules=Rules(max_span=span), limit=limit)
+    except ValueError as e:
+        print(e)
+        return 1
+    for shape in shapes:
+        print(f"{shape.name:<10} [" + " ".join(map(str, shape.frets)) + "]")
+    return 0 if shapes else 1
+
+
+def identify(lib, shapes, show_all=False) -> int:
+    from .theory.identify import chord_identifier
+    ident = chord_identifier(lib.tuning, lib)
+    if not shapes:
+        # the whole library in one batch
+        frets = [s.frets for name in lib.shapes_by_name for s in lib.shapes_by_name[name]]
+        labels = [f"{name:<10}" for name in lib.shapes_by_name for _ in lib.shapes_by_name[name]]
+        for label, f, m in zip(labels, frets, ident.identify_many(frets)):
+            print(f"{label} [" + " ".join(map(str, f)) + f"]  {m if m else '?'}")
+        return 0
+    status = 0
+    for text in shapes:
+        tokens = text.replace(",", " ").split()
+        if len(tokens) != len(lib.tuning) or not all(t.lower() == "x" or t.isdigit() for t in tokens):
+            print(f"{text}: expected {len(lib.tuning)} frets (numbers or x)")
+            status = 1
+            continue
+        frets = ["x" if t.lower() == "x" else int(t) for t in tokens]
+        found = ident.identify(frets)
+        readings = [str(m) for m in (found if show_all else found[:1])]
+        print(f"[{' '.join(map(str, frets))}]  {', '.join(readings) or '?'}")
+        status = status or (0 if found else 1)
+    return status
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with profiling(args):
+        return _run(args)
+
+
+def _run(args):
+    load = lambda: load_library(args.library, **library_kwargs(args))
+    if args.command == "list":
+        raise SystemExit(list_chords(load(), args.set, args.long))
+    if args.command == "validate":
+        raise SystemExit(validate(args.library))
+    if args.command == "voicings":
+        raise SystemExit(show_voicings(args.root, args.quality, args.limit, args.span))
+    if args.command == "identify":
+        raise SystemExit(identify(load(), args.shapes, args.all))
+    if args.command == "export":
+        raise SystemExit(run_export(args, load))
+    if args.command == "serve":
+        raise SystemExit(run_serve(args, load))
+    if args.command == "songbook":
+        raise SystemExit(run_songbook(args, load))
+    if args.command == "wav":
+        raise SystemExit(run_wav(args, load))
+    if args.command == "listen":
+        raise SystemExit(run_listen(args, load))
+    if args.command == "tk":
+        from .ui.tk_app import CavacoHeroTk
+        CavacoHeroTk(library=args.library, raster_cache=raster_cache(args), reload_interval=args.reload,
+                     **library_kwargs(args)).mainloop()
+        return
+    from .ui.cli import run_cli
+    run_cli(library=args.library, raster_cache=raster_cache(args), renderer=args.renderer,
+            **library_kwargs(args))
 
 if __name__ == "__main__":
     main()
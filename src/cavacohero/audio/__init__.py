@@ -0,0 +1,98 @@
+# src/cavacohero/audio/__init__.py
+"""
+'cavacohero wav': hear chord shapes. synth.py turns a shape into plucked
+strings, bank.py keeps rendered sounds under a memory budget, and wav.py
+streams a sequence of chords to a WAV file. 'cavacohero listen' goes the
+other way: recognize.py names the library chords heard in a recording.
+Only NumPy is needed.
+"""
+
+
+def add_wav_parser(sub) -> None:
+    p = sub.add_parser("wav", help="render a chord set or progression to a WAV file")
+    p.add_argument("output", help="WAV file to write")
+    p.add_argument("--set", default="all", help="set name or query (default: all)")
+    p.add_argument("--chords", help="comma-separated chords instead of a set, e.g. 'C, Am, F, G'")
+    p.add_argument("--bpm", type=float, default=90.0, help="tempo (default: 90)")
+    p.add_argument("--beats", type=float, default=4.0, help="beats per chord (default: 4)")
+    p.add_argument("--loops", type=int, default=1, help="times to play the chords (default: 1)")
+    p.add_argument("--random", type=int, default=0, metavar="N",
+                   help="instead: N chords in random autoplay order")
+    p.add_argument("--style", default="strum", help="strum, up, pluck, arpeggio or muted (default: strum)")
+
+
+def run_wav(args, load) -> int:
+    """'cavacohero wav' entry point; 'load' returns the loaded Library."""
+    from ..engine.playback import period_from_bpm
+    from ..theory.search import resolve_names
+    from ..theory.select import select_chords
+    from .synth import style_for
+    from .wav import progression_shapes, session_shapes, write_wav
+
+    lib = load()
+    try:
+        style_for(args.style)
+        period = period_from_bpm(args.bpm, args.beats)
+        if args.chords:
+            names, missing = resolve_names([c.strip() for c in args.chords.split(",") if c.strip()],
+                                           lib.shapes_by_name)
+            for typed, hint in missing:
+                print(f"unknown chord '{typed}'" + (f" (did you mean {', '.join(hint)}?)" if hint else ""))
+        else:
+            names = select_chords(lib.shapes_by_name, lib.meta_by_name, lib.sets, args.set)
+    except ValueError as e:
+        print(e)
+        return 1
+    if not names:
+        print("No chords to play.")
+        return 1
+    if args.random > 0:
+        from ..engine.state import AppState
+        shapes = session_shapes(AppState(names, randomize=True), lib.shapes_by_name, args.random)
+    else:
+        shapes = progression_shapes(names, lib.shapes_by_name, max(1, args.loops))
+    summary = write_wav(args.output, shapes, lib.tuning, period, args.style)
+    print(f"{args.output}: {summary}")
+    return 0
+
+
+def add_listen_parser(sub) -> None:
+    p = sub.add_parser("listen", help="name the library chords played in a WAV recording")
+    p.add_argument("input", help="WAV file to analyse (PCM, any rate and channels)")
+    p.add_argument("--expect", metavar="CHORD", help="also report how much of the playing was this chord")
+    p.add_argument("--min-confidence", type=float, default=0.6,
+                   help="below this similarity a frame counts as unrecognized (default: 0.6)")
+    p.add_argument("--silence", type=float, default=0.001, help="RMS level of silence (default: 0.001)")
+
+
+def run_listen(args, load) -> int:
+    """'cavacohero listen' entry point; 'load' returns the loaded Library."""
+    import time
+    import wave
+    from ..theory.search import chord_search
+    from .recognize import Recognizer, played
+
+    lib = load()
+    expect = None
+    if args.expect:
+        expect = chord_search(lib.shapes_by_name).resolve(args.expect)
+        if expect is None:
+            print(f"unknown chord '{args.expect}'")
+            return 1
+    recognizer = Recognizer(lib.shapes_by_name, lib.tuning, silence=args.silence,
+                            min_confidence=args.min_confidence)
+    start = time.perf_counter()
+    segments = []
+    try:
+        for seg in recognizer.segments(args.input):
+            segments.append(seg)
+            print(seg)
+    except (OSError, EOFError, ValueError, wave.Error) as e:
+        print(f"{args.input}: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    length = segments[-1].end_s if segments else 0.0
+    print(f"{length:.1f} s of audio in {elapsed:.2f} s")
+    if expect is not None:
+        print(f"{expect}: {100 * played(segments, expect):.0f}% of the playing")
+    return 0
@@ -0,0 +1,44 @@
+# src/cavacohero/audio/bank.py
+"""
+Rendered chord sounds, kept in memory under a byte budget.
+
+Synthesis costs tens of milliseconds per chord; a practice session plays
+the same few shapes over and over. SampleBank keys buffers by everything
+that changes the sound (frets, tuning, length, strum style, sample rate),
+so a progression at a given tempo renders each distinct shape once.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from ..lru import ByteLRU
+from .synth import SAMPLE_RATE, Strum, render_shape, style_for
+
+DEFAULT_BUDGET = 32 * 1024 * 1024       # ~190 s of float32 mono at 44.1 kHz
+
+
+def sample_key(frets, tuning, duration_s: float, style: Strum, sample_rate: int) -> tuple:
+    return (tuple(frets), tuple(tuning), round(float(duration_s), 4), style, int(sample_rate))
+
+
+class SampleBank(ByteLRU):
+    """ByteLRU of float32 sample buffers (read-only, shared between callers)."""
+
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET):
+        super().__init__(max_bytes)
+
+    def samples(self, tab_shape, tuning: Sequence[str], duration_s: float, style="strum",
+                sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Cached render_shape() of a TabShape (or a fret tuple)."""
+        frets = getattr(tab_shape, "frets", tab_shape)
+        strum = style_for(style)
+        key = sample_key(frets, tuning, duration_s, strum, sample_rate)
+        buf = self.get(key)
+        if buf is None:
+            buf = render_shape(frets, tuning, duration_s, strum, sample_rate)
+            buf.flags.writeable = False
+            self.put(key, buf)
+        return buf
+
+
+SAMPLE_BANK = SampleBank()
@@ -0,0 +1,211 @@
+# src/cavacohero/audio/recognize.py
+"""
+Which chord is sounding: WAV recordings -> labelled segments.
+
+The file is read a block at a time (so its length does not matter),
+mixed to mono and decimated to ~11 kHz, which keeps everything a cavaco
+plays plus a few harmonics. Each frame's power spectrum is folded onto the
+12 pitch classes with one matrix product (a chroma vector). Templates come
+from the library itself: every shape's sounding pitch classes under the
+tuning (doubled strings count twice, with a little of each note's fifth
+for the third harmonic), deduplicated, so one more product scores every
+frame against every chord. Consecutive frames with the same best chord
+become a Segment, whose confidence is the mean cosine similarity.
+"""
+from __future__ import annotations
+import wave
+from pathlib import Path
+from typing import Iterator, List, Mapping, NamedTuple, Sequence
+
+import numpy as np
+
+from .synth import open_midi
+from ..theory.store import MUTE
+
+TARGET_RATE = 11025          # decimate to at least this rate
+FRAME = 2048                 # samples per analysis frame after decimation (~0.19 s)
+FMIN, FMAX = 80.0, 4000.0
+FIFTH_WEIGHT = 0.3           # share of a note's third harmonic in its template
+
+
+class Segment(NamedTuple):
+    start_s: float
+    end_s: float
+    name: str | None         # None = silence / nothing recognized
+    confidence: float        # mean cosine similarity of chroma and template, 0..1
+
+    def __str__(self) -> str:
+        return f"{self.start_s:7.2f}-{self.end_s:7.2f}s  {self.name or '-':<10} {self.confidence:.2f}"
+
+
+# ---------- reading ----------
+
+def read_blocks(path: Path, block_frames: int = 1 << 16) -> Iterator[tuple]:
+    """(sample rate, mono float32 block) pairs from a PCM WAV file (8/16/24/32-bit, any channels)."""
+    with wave.open(str(path), "rb") as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        while True:
+            raw = w.readframes(block_frames)
+            if not raw:
+                return
+            yield rate, _decode(raw, channels, width)
+
+
+def _decode(raw: bytes, channels: int, width: int) -> np.ndarray:
+    if width == 1:
+        x = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        x = np.frombuffer(raw, "<i2").astype(np.float32) / 32768
+    elif width == 3:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        x = ((b[:, 0] | b[:, 1] << 8 | b[:, 2] << 16) << 8 >> 8).astype(np.float32) / 8388608
+    elif width == 4:
+        x = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"unsupported sample width: {width} bytes")
+    return x.reshape(-1, channels).mean(axis=1) if channels > 1 else x
+
+
+# ---------- features ----------
+
+def chroma_matrix(rate: int, frame: int = FRAME) -> np.ndarray:
+    """(frame // 2 + 1, 12) weights folding rfft power bins onto pitch classes."""
+    freqs = np.fft.rfftfreq(frame, 1.0 / rate)
+    keep = (freqs >= FMIN) & (freqs <= min(FMAX, rate / 2))
+    weights = np.zeros((len(freqs), 12), dtype=np.float32)
+    pc = np.round(12 * np.log2(freqs[keep] / 440.0) + 69).astype(np.int64) % 12
+    weights[np.flatnonzero(keep), pc] = 1.0
+    return weights
+
+
+def chroma(frames: np.ndarray, weights: np.ndarray) -> tuple:
+    """Unit chroma vectors and RMS level of an (n, frame) array of frames."""
+    window = np.hanning(frames.shape[1]).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+    c = np.sqrt(power @ weights)            # amplitude-like, so strong notes don't swamp the rest
+    norm = np.linalg.norm(c, axis=1, keepdims=True)
+    level = np.sqrt((frames ** 2).mean(axis=1))
+    return c / np.maximum(norm, 1e-12), level
+
+
+# ---------- templates ----------
+
+class Templates(NamedTuple):
+    vectors: np.ndarray      # (k, 12) unit vectors
+    chord: np.ndarray        # (k,) index into 'names' of each vector's chord
+    names: List[str]         # chords with at least one template, library order
+
+
+def library_templates(shapes_by_name: Mapping, tuning: Sequence[str]) -> Templates:
+    """
+    One template per distinct pitch-class profile among the library's shapes,
+    credited to the first chord (library order) that has it.
+    """
+    store = getattr(shapes_by_name, "store", None)
+    if store is not None:
+        frets, owner = store.frets.astype(np.int16), store.chord_of_shape()
+        names = store.names
+    else:
+        names = list(shapes_by_name)
+        rows = [(i, s.frets) for i, n in enumerate(names) for s in shapes_by_name[n]]
+        frets = np.array([[MUTE if isinstance(f, str) else f for f in r] for _, r in rows], dtype=np.int16)
+        owner = np.array([i for i, _ in rows], dtype=np.int64)
+    if len(frets) == 0:
+        return Templates(np.zeros((0, 12), dtype=np.float32), np.zeros(0, dtype=np.int64), [])
+    played = frets != MUTE
+    pcs = (open_midi(tuning) + frets) % 12
+    counts = np.zeros((len(frets), 12), dtype=np.float32)
+    rows = np.repeat(np.arange(len(frets)), played.sum(axis=1))
+    np.add.at(counts, (rows, pcs[played]), 1.0)
+    vectors = counts + FIFTH_WEIGHT * np.roll(counts, 7, axis=1)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    _, first = np.unique(np.round(vectors, 4), axis=0, return_index=True)
+    first.sort()                            # library order decides between equal-sounding chords
+    used, chord = np.unique(owner[first], return_inverse=True)
+    return Templates(vectors[first], chord, [names[int(i)] for i in used])
+
+
+# ---------- recognition ----------
+
+class Recognizer:
+    def __init__(self, shapes_by_name: Mapping, tuning: Sequence[str], silence: float = 0.001,
+                 min_confidence: float = 0.6, smooth: int = 2):
+        self.templates = library_templates(shapes_by_name, tuning)
+        self.silence = silence              # RMS below which a frame is silence
+        self.min_confidence = min_confidence
+        self.smooth = smooth                # frames a label must hold before a segment changes
+
+    def label_frames(self, frames: np.ndarray) -> tuple:
+        """(chord index into templates.names or -1, score) per frame."""
+        c, level = chroma(frames, self._weights)
+        scores = c @ self.templates.vectors.T
+        best = scores.argmax(axis=1)
+        score = scores[np.arange(len(best)), best]
+        chord = self.templates.chord[best]
+        return np.where((level < self.silence) | (score < self.min_confidence), -1, chord), score
+
+    def frames(self, path: Path, block_frames: int = 1 << 16) -> Iterator[tuple]:
+        """(time of frame start, chord index or -1, score) per frame, block by block."""
+        carry = np.zeros(0, dtype=np.float32)
+        t0 = 0
+        for rate, block in read_blocks(path, block_frames):
+            factor = max(1, rate // TARGET_RATE)
+            if not hasattr(self, "_rate") or self._rate != rate:
+                self._rate, self._factor = rate, factor
+                self._weights = chroma_matrix(rate / factor)
+            x = np.concatenate([carry, block])
+            usable = len(x) - len(x) % (factor * FRAME)
+            carry = x[usable:]
+            if not usable:
+                continue
+            frames = x[:usable].reshape(-1, FRAME, factor).mean(axis=2)     # decimate (box filter)
+            best, score = self.label_frames(frames)
+            step = FRAME * factor / rate
+            for k, (b, s) in enumerate(zip(best.tolist(), score.tolist())):
+                yield (t0 + k) * step, b, s
+            t0 += len(frames)
+
+    def segments(self, path: Path, block_frames: int = 1 << 16) -> Iterator[Segment]:
+        """
+        Segments of one label each, yielded as soon as they end (the file is
+        never held in memory). A new label must hold for 'smooth' frames;
+        shorter blips count towards the segment they interrupt. Recordings
+        start in silence, so a chord must hold from the first frame on too.
+        """
+        current = -1                        # label of the open segment (-1 = silence)
+        start, scores = 0.0, []
+        pending, pending_label = [], None   # frames of a label that may take over
+        end = 0.0
+        for t, label, score in self.frames(path, block_frames):
+            end = t + FRAME * self._factor / self._rate
+            if label == current:
+                scores += [s for _, s in pending] + [score]
+                pending, pending_label = [], None
+            elif label == pending_label:
+                pending.append((t, score))
+                if len(pending) >= self.smooth:
+                    if pending[0][0] > start:
+                        yield self._segment(start, pending[0][0], current, scores)
+                    current, start, scores = label, pending[0][0], [s for _, s in pending]
+                    pending, pending_label = [], None
+            else:
+                scores += [s for _, s in pending]
+                pending, pending_label = [(t, score)], label
+        if end > start:
+            yield self._segment(start, end, current, scores + [s for _, s in pending])
+
+    def _segment(self, start, end, label, scores) -> Segment:
+        if label < 0:
+            return Segment(start, end, None, 0.0)
+        return Segment(start, end, self.templates.names[label], float(np.mean(scores)) if scores else 0.0)
+
+    def recognize(self, path: Path) -> List[Segment]:
+        return list(self.segments(path))
+
+
+def played(segments: Sequence[Segment], name: str) -> float:
+    """Share of the sounding time (non-silent segments) in which 'name' was recognized."""
+    sounding = sum(s.end_s - s.start_s for s in segments if s.name is not None)
+    hit = sum(s.end_s - s.start_s for s in segments if s.name == name)
+    return hit / sounding if sounding else 0.0
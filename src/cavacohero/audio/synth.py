@@ -0,0 +1,142 @@
+# src/cavacohero/audio/synth.py
+"""
+Plucked-string synthesis of chord shapes (Karplus-Strong).
+
+A shape sounds one note per unmuted string: the open string's pitch (from
+the tuning, octaves ascending from the lowest string unless given, 'D4')
+plus the fret. Each string is a delay line of one period filled with a
+noise burst and fed back through a two-point average, which damps the high
+harmonics first, like a real string; the loop gain is set per string so
+high and low notes ring for the same time. All strings of a chord are run
+together: the signal is produced a block at a time, each block no longer
+than the shortest period, so every sample of a block only depends on
+samples already computed and one fancy-index per block serves every string.
+A strum delays each string a little after the previous one.
+"""
+from __future__ import annotations
+import re
+import zlib
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from ..theory.notes import pitch_class
+from ..theory.store import MUTE
+
+SAMPLE_RATE = 44100
+_OCTAVE = re.compile(r"(-?\d+)$")
+
+
+class Strum(NamedTuple):
+    spacing_s: float = 0.025     # delay between consecutive strings
+    upward: bool = False         # high string first
+    brightness: float = 1.0      # 0..1: how much of the noise burst's top end survives
+    sustain_s: float = 2.0       # time for a string to fade by 60 dB (the same for every pitch)
+    level: float = 0.3           # amplitude of one string
+
+
+STYLES = {
+    "strum": Strum(),
+    "up": Strum(upward=True),
+    "pluck": Strum(spacing_s=0.0, brightness=0.6),
+    "arpeggio": Strum(spacing_s=0.12, brightness=0.7, sustain_s=3.0),
+    "muted": Strum(spacing_s=0.012, brightness=0.4, sustain_s=0.25),
+}
+
+
+def style_for(style: str | Strum) -> Strum:
+    if isinstance(style, Strum):
+        return style
+    found = STYLES.get(style)
+    if found is None:
+        raise ValueError(f"unknown strum style '{style}' (known: {', '.join(STYLES)})")
+    return found
+
+
+def open_midi(tuning: Sequence[str], lowest_octave: int = 4) -> np.ndarray:
+    """
+    MIDI numbers of the open strings. Notes with an octave ('D4') are taken
+    as written; the others go up from the previous string (the first from
+    'lowest_octave'): the cavaco's D G B D is D4 G4 B4 D5.
+    """
+    out, prev = [], None
+    for note in tuning:
+        pc = pitch_class(note)
+        m = _OCTAVE.search(note.strip())
+        if m:
+            midi = 12 * (int(m.group(1)) + 1) + pc
+        elif prev is None:
+            midi = 12 * (lowest_octave + 1) + pc
+        else:
+            midi = prev + (pc - prev) % 12
+        out.append(midi)
+        prev = midi
+    return np.array(out, dtype=np.int16)
+
+
+def shape_pitches(frets: Sequence, tuning: Sequence[str]) -> np.ndarray:
+    """MIDI number per string, -1 for muted strings."""
+    row = np.array([MUTE if isinstance(f, str) else f for f in frets], dtype=np.int16)
+    return np.where(row == MUTE, -1, open_midi(tuning) + row)
+
+
+def midi_hz(midi) -> np.ndarray:
+    return 440.0 * 2.0 ** ((np.asarray(midi, dtype=np.float64) - 69) / 12)
+
+
+def pluck(freqs: Sequence[float], starts: Sequence[int], n: int, strum: Strum = STYLES["strum"],
+          sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """
+    n samples of the strings 'freqs' (Hz), string k entering at sample
+    starts[k], mixed to mono float32.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    if len(freqs) == 0 or n <= 0:
+        return np.zeros(max(n, 0), dtype=np.float32)
+    # loop delay = period + fraction (linear interpolation) + 0.5 (the two-point average)
+    total = np.maximum(2.5, sample_rate / freqs) - 0.5
+    period = np.floor(total).astype(np.int64)
+    frac = (total - period)[:, None]
+    lead = int(period.max()) + 2                  # room for the initial delay lines
+    strings = len(freqs)
+    y = np.zeros((strings, lead + n), dtype=np.float64)
+
+    rng = np.random.default_rng(seed)
+    for k, p in enumerate(period.tolist()):
+        burst = rng.uniform(-1.0, 1.0, p)
+        if strum.brightness < 1.0:               # one-pole lowpass: darker, rounder attack
+            a = 1.0 - strum.brightness
+            for i in range(1, p):
+                burst[i] = (1 - a) * burst[i] + a * burst[i - 1]
+        burst -= burst.mean()
+        y[k, lead - p:lead] = burst
+
+    rows = np.arange(strings)[:, None]
+    # loss per period so every string fades 60 dB in sustain_s (the averaging adds its own, on the highs)
+    gain = (0.5 * 10.0 ** (-3.0 / (max(strum.sustain_s, 1e-3) * freqs)))[:, None]
+    block = int(period.min())
+    for start in range(lead, lead + n, block):
+        idx = np.arange(start, min(start + block, lead + n))[None, :] - period[:, None]
+        now, before, older = y[rows, idx], y[rows, idx - 1], y[rows, idx - 2]
+        y[rows, idx + period[:, None]] = gain * ((1 - frac) * (now + before) + frac * (before + older))
+
+    out = np.zeros(n, dtype=np.float64)
+    for k in range(strings):
+        s = int(starts[k])
+        if s < n:
+            out[s:] += y[k, lead:lead + n - s]
+    return (strum.level * out).astype(np.float32)
+
+
+def render_shape(frets: Sequence, tuning: Sequence[str], duration_s: float, style: str | Strum = "strum",
+                 sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """A strummed chord shape as mono float32 samples, 'duration_s' long (ring-out included)."""
+    strum = style_for(style)
+    midi = shape_pitches(frets, tuning)
+    order = np.flatnonzero(midi >= 0)
+    if strum.upward:
+        order = order[::-1]
+    starts = (np.arange(len(order)) * strum.spacing_s * sample_rate).astype(np.int64)
+    # same shape, same sound: the noise is seeded from the shape
+    seed = zlib.crc32(repr((tuple(frets), tuple(tuning), strum)).encode())
+    return pluck(midi_hz(midi[order]), starts, int(round(duration_s * sample_rate)), strum, sample_rate, seed)
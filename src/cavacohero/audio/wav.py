@@ -0,0 +1,93 @@
+# src/cavacohero/audio/wav.py
+"""
+Chord sequences to WAV, one chord at a time.
+
+Each chord starts one period after the previous and rings on for 'ring_s'
+after that, overlapping the next. write_wav() keeps only the part of the
+signal still ringing past the current chord's onset: it mixes the new
+chord into that tail, writes the finished period as 16-bit PCM and moves
+on, so an hour-long session needs no more memory than one chord.
+"""
+from __future__ import annotations
+import wave
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, NamedTuple, Sequence
+
+import numpy as np
+
+from .bank import SAMPLE_BANK, SampleBank
+from .synth import SAMPLE_RATE, render_shape
+
+
+class WavSummary(NamedTuple):
+    chords: int
+    seconds: float
+    clipped: int            # samples that had to be clipped to 16 bits
+
+    def __str__(self) -> str:
+        text = f"{self.chords} chords, {self.seconds:.1f} s"
+        return text + (f", {self.clipped} samples clipped" if self.clipped else "")
+
+
+def _pcm16(samples: np.ndarray) -> tuple[bytes, int]:
+    scaled = samples * 32767.0
+    clipped = int(np.count_nonzero(np.abs(scaled) > 32767))
+    return np.clip(scaled, -32768, 32767).astype("<i2").tobytes(), clipped
+
+
+def write_wav(path: Path, shapes: Iterable, tuning: Sequence[str], period_s: float, style="strum",
+              ring_s: float = 1.5, bank: SampleBank | None = SAMPLE_BANK,
+              sample_rate: int = SAMPLE_RATE) -> WavSummary:
+    """
+    Play 'shapes' (TabShapes or fret tuples, any iterable, consumed lazily)
+    every 'period_s' seconds into a mono 16-bit WAV file.
+    """
+    if period_s <= 0:
+        raise ValueError("period must be positive")
+    step = int(round(period_s * sample_rate))
+    length = period_s + max(0.0, ring_s)
+    tail = np.zeros(0, dtype=np.float32)
+    chords = clipped = frames = 0
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        for shape in shapes:
+            if bank is not None:
+                buf = bank.samples(shape, tuning, length, style, sample_rate)
+            else:
+                buf = render_shape(getattr(shape, "frets", shape), tuning, length, style, sample_rate)
+            mixed = np.zeros(max(len(buf), len(tail), step), dtype=np.float32)
+            mixed[:len(buf)] += buf
+            mixed[:len(tail)] += tail
+            data, n_clipped = _pcm16(mixed[:step])
+            out.writeframes(data)
+            tail = mixed[step:]
+            chords += 1
+            clipped += n_clipped
+            frames += step
+        if len(tail):
+            data, n_clipped = _pcm16(tail)
+            out.writeframes(data)
+            clipped += n_clipped
+            frames += len(tail)
+    return WavSummary(chords, frames / sample_rate, clipped)
+
+
+def progression_shapes(names: Sequence[str], shapes_by_name: Mapping, loops: int = 1) -> Iterator:
+    """The shapes of a progression played 'loops' times, in the voice-led variant of each chord."""
+    from ..theory.progression import voiced_shapes
+    voiced = voiced_shapes(names, shapes_by_name)
+    for _ in range(loops):
+        for name in names:
+            yield voiced[name]
+
+
+def session_shapes(state, shapes_by_name: Mapping, count: int) -> Iterator:
+    """'count' chords in autoplay order (an AppState, so random order works too), first variants."""
+    for _ in range(count):
+        name = state.current_chord()
+        if name is None:
+            return
+        yield shapes_by_name[name][0]
+        state.next_chord()
@@ -0,0 +1,75 @@
+# src/cavacohero/engine/playback.py
+"""
+Autoplay shared by the CLI and the Tk app: AppState decides the order,
+Scheduler the (absolute, drift-free) timing, and an optional prefetch
+callback renders the upcoming chord on a background thread while the
+current one is on screen.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .scheduler import Scheduler
+from .state import AppState
+
+
+def period_from_bpm(bpm: float, beats_per_chord: float = 4) -> float:
+    """Seconds per chord at 'bpm' with 'beats_per_chord' beats on each chord."""
+    if bpm <= 0 or beats_per_chord <= 0:
+        raise ValueError("bpm and beats per chord must be positive")
+    return 60.0 / bpm * beats_per_chord
+
+
+class Playback:
+    def __init__(self, state: AppState, prefetch=None, clock=time.monotonic):
+        self.state = state
+        self.scheduler = Scheduler(state, clock=clock)
+        self._prefetch = prefetch
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") if prefetch else None
+
+    @property
+    def jitter(self):
+        return self.scheduler.jitter
+
+    def _prefetch_next(self):
+        upcoming = self.state.peek_next()
+        if self._pool is not None and upcoming is not None:
+            self._pool.submit(self._prefetch, upcoming)
+
+    def start(self, now=None):
+        """Start the clock; returns the chord to show right away."""
+        self.scheduler.start(now)
+        self._prefetch_next()
+        return self.state.current_chord()
+
+    def wait_time(self, now=None):
+        return max(0.0, self.scheduler.time_until_next(now))
+
+    def poll(self, now=None):
+        """The next chord name if its deadline has passed, else None."""
+        if not self.scheduler.tick_if_due(now):
+            return None
+        self.state.next_chord()
+        self._prefetch_next()
+        return self.state.current_chord()
+
+    def run(self, show, wait=time.sleep, max_wait=0.05):
+        """
+        Blocking loop: show(name) at every deadline until show() returns False
+        or KeyboardInterrupt. 'wait' sleeps (e.g. plt.pause to keep a GUI alive),
+        never longer than max_wait at a time.
+        """
+        if show(self.start()) is False:
+            return
+        while True:
+            w = self.wait_time()
+            if w > 0:
+                wait(min(w, max_wait))
+                continue
+            name = self.poll()
+            if name is not None and show(name) is False:
+                return
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,13 +1,70 @@
 import time
+from collections import deque
+
+
+class JitterStats:
+    """Lateness (seconds past the deadline) of the most recent ticks."""
+
+    def __init__(self, keep=10_000):
+        self.samples = deque(maxlen=keep)
+        self.missed = 0       # whole periods skipped because we fell behind
+
+    def add(self, late_s):
+        self.samples.append(late_s)
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "missed": self.missed}
+        xs = sorted(self.samples)
+        pick = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] * 1000
+        return {
+            "count": len(xs),
+            "mean_ms": sum(xs) / len(xs) * 1000,
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+            "max_ms": xs[-1] * 1000,
+            "missed": self.missed,
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (f"{s['count']} ticks, late by mean {s['mean_ms']:.1f} ms, p50 {s['p50_ms']:.1f} ms, "
+                f"p95 {s['p95_ms']:.1f} ms, max {s['max_ms']:.1f} ms, {s['missed']} missed")
+
 
 class Scheduler:
-    def __init__(self, state):
+    """
+    Fixed-rate ticks on absolute monotonic deadlines: the k-th tick is due at
+    start + k*period, however long the work between ticks took, so lateness
+    never accumulates. If we fall more than a period behind, the missed
+    deadlines are skipped (and counted) instead of firing in a burst.
+    The period is re-read from state.tempo_s at every tick.
+    """
+
+    def __init__(self, state, clock=time.monotonic):
         self.state = state
-        self._next = time.monotonic()
-
-    def tick_if_due(self):
-        now = time.monotonic()
-        if now >= self._next:
-            self._next = now + self.state.tempo_s
-            return True
-        return False
+        self.clock = clock
+        self.jitter = JitterStats()
+        self._next = clock()
+
+    def start(self, now=None):
+        now = self.clock() if now is None else now
+        self._next = now + self.state.tempo_s
+
+    def time_until_next(self, now=None):
+        now = self.clock() if now is None else now
+        return self._next - now
+
+    def tick_if_due(self, now=None):
+        now = self.clock() if now is None else now
+        if now < self._next:
+            return False
+        period = self.state.tempo_s
+        late = now - self._next
+        self.jitter.add(late)
+        if late >= period:
+            skipped = int(late // period)
+            self.jitter.missed += skipped
+            self._next += skipped * period
+        self._next += period
+        return True
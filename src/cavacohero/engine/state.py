@@ -1,21 +1,352 @@
+import heapq
+import math
 import random
-from ..theory.chords import ALL_CHORDS
+from collections import deque
+
+import numpy as np
+
 
 class AppState:
-    def __init__(self, tempo_s=3.0, timer_enabled=False):
+    """
+    Position in a list of chord names. With randomize=True the order is
+    reshuffled every time it wraps, so the next chord is always known in
+    advance (peek_next) and no chord repeats within a cycle. 'start' is the
+    chord to begin on; a random order only keeps it first when it is given.
+    """
+
+    def __init__(self, names=(), tempo_s=3.0, timer_enabled=False, randomize=False, start=None, rng=None):
+        self.names = list(names)
         self.tempo_s = tempo_s
         self.timer_enabled = timer_enabled
+        self.randomize = randomize
+        self._rng = rng or random.Random()
         self._i = 0
-        self._order = list(range(len(ALL_CHORDS)))
+        self._order = list(range(len(self.names)))
+        self._upcoming = None     # next cycle's order, drawn early when someone peeks at the wrap
+        if randomize:
+            self._shuffle(first=start)
+        elif self.names and start is not None:
+            self._i = start % len(self.names)
+
+    def _shuffle(self, first=None):
+        self._rng.shuffle(self._order)
+        if first is not None and first in self._order:
+            # keep the chord on screen as the start of the new order
+            j = self._order.index(first)
+            self._order[0], self._order[j] = self._order[j], self._order[0]
+
+    def _next_cycle(self):
+        if self._upcoming is None:
+            order = self._order[:]
+            self._rng.shuffle(order)
+            if len(order) > 1 and order[0] == self._order[-1]:
+                order[0], order[-1] = order[-1], order[0]   # no immediate repeat across cycles
+            self._upcoming = order
+        return self._upcoming
+
+    @property
+    def index(self):
+        """Index into 'names' of the current chord."""
+        return self._order[self._i]
 
     def current_chord(self):
-        return ALL_CHORDS[self._order[self._i]]
+        return self.names[self._order[self._i]] if self.names else None
+
+    def peek_next(self):
+        if not self.names:
+            return None
+        if self._i + 1 < len(self._order) or not self.randomize:
+            return self.names[self._order[(self._i + 1) % len(self._order)]]
+        return self.names[self._next_cycle()[0]]
 
     def next_chord(self):
         self._i = (self._i + 1) % len(self._order)
+        if self._i == 0 and self.randomize:
+            self._order = self._next_cycle()
+            self._upcoming = None
 
     def prev_chord(self):
         self._i = (self._i - 1) % len(self._order)
 
     def random_chord(self):
-        self._i = random.randrange(len(self._order))
+        self._i = self._rng.randrange(len(self._order))
+
+
+# ---------- spaced repetition ----------
+
+SEEN, AGAIN, HARD, GOOD, EASY = 0, 1, 2, 3, 4      # SEEN: shown (autoplay) without a judgement
+GRADES = {"again": AGAIN, "hard": HARD, "good": GOOD, "easy": EASY}
+
+FIRST_INTERVAL = 5        # steps before a new card comes back
+RELEARN = 3               # steps before a missed card comes back
+MIN_EASE = 1.3
+_FIELDS = ("due", "interval", "ease", "reps", "lapses", "shown")
+
+
+def variants_per_chord(names, shapes_by_name):
+    """Shapes of each chord in 'names', from the store's counts when there is one (no shapes are built)."""
+    store = getattr(shapes_by_name, "store", None)
+    if store is not None:
+        counts = store.variant_counts()
+        return [int(counts[store.chord_id(n)]) for n in names]
+    return [len(shapes_by_name[n]) for n in names]
+
+
+class PracticeEngine:
+    """
+    Drop-in for AppState (Playback drives it the same way) that schedules
+    cards, one per chord/variant, by how well they were played. Time is
+    counted in steps (cards shown). Each card keeps an interval and an ease:
+    good answers multiply the interval by the ease, misses bring the card
+    back within a few steps and lower its ease.
+
+    Cards already seen wait in a heap keyed by (due step, card); new
+    cards wait in library (or shuffled) order and are only introduced when
+    nothing is due, so each step costs O(log n) whatever the library size.
+    A card graded again while an older heap entry for it is still queued
+    (after prev_chord/random_chord) gets a new version; stale entries are
+    dropped when they reach the top.
+
+    With a PracticeLog, every grade is appended to it and the state is
+    snapshotted every so often; a new engine resumes from snapshot + log.
+    Records of cards outside 'names' are carried along untouched.
+    """
+
+    def __init__(self, names=(), variants=None, tempo_s=3.0, timer_enabled=False, randomize=False,
+                 log=None, rng=None):
+        self.names = list(names)
+        self.tempo_s = tempo_s
+        self.timer_enabled = timer_enabled
+        self.randomize = randomize
+        self.log = log
+        self._rng = rng or random.Random()
+        counts = np.ones(len(self.names), dtype=np.int64) if variants is None \
+            else np.asarray(variants, dtype=np.int64)
+        self.n_cards = int(counts.sum())
+        self.card_chord = np.repeat(np.arange(len(self.names), dtype=np.int32), counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        self.card_variant = (np.arange(self.n_cards) - starts).astype(np.int32)
+
+        self.step = 0
+        self._foreign = []                          # keys of logged cards not in 'names'
+        self._ids = None                            # (name, variant) -> card, built on first use
+        self._alloc(self.n_cards)
+        if log is not None:
+            self._restore(*log.load())
+
+        self._version = np.zeros(len(self.due), dtype=np.int32)
+        seen = np.flatnonzero(self.shown[:self.n_cards] > 0)
+        order = seen[np.lexsort((seen, self.due[seen]))]
+        # a sorted list already is a heap
+        self._heap = [(int(self.due[i]), int(i), 0) for i in order.tolist()]
+        new = np.flatnonzero(self.shown[:self.n_cards] == 0)
+        if randomize:
+            new = np.random.default_rng(self._rng.randrange(2 ** 32)).permutation(new)
+        self._new = new.tolist()
+        self._new_pos = 0
+        self._back = []                             # cards put back by prev/random, shown before new ones
+        self._history = deque(maxlen=100)
+        self._card = self._pick() if self.n_cards else None
+
+    # ---------- card state ----------
+    def _alloc(self, n):
+        self.due = np.zeros(n, dtype=np.int64)
+        self.interval = np.zeros(n, dtype=np.float32)
+        self.ease = np.full(n, 2.5, dtype=np.float32)
+        self.reps = np.zeros(n, dtype=np.int32)
+        self.lapses = np.zeros(n, dtype=np.int32)
+        self.shown = np.zeros(n, dtype=np.int32)
+
+    def key(self, card):
+        if card >= self.n_cards:
+            return self._foreign[card - self.n_cards]
+        return self.names[self.card_chord[card]], int(self.card_variant[card])
+
+    def _lookup(self):
+        if self._ids is None:
+            chords = [self.names[c] for c in self.card_chord.tolist()]
+            self._ids = dict(zip(zip(chords, self.card_variant.tolist()), range(self.n_cards)))
+        return self._ids
+
+    def _grow(self, keys):
+        """Add cards for logged keys that are not in 'names'; returns their ids."""
+        first = self.n_cards + len(self._foreign)
+        self._foreign.extend(keys)
+        for f in _FIELDS:
+            a = getattr(self, f)
+            setattr(self, f, np.concatenate([a, np.full(len(keys), 2.5 if f == "ease" else 0, dtype=a.dtype)]))
+        ids = range(first, first + len(keys))
+        self._lookup().update(zip(keys, ids))
+        return np.array(ids, dtype=np.int64)
+
+    def _restore(self, arrays, records):
+        if arrays is not None:
+            n = self.n_cards
+            if len(arrays["variants"]) >= n and np.array_equal(arrays["variants"][:n], self.card_variant) \
+                    and np.array_equal(arrays["names"][:n], np.array(self.names, dtype=str)[self.card_chord]):
+                ids = np.arange(len(arrays["variants"]))    # same cards, same order: the usual case
+                extra = [(str(k), int(v)) for k, v in zip(arrays["names"][n:], arrays["variants"][n:])]
+                if extra:
+                    self._grow(extra)
+            else:
+                keys = list(zip(arrays["names"].tolist(), arrays["variants"].tolist()))
+                lookup = self._lookup()
+                ids = np.array([lookup.get(k, -1) for k in keys], dtype=np.int64)
+                unknown = np.flatnonzero(ids < 0)
+                ids[unknown] = self._grow([keys[i] for i in unknown.tolist()])
+            for f in _FIELDS:
+                getattr(self, f)[ids] = arrays[f]
+            self.step = int(arrays["step"])
+        for rec in records:
+            key = (rec.name, rec.variant)
+            card = self._lookup().get(key)
+            if card is None:
+                card = int(self._grow([key])[0])
+            self._apply(card, rec.grade, rec.step)
+            self.step = max(self.step, rec.step + 1)
+
+    def _arrays(self):
+        names = np.array(self.names + [n for n, _ in self._foreign], dtype=str)
+        chords = np.concatenate([self.card_chord, len(self.names) + np.arange(len(self._foreign))])
+        out = {f: getattr(self, f) for f in _FIELDS}
+        out["names"] = names[chords.astype(np.int64)] if len(chords) else names
+        out["variants"] = np.concatenate([self.card_variant, np.array([v for _, v in self._foreign], dtype=np.int32)])
+        out["step"] = np.array(self.step, dtype=np.int64)
+        return out
+
+    def _schedule(self, card, grade, step):
+        """New (due, interval, ease, reps, lapses) of 'card' graded 'grade' at 'step'."""
+        interval, ease = float(self.interval[card]), float(self.ease[card])
+        reps, lapses = int(self.reps[card]), int(self.lapses[card])
+        if grade == AGAIN:
+            return step + RELEARN, float(RELEARN), max(MIN_EASE, ease - 0.2), 0, lapses + 1
+        if grade == SEEN:
+            interval = interval or FIRST_INTERVAL
+        elif grade == HARD:
+            reps, ease = reps + 1, max(MIN_EASE, ease - 0.15)
+            interval = max(FIRST_INTERVAL, interval * 1.2)
+        else:
+            reps += 1
+            if grade == EASY:
+                ease += 0.15
+            interval = FIRST_INTERVAL if reps == 1 else interval * ease
+            if grade == EASY:
+                interval *= 1.3
+        return step + math.ceil(interval), interval, ease, reps, lapses
+
+    def _apply(self, card, grade, step):
+        due, interval, ease, reps, lapses = self._schedule(card, grade, step)
+        self.due[card], self.interval[card], self.ease[card] = due, interval, ease
+        self.reps[card], self.lapses[card] = reps, lapses
+        self.shown[card] += 1
+
+    # ---------- queue ----------
+    def _push(self, card):
+        self._version[card] += 1
+        heapq.heappush(self._heap, (int(self.due[card]), card, int(self._version[card])))
+
+    def _top(self):
+        heap = self._heap
+        while heap and heap[0][2] != self._version[heap[0][1]]:
+            heapq.heappop(heap)                     # lazy deletion
+        return heap[0] if heap else None
+
+    def _next_new(self, take):
+        if self._back:
+            return self._back.pop() if take else self._back[-1]
+        while self._new_pos < len(self._new) and self.shown[self._new[self._new_pos]]:
+            self._new_pos += 1                      # seen meanwhile (random_chord)
+        if self._new_pos < len(self._new):
+            card = self._new[self._new_pos]
+            self._new_pos += take
+            return card
+        return None
+
+    def _pick(self):
+        top = self._top()
+        if top is not None and top[0] <= self.step:
+            return heapq.heappop(self._heap)[1]
+        card = self._next_new(take=True)
+        if card is None and top is not None:
+            card = heapq.heappop(self._heap)[1]
+        return card
+
+    def _put_back(self):
+        """Return the card on screen to where it came from (it was not graded)."""
+        card = self._card
+        if card is None:
+            return
+        if self.shown[card]:
+            self._push(card)
+        else:
+            self._back.append(card)
+
+    # ---------- AppState interface ----------
+    @property
+    def index(self):
+        """Index into 'names' of the current chord."""
+        return int(self.card_chord[self._card]) if self._card is not None else 0
+
+    def current_chord(self):
+        return self.names[self.card_chord[self._card]] if self._card is not None else None
+
+    def current_variant(self):
+        return int(self.card_variant[self._card]) if self._card is not None else None
+
+    def peek_next(self, grade=SEEN):
+        """The chord that next_chord(grade) will show."""
+        if self._card is None:
+            return None
+        after = self.step + 1
+        cur = (self._schedule(self._card, grade, self.step)[0], self._card)
+        top = self._top()
+        best = cur if top is None or cur < top[:2] else top
+        if best[0] > after:
+            card = self._next_new(take=False)
+            if card is not None:
+                return self.names[self.card_chord[card]]
+        return self.names[self.card_chord[best[1]]]
+
+    def next_chord(self, grade=SEEN):
+        """Grade the card on screen (SEEN when autoplay moves on by itself) and show the next one."""
+        card = self._card
+        if card is None:
+            return
+        self._apply(card, grade, self.step)
+        if self.log is not None:
+            name, variant = self.key(card)
+            self.log.append(self.step, grade, name, variant)
+        self._push(card)
+        self._history.append(card)
+        self.step += 1
+        self._card = self._pick()
+        if self.log is not None and self.log.due:
+            self.log.write_snapshot(self._arrays())
+
+    def grade(self, grade):
+        """next_chord() with a grade name ('again', 'hard', 'good', 'easy') or number."""
+        self.next_chord(GRADES[grade] if isinstance(grade, str) else grade)
+
+    def prev_chord(self):
+        if self._history:
+            self._put_back()
+            self._card = self._history.pop()
+
+    def random_chord(self):
+        if self.n_cards:
+            self._put_back()
+            self._card = self._rng.randrange(self.n_cards)
+
+    # ---------- reporting ----------
+    def stats(self):
+        n = self.n_cards
+        shown = self.shown[:n] > 0
+        return {"cards": n, "seen": int(shown.sum()), "due": int((shown & (self.due[:n] <= self.step)).sum()),
+                "lapses": int(self.lapses[:n].sum()), "step": self.step}
+
+    def close(self):
+        """Snapshot (if anything was logged since the last one) and close the log."""
+        if self.log is not None:
+            if self.log.pending:
+                self.log.write_snapshot(self._arrays())
+            self.log.close()
@@ -0,0 +1,104 @@
+# src/cavacohero/io/cache.py
+"""
+On-disk snapshots of parsed chord libraries.
+
+A snapshot file holds two pickles: a small header (schema version, python
+version, source mtime/size and sha256) followed by the payload. The header is
+checked first so stale snapshots are rejected without unpickling the payload.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+_PY = sys.version_info[:2]
+
+
+def cache_dir() -> Path:
+    """$CAVACOHERO_CACHE_DIR, else $XDG_CACHE_HOME/cavacohero, else ~/.cache/cavacohero."""
+    env = os.environ.get("CAVACOHERO_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "cavacohero"
+
+
+def cache_path(source: Path) -> Path:
+    key = hashlib.sha1(str(Path(source).resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir() / f"library-{key}.bin"
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def read_snapshot(source: Path, schema: int, check=None) -> Any | None:
+    """
+    Return the cached payload for 'source', or None when there is no usable
+    snapshot. Same mtime+size is trusted; otherwise the content hash decides
+    (so a touched-but-unchanged file still hits). check(extra), when given,
+    vets whatever else the snapshot depends on (see write_snapshot).
+    """
+    path = cache_path(source)
+    try:
+        st = Path(source).stat()
+        with path.open("rb") as fh:
+            header = pickle.load(fh)
+            if header.get("schema") != schema or header.get("python") != _PY:
+                return None
+            if (header.get("mtime_ns"), header.get("size")) != (st.st_mtime_ns, st.st_size):
+                if header.get("sha256") != content_hash(Path(source).read_bytes()):
+                    return None
+            if check is not None and not check(header.get("extra")):
+                return None
+            return pickle.load(fh)
+    except (OSError, EOFError, AttributeError, ValueError, pickle.UnpicklingError):
+        return None
+
+
+def write_snapshot(source: Path, schema: int, payload: Any, raw: bytes, extra: Any = None) -> bool:
+    """
+    Store 'payload' for 'source' ('raw' = the bytes it was parsed from;
+    'extra' = other dependencies, e.g. included files, handed to read's check).
+    Written to a temp file and renamed, so readers never see a partial file.
+    Returns False (silently) if the cache directory is not writable.
+    """
+    path = cache_path(source)
+    try:
+        st = Path(source).stat()
+        header = {
+            "schema": schema,
+            "python": _PY,
+            "source": str(Path(source).resolve()),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": content_hash(raw),
+            "extra": extra,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".lib-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(header, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return True
+    except OSError:
+        return False
+
+
+def clear_snapshot(source: Path) -> None:
+    try:
+        cache_path(source).unlink()
+    except OSError:
+        pass
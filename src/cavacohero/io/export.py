@@ -0,0 +1,249 @@
+# src/cavacohero/io/export.py
+"""
+Batch export of chord diagrams to PNG/SVG/PDF.
+
+plan_export() turns a library (or a selection of it) into a list of jobs, one
+per chord/variant/mode/format. run_jobs() renders them headless across a
+process pool in chunks, skipping outputs whose content hash (shape + render
+parameters) matches the manifest left by the previous run.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+MANIFEST = ".export-manifest.json"
+FORMATS = ("png", "svg", "pdf")
+MODES = ("zoom", "full")
+
+# bump when diagrams change appearance, so every output is re-rendered
+RENDER_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    name: str
+    variant: int
+    frets: tuple
+    mode: str
+    fmt: str
+    relpath: str
+    digest: str
+
+
+@dataclass
+class ExportSummary:
+    total: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    failed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        text = (f"{self.total} diagrams: {self.rendered} rendered, {self.skipped} unchanged, "
+                f"{len(self.failed)} failed in {self.seconds:.1f}s ({self.rate:.0f}/s)")
+        return text + "".join(f"\n  {msg}" for msg in self.failed)
+
+
+def safe_filename(name: str) -> str:
+    """Chord name -> file name ('F/A' -> 'F_A'); '#' and '+' are kept."""
+    return re.sub(r"[^\w#+-]", "_", name)
+
+
+def _stems(names: Sequence[str]) -> dict:
+    """
+    File stem of each name. Names that would share one (F/A and F_A, or C and
+    c on a case-insensitive disk) get a short hash of the name appended; a
+    name that is already a safe file name keeps it.
+    """
+    groups: dict = {}
+    for name in dict.fromkeys(names):
+        groups.setdefault(safe_filename(name).lower(), []).append(name)
+    stems = {}
+    for group in groups.values():
+        keeper = next((n for n in group if safe_filename(n) == n), group[0])
+        for name in group:
+            stem = safe_filename(name)
+            if name != keeper:
+                stem += "_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:6]
+            stems[name] = stem
+    return stems
+
+
+def job_digest(name, frets, mode, fmt, tuning, dpi) -> str:
+    blob = repr((RENDER_VERSION, name, tuple(frets), mode, fmt, tuple(tuning), dpi)).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def plan_export(
+    shapes_by_name,
+    names: Iterable[str],
+    tuning: Sequence[str],
+    modes: Sequence[str] = MODES,
+    formats: Sequence[str] = ("png",),
+    all_variants: bool = True,
+    dpi: int | None = None,
+) -> List[ExportJob]:
+    """One job per (chord, variant, mode, format); outputs go to <mode>/<name>[_vN].<fmt>."""
+    names = list(names)
+    stems = _stems(names)
+    jobs = []
+    for name in names:
+        shapes = shapes_by_name[name]
+        for variant, shape in enumerate(shapes if all_variants else shapes[:1]):
+            stem = stems[name] + (f"_v{variant + 1}" if variant else "")
+            for mode in modes:
+                for fmt in formats:
+                    jobs.append(ExportJob(
+                        name=name, variant=variant, frets=tuple(shape.frets), mode=mode, fmt=fmt,
+                        relpath=f"{mode}/{stem}.{fmt}",
+                        digest=job_digest(name, shape.frets, mode, fmt, tuning, dpi),
+                    ))
+    return jobs
+
+
+def read_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((Path(out_dir) / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(out_dir: Path, manifest: dict) -> None:
+    path = Path(out_dir) / MANIFEST
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=0, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def pending_jobs(jobs: List[ExportJob], out_dir: Path, force: bool = False, manifest=None) -> List[ExportJob]:
+    """Jobs whose output is missing or was rendered from different inputs."""
+    out_dir = Path(out_dir)
+    if force:
+        return list(jobs)
+    manifest = read_manifest(out_dir) if manifest is None else manifest
+    return [j for j in jobs if manifest.get(j.relpath) != j.digest or not (out_dir / j.relpath).exists()]
+
+
+# ---------- rendering (runs inside worker processes) ----------
+
+def _render_chunk(out_dir: str, tuning: tuple, dpi, jobs: List[ExportJob]) -> list:
+    """Render a chunk of jobs; returns [(relpath, digest, error-or-None)]."""
+    from ..theory.tabs import TabShape
+    from ..render.raster import render_bytes
+
+    results = []
+    for job in jobs:
+        try:
+            data = render_bytes(TabShape(name=job.name, frets=job.frets), job.mode, job.fmt, tuning, dpi=dpi)
+            path = Path(out_dir) / job.relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            results.append((job.relpath, job.digest, None))
+        except Exception as e:          # report and keep going; one bad chord shouldn't stop the batch
+            results.append((job.relpath, job.digest, f"{job.relpath}: {e}"))
+    return results
+
+
+def run_jobs(
+    jobs: List[ExportJob],
+    out_dir: Path,
+    tuning: Sequence[str],
+    dpi: int | None = None,
+    workers: int | None = None,
+    chunk_size: int = 32,
+    force: bool = False,
+    progress=print,
+) -> ExportSummary:
+    """
+    Render 'jobs' under 'out_dir'. Jobs whose output exists with the same
+    digest in the manifest are skipped unless force=True. workers=1 renders
+    in-process; otherwise a process pool gets chunks of 'chunk_size' jobs.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(out_dir)
+    summary = ExportSummary(total=len(jobs))
+
+    todo = pending_jobs(jobs, out_dir, force, manifest)
+    summary.skipped = len(jobs) - len(todo)
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    t0 = time.perf_counter()
+
+    def collect(results):
+        for relpath, digest, error in results:
+            if error:
+                summary.failed.append(error)
+                manifest.pop(relpath, None)
+            else:
+                manifest[relpath] = digest
+                summary.rendered += 1
+        if progress:
+            done = summary.rendered + len(summary.failed)
+            elapsed = time.perf_counter() - t0
+            progress(f"[{done}/{len(todo)}] {done / elapsed if elapsed else 0:.0f} diagrams/s")
+
+    try:
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                collect(_render_chunk(str(out_dir), tuple(tuning), dpi, chunk))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed   # not needed for --plan
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                futures = [pool.submit(_render_chunk, str(out_dir), tuple(tuning), dpi, c) for c in chunks]
+                for fut in as_completed(futures):
+                    collect(fut.result())
+    finally:
+        summary.seconds = time.perf_counter() - t0
+        write_manifest(out_dir, manifest)
+    return summary
+
+
+def run_export(args, load) -> int:
+    """'cavacohero export' entry point; 'load' returns the loaded Library."""
+    from ..theory.select import select_chords
+
+    lib = load()
+    names = select_chords(lib.shapes_by_name, lib.meta_by_name, lib.sets, args.set)
+    if not names:
+        print(f"No chords matched '{args.set}'.")
+        return 1
+    modes = MODES if args.mode == "both" else (args.mode,)
+    jobs = plan_export(lib.shapes_by_name, names, lib.tuning, modes=modes, formats=args.format,
+                       all_variants=not args.first_only, dpi=args.dpi)
+    if args.plan:
+        todo = pending_jobs(jobs, args.out, args.force)
+        for job in todo:
+            print(job.relpath)
+        print(f"{len(jobs)} diagrams: {len(todo)} to render, {len(jobs) - len(todo)} unchanged")
+        return 0
+    summary = run_jobs(jobs, args.out, lib.tuning, dpi=args.dpi, workers=args.workers,
+                       chunk_size=args.chunk, force=args.force,
+                       progress=None if args.quiet else print)
+    print(summary)
+    return 1 if summary.failed else 0
+
+
+def add_export_parser(sub) -> None:
+    p = sub.add_parser("export", help="render chord diagrams to image files")
+    p.add_argument("out", type=Path, help="output directory")
+    p.add_argument("--set", default="all", help="set name or query to export (default: all)")
+    p.add_argument("--mode", choices=("zoom", "full", "both"), default="both")
+    p.add_argument("--format", nargs="+", choices=FORMATS, default=["png"])
+    p.add_argument("--first-only", action="store_true", help="only the first shape of each chord")
+    p.add_argument("--dpi", type=int, default=None, help="override the per-mode default dpi")
+    p.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    p.add_argument("--chunk", type=int, default=32, help="jobs per work unit (default: 32)")
+    p.add_argument("--force", action="store_true", help="re-render even if unchanged")
+    p.add_argument("--quiet", action="store_true", help="only print the final summary")
+    p.add_argument("--plan", action="store_true", help="list what would be rendered, render nothing")
@@ -0,0 +1,207 @@
+# src/cavacohero/io/includes.py
+"""
+Chord libraries split over several YAML files.
+
+A file may pull in others with a top-level include list, relative to itself:
+
+    include:
+      - common.yaml            # a file
+      - genres/*.yaml          # a glob (sorted; '**' recurses)
+      - teachers/              # a directory: its *.yaml / *.yml files
+
+read_tree() reads the roots and everything they include, one breadth level
+at a time on a thread pool (each file once, cycles are fine). merge() then
+overlays them: included files first, in order, then the including file, so
+the includer's chords and sets override its includes, and later roots
+override earlier ones. Sets may name chords from any file. The merged
+document is parsed as one, so the files must agree on tuning, on how shapes
+spell string numbers (string_digits) and on max_fret.
+"""
+from __future__ import annotations
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import yaml
+
+from .cache import content_hash
+from ..instrument.cavaco import CAVACO
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_GLOB_CHARS = set("*?[")
+
+
+class Source(NamedTuple):
+    path: Path
+    raw: bytes
+    data: dict
+    includes: Tuple[Path, ...]                     # resolved, in include order
+    patterns: Tuple[Tuple[str, Tuple[str, ...]], ...]   # (glob or directory, what it matched) for cache checks
+
+
+def _glob(pattern: str) -> List[Path]:
+    return sorted(Path(p).resolve() for p in glob.glob(pattern, recursive=True)
+                  if Path(p).suffix in (".yaml", ".yml") and Path(p).is_file())
+
+
+def _expand(base: Path, entry) -> Tuple[List[Path], str | None]:
+    """Files an include entry names, and the pattern to re-check later (None for a plain file)."""
+    if not isinstance(entry, str) or not entry.strip():
+        raise ValueError(f"{base}: include entries must be paths, got {entry!r}")
+    target = base.parent / entry
+    if target.is_dir():
+        pattern = str(target / "*.y*ml")
+        return _glob(pattern), pattern
+    if _GLOB_CHARS & set(entry):
+        return _glob(str(target)), str(target)
+    if not target.is_file():
+        raise ValueError(f"{base}: included file '{entry}' not found")
+    return [target], None
+
+
+def read_source(path: Path) -> Source:
+    path = Path(path)
+    raw = path.read_bytes()
+    try:
+        data = yaml.load(raw, Loader=_YamlLoader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"{path}: {e}") from None
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: a library must be a mapping")
+    entries = data.get("include") or []
+    if isinstance(entries, str):
+        entries = [entries]
+    includes, patterns = [], []
+    for entry in entries:
+        files, pattern = _expand(path, entry)
+        includes += [f.resolve() for f in files]
+        if pattern is not None:
+            patterns.append((pattern, tuple(str(f) for f in files)))
+    return Source(path.resolve(), raw, data, tuple(includes), tuple(patterns))
+
+
+def read_tree(roots: Sequence[Path], workers: int | None = None) -> List[Source]:
+    """Every file reachable from 'roots', in merge order (includes before their includer)."""
+    roots = [Path(r).resolve() for r in roots]
+    loaded: Dict[Path, Source] = {}
+    frontier = list(dict.fromkeys(roots))
+    pool = None
+    try:
+        while frontier:
+            if len(frontier) == 1:
+                found = [read_source(frontier[0])]
+            else:
+                pool = pool or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library")
+                found = list(pool.map(read_source, frontier))
+            for src in found:
+                loaded[src.path] = src
+            frontier = list(dict.fromkeys(p for src in found for p in src.includes if p not in loaded))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    order: List[Source] = []
+    seen: set = set()
+
+    def visit(path: Path):
+        if path in seen:
+            return
+        seen.add(path)
+        src = loaded[path]
+        for p in src.includes:
+            visit(p)
+        order.append(src)
+
+    for root in roots:
+        visit(root)
+    return order
+
+
+def merge(sources: Sequence[Source]) -> Tuple[dict, Dict[str, Source]]:
+    """One library document from many, and the file each chord finally came from."""
+    tuning, tuning_from = None, None
+    chords: dict = {}
+    sets: dict = {}
+    origin: Dict[str, Source] = {}
+    encodings: List[Tuple[Path, int | None]] = []     # (file, its string_digits) for files with chords
+    max_fret, max_fret_from = None, None
+    for src in sources:
+        data = src.data
+        if "tuning" in data:
+            t = tuple(data["tuning"])
+            if tuning is not None and t != tuning:
+                raise ValueError(f"{src.path.name}: tuning {list(t)} differs from {list(tuning)} "
+                                 f"in {tuning_from.name}")
+            tuning, tuning_from = t, src.path
+        if "max_fret" in data:
+            if max_fret is not None and data["max_fret"] != max_fret:
+                raise ValueError(f"{src.path.name}: max_fret {data['max_fret']} differs from {max_fret} "
+                                 f"in {max_fret_from.name}")
+            max_fret, max_fret_from = data["max_fret"], src.path
+        file_chords = data.get("chords") or {}
+        if not isinstance(file_chords, dict):
+            raise ValueError(f"{src.path.name}: 'chords' must be a mapping")
+        if file_chords:
+            encodings.append((src.path, data.get("string_digits")))
+        default = data.get("movable")          # a file's default applies to its own chords
+        for name, spec in file_chords.items():
+            if default is not None and isinstance(spec, dict) and "movable" not in spec:
+                spec = {**spec, "movable": default}
+            chords[name] = spec
+            origin[name] = src
+        file_sets = data.get("sets") or {}
+        if not isinstance(file_sets, dict):
+            raise ValueError(f"{src.path.name}: 'sets' must be a mapping if present")
+        sets.update(file_sets)
+
+    # shapes are parsed once for the merged document, so every file must spell string numbers alike
+    default_digits = len(str(len(tuning or CAVACO.tuning)))
+    digits, digits_from = None, None
+    for path, explicit in encodings:
+        d = explicit or default_digits
+        if digits is not None and d != digits:
+            raise ValueError(f"{path.name}: string_digits {d} differs from {digits} in {digits_from.name}")
+        digits, digits_from = d, path
+
+    merged = {"chords": chords, "sets": sets}
+    if tuning is not None:
+        merged["tuning"] = list(tuning)
+    if digits is not None and digits != default_digits:
+        merged["string_digits"] = digits
+    if max_fret is not None:
+        merged["max_fret"] = max_fret
+    return merged, origin
+
+
+# ---------- snapshot validation for composed libraries ----------
+
+def signature(sources: Sequence[Source]) -> dict:
+    """What a snapshot of these files depends on (stored in its header)."""
+    files = []
+    for src in sources:
+        st = os.stat(src.path)
+        files.append((str(src.path), st.st_mtime_ns, st.st_size, content_hash(src.raw)))
+    patterns = sorted({p for src in sources for p in src.patterns})
+    return {"files": files, "patterns": patterns}
+
+
+def unchanged(sig: dict | None) -> bool:
+    """True while every file in 'sig' is as it was and every glob still matches the same files."""
+    if not sig:
+        return True
+    for path, mtime_ns, size, digest in sig["files"]:
+        try:
+            st = os.stat(path)
+            if (st.st_mtime_ns, st.st_size) != (mtime_ns, size) and \
+                    content_hash(Path(path).read_bytes()) != digest:
+                return False
+        except OSError:
+            return False
+    for pattern, matched in sig["patterns"]:
+        if tuple(str(f) for f in _glob(pattern)) != tuple(matched):
+            return False
+    return True
@@ -0,0 +1,110 @@
+# src/cavacohero/io/watch.py
+"""
+Polling file watcher for hot-reloading the chord library.
+
+No threads and no OS notification services: the owner calls poll() from its
+own loop (Tk uses after()). A poll is one stat() per library file and per
+included directory (every level below a '**' glob); files are only read
+when a mtime/size/inode changed, and only re-parsed when their bytes did.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Dict, Sequence
+
+import yaml
+
+from .cache import content_hash
+from .includes import read_tree
+from ..theory.library import Library, LibraryDiff, reload_library
+
+
+class FileWatcher:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None                  # missing for now (e.g. an editor mid-save)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def changed(self) -> bool:
+        """True once per modification (an editor's rename-on-save counts too)."""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return signature is not None
+
+
+class LibraryWatcher:
+    """
+    Keeps 'lib' in step with its YAML file(s), includes and included
+    directories too. poll() returns None while nothing was edited, else the
+    LibraryDiff of the reload ('lib' is replaced as a whole). A file that
+    fails to parse raises ValueError and leaves 'lib' as it was; the next
+    save is tried again.
+    """
+
+    def __init__(self, path: Path | Sequence[Path], lib: Library, use_cache: bool = True):
+        self.roots = [Path(path)] if isinstance(path, (str, Path)) else [Path(p) for p in path]
+        self.lib = lib
+        self.use_cache = use_cache
+        self._files: Dict[Path, FileWatcher] = {}
+        self._digest = None
+        try:
+            sources = read_tree(self.roots)
+        except (OSError, ValueError):
+            self._watch_paths(self.roots)     # broken right now; the next good save reloads
+        else:
+            self._watch(sources)
+            self._digest = _digest(sources)
+
+    def _watch_paths(self, paths) -> None:
+        self._files = {p: self._files.get(p) or FileWatcher(p) for p in paths}
+
+    def _watch(self, sources) -> None:
+        paths = [src.path for src in sources]
+        # a file added to an included directory/glob shows up as a change of its directory
+        paths += [d for src in sources for pattern, _ in src.patterns for d in _glob_dirs(pattern)]
+        self._watch_paths(dict.fromkeys(paths))
+
+    def poll(self) -> LibraryDiff | None:
+        if not [w for w in self._files.values() if w.changed()]:      # stat them all, no short cut
+            return None
+        try:
+            sources = read_tree(self.roots)
+            self._watch(sources)
+            digest = _digest(sources)
+            if digest == self._digest:
+                return None              # touched, not edited
+            lib, diff = reload_library(self.roots, self.lib, self.use_cache, sources=sources)
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(f"{self.roots[0].name}: {e}") from None
+        self.lib, self._digest = lib, digest
+        return diff
+
+
+def _digest(sources) -> str:
+    return content_hash(b"\0".join(str(src.path).encode() + b"\0" + src.raw for src in sources))
+
+
+def _glob_root(pattern: str) -> Path:
+    """The deepest directory of a glob pattern without wildcards."""
+    parts = []
+    for part in Path(pattern).parent.parts:
+        if set("*?[") & set(part):
+            break
+        parts.append(part)
+    return Path(*parts)
+
+
+def _glob_dirs(pattern: str) -> list:
+    """Directories whose mtime moves when 'pattern' may match a new file ('**' reaches every level below)."""
+    root = _glob_root(pattern)
+    if "**" not in pattern:
+        return [root]
+    return [root] + [Path(d) / name for d, names, _ in os.walk(root) for name in sorted(names)]
@@ -0,0 +1,81 @@
+# src/cavacohero/lru.py
+"""Byte-budgeted LRU cache shared by the raster and audio caches."""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+def nbytes(value) -> int:
+    """Size of a cached value: ndarray.nbytes, else len() (bytes-like)."""
+    n = getattr(value, "nbytes", None)
+    return int(n) if n is not None else len(value)
+
+
+class ByteLRU:
+    """
+    Least-recently-used mapping bounded by the total size of its values.
+    Thread-safe; counts hits, misses and evictions so it can be sized.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = nbytes):
+        self.max_bytes = int(max_bytes)
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def put(self, key: Hashable, value) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return                       # would evict everything and still not fit
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, freed) = self._data.popitem(last=False)
+                self.bytes -= freed
+                self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            while self.bytes > self.max_bytes and self._data:
+                _, (_, freed) = self._data.popitem(last=False)
+                self.bytes -= freed
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,8 +1,67 @@
-from .fretboard import draw_shape as draw_zoom
-from .fretboard_full import draw_shape_full as draw_full
+# Renderer modules import matplotlib, so they are loaded on first use:
+# `import cavacohero.render` alone stays cheap.
+from importlib import import_module
 
-def draw(tab_shape, mode="zoom", **kwargs):
-    """Draw a chord shape in zoom or full-neck mode."""
+
+def __getattr__(name):
+    if name == "draw_zoom":
+        from .fretboard import draw_shape
+        return draw_shape
+    if name == "draw_full":
+        from .fretboard_full import draw_shape_full
+        return draw_shape_full
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------- backends ----------
+# name -> render(tab_shape, mode="zoom", **kwargs), or "module:function" to be
+# imported the first time the backend is asked for.
+
+_BACKENDS = {
+    "mpl": f"{__name__}:_draw_mpl",
+    "ansi": ".ansi:render_text",
+    "svg": ".svg:render_svg",
+}
+
+
+def register_backend(name: str, render) -> None:
+    """Add (or replace) a backend: a callable or a lazy "module:function" path."""
+    _BACKENDS[name] = render
+
+
+def backends() -> list:
+    return sorted(_BACKENDS)
+
+
+def get_backend(name: str):
+    target = _BACKENDS.get(name)
+    if target is None:
+        raise ValueError(f"unknown renderer '{name}' (choose from {', '.join(backends())})")
+    if isinstance(target, str):
+        module, _, func = target.partition(":")
+        target = _BACKENDS[name] = getattr(import_module(module, __name__), func)
+    return target
+
+
+def _draw_mpl(tab_shape, mode="zoom", **kwargs):
     if mode == "full":
-        return draw_full(tab_shape, **kwargs)
-    return draw_zoom(tab_shape, **kwargs)
+        from .fretboard_full import draw_shape_full
+        return draw_shape_full(tab_shape, **kwargs)
+    from .fretboard import draw_shape
+    return draw_shape(tab_shape, **kwargs)
+
+
+def draw(tab_shape, mode="zoom", cache=None, backend="mpl", **kwargs):
+    """
+    Draw a chord shape in zoom or full-neck mode with the given backend
+    ("mpl" returns (fig, ax), "ansi" a string for the terminal, "svg" an
+    SVG document string).
+
+    With cache=True (the shared RASTER_CACHE) or a RasterCache instance, take
+    the cached fast path instead: returns the diagram as an (H, W, 4) RGBA
+    array, rendered off-screen only on a miss. kwargs: tuning, figsize, dpi.
+    """
+    if cache is not None and cache is not False:
+        from .raster import RASTER_CACHE
+        return (RASTER_CACHE if cache is True else cache).rgba(tab_shape, mode, **kwargs)
+    return get_backend(backend)(tab_shape, mode, **kwargs)
@@ -0,0 +1,188 @@
+# src/cavacohero/render/ansi.py
+"""
+Text fretboard for terminals: the same vertical diagram as fretboard.py /
+fretboard_full.py, drawn with Unicode box characters and ANSI colors. No
+matplotlib.
+
+board_cells() builds a frame as rows of (char, style) cells; render_text()
+turns it into a string. AnsiScreen keeps the last frame it showed and only
+rewrites the cells that changed, so autoplay in the terminal costs a few
+hundred bytes per chord.
+"""
+import os
+import sys
+from typing import List, Tuple
+
+from ..instrument.cavaco import CAVACO
+from .common import window_for
+
+DEFAULT_TUNING = CAVACO.tuning
+
+RESET = "\x1b[0m"
+STYLES = {
+    "": "",
+    "title": "\x1b[1m",
+    "label": "\x1b[2m",
+    "nut": "\x1b[1m",
+    "dot": "\x1b[1;31m",
+    "mute": "\x1b[33m",
+}
+
+Cell = Tuple[str, str]          # (character, style name)
+BLANK: Cell = (" ", "")
+
+_LABEL = 3                      # columns for the fret numbers
+_GAP = 4                        # columns between strings
+
+# fret line characters: (left end, line, string crossing, right end)
+_NUT = ("╒", "═", "╤", "╕")
+_TOP = ("┌", "─", "┬", "┐")
+_MID = ("├", "─", "┼", "┤")
+_BOTTOM = ("└", "─", "┴", "┘")
+
+
+def _string_col(s: int) -> int:
+    return _LABEL + 2 + _GAP * s
+
+
+def board_cells(tab_shape, mode: str = "zoom", tuning=DEFAULT_TUNING,
+                max_fret: int | None = None) -> List[Tuple[Cell, ...]]:
+    """One frame: title, tuning, mutes, then alternating fret lines and note rows."""
+    strings = len(tuning)
+    frets = tab_shape.frets if tab_shape is not None else ()
+    title = tab_shape.name if tab_shape is not None else "No chords in selection"
+    y0, y1 = window_for(frets, mode, max_fret)
+    width = max(_string_col(strings - 1) + 3, len(title))
+    rows: List[List[Cell]] = []
+
+    def row() -> List[Cell]:
+        rows.append([BLANK] * width)
+        return rows[-1]
+
+    def put(cells, col, text, style=""):
+        for i, ch in enumerate(text):
+            cells[col + i] = (ch, style)
+
+    put(row(), (width - len(title)) // 2, title, "title")
+    tune = row()
+    mutes = row()
+    for s, note in enumerate(tuning):
+        put(tune, _string_col(s) - len(note) // 2, note)
+        fret = frets[s] if s < len(frets) else None
+        if isinstance(fret, str) and fret.lower() == "x":
+            put(mutes, _string_col(s), "X", "mute")
+
+    left, right = _string_col(0) - 2, _string_col(strings - 1) + 2
+    for f in range(y0, y1 + 1):
+        line = row()
+        put(line, 0, f"{f:>{_LABEL - 1}}", "label")
+        kind = _NUT if f == 0 else _TOP if f == y0 else _BOTTOM if f == y1 else _MID
+        style = "nut" if f == 0 else ""
+        put(line, left, kind[0] + kind[1] * (right - left - 1) + kind[3], style)
+        for s in range(strings):
+            put(line, _string_col(s), kind[2], style)
+        if f == y1:
+            break
+        notes = row()
+        for s in range(strings):
+            fret = frets[s] if s < len(frets) else None
+            if isinstance(fret, int) and fret == f + 1:
+                put(notes, _string_col(s), "●", "dot")
+            else:
+                put(notes, _string_col(s), "│")
+    return [tuple(r) for r in rows]
+
+
+def use_color(out) -> bool:
+    """Colors only on a real terminal, and never with NO_COLOR set."""
+    return (hasattr(out, "isatty") and out.isatty() and "NO_COLOR" not in os.environ
+            and os.environ.get("TERM") != "dumb")
+
+
+def _styled(cells, color: bool, current: str = "") -> Tuple[str, str]:
+    """Text for a run of cells; returns (text, style left active)."""
+    out = []
+    for ch, style in cells:
+        if color and style != current:
+            out.append(RESET + STYLES[style] if current else STYLES[style])
+            current = style
+        out.append(ch)
+    return "".join(out), current
+
+
+def render_text(tab_shape, mode: str = "zoom", tuning=DEFAULT_TUNING, max_fret: int | None = None,
+                color: bool = False) -> str:
+    """The diagram as a string (ANSI-colored if color=True)."""
+    lines = []
+    for cells in board_cells(tab_shape, mode, tuning, max_fret):
+        text, style = _styled(cells, color)
+        lines.append(text.rstrip() + (RESET if style else ""))
+    return "\n".join(lines)
+
+
+class AnsiScreen:
+    """
+    Shows frames at a fixed place on the terminal (rows top.., column 1).
+    The first frame (or one of a different width) clears the screen; after
+    that only changed cells are written, in runs joined across small gaps,
+    and rows left over from a taller frame are erased.
+    """
+
+    def __init__(self, out=None, color: bool | None = None, top: int = 1):
+        self.out = out or sys.stdout
+        self.color = use_color(self.out) if color is None else color
+        self.top = top
+        self._frame = None
+        self.bytes_written = 0
+
+    def invalidate(self):
+        """Redraw everything next time (e.g. something else wrote to the screen)."""
+        self._frame = None
+
+    def diff(self, frame) -> str:
+        """Escape sequence turning the last frame into 'frame'."""
+        prev = self._frame
+        parts = []
+        width = len(frame[0]) if frame else 0
+        if prev is None or (prev and len(prev[0]) != width):
+            prev = None
+            if self.top == 1:
+                parts.append("\x1b[H\x1b[2J")
+        for r, cells in enumerate(frame):
+            if prev is None or r >= len(prev):
+                runs = [(0, len(cells))]
+            elif cells == prev[r]:
+                continue
+            else:
+                runs = _changed_runs(prev[r], cells)
+            for lo, hi in runs:
+                text, style = _styled(cells[lo:hi], self.color)
+                parts.append(f"\x1b[{self.top + r};{lo + 1}H{text}{RESET if style else ''}")
+        if prev is not None and len(prev) > len(frame):
+            parts.append(f"\x1b[{self.top + len(frame)};1H\x1b[J")   # a taller board was here
+        if parts:
+            parts.append(f"\x1b[{self.top + len(frame)};1H")   # park the cursor under the board
+        return "".join(parts)
+
+    def show(self, frame) -> int:
+        """Write the update for 'frame'; returns the number of characters sent."""
+        text = self.diff(frame)
+        self._frame = frame
+        if text:
+            self.out.write(text)
+            self.out.flush()
+            self.bytes_written += len(text)
+        return len(text)
+
+
+def _changed_runs(old, new, join_gap: int = 4) -> List[Tuple[int, int]]:
+    """[lo, hi) column ranges that differ; runs closer than join_gap are merged (one cursor move)."""
+    runs: List[List[int]] = []
+    for c, (a, b) in enumerate(zip(old, new)):
+        if a == b:
+            continue
+        if runs and c - runs[-1][1] < join_gap:
+            runs[-1][1] = c + 1
+        else:
+            runs.append([c, c + 1])
+    return [(lo, hi) for lo, hi in runs]
@@ -1,6 +1,9 @@
 # src/cavacohero/render/common.py
 from typing import Iterable, Tuple
-import matplotlib.pyplot as plt
+from ..instrument.cavaco import CAVACO
+
+# matplotlib is imported inside the drawing helpers: auto_window is also used
+# by the text and SVG renderers, which must work without it.
 
 def auto_window(frets: Iterable, pad: int = 1, min_span: int = 4) -> Tuple[int, int]:
     """Pick [start,end] frets for a tight zoom. Ignores zeros when possible."""
@@ -15,9 +18,16 @@ def auto_window(frets: Iterable, pad: int = 1, min_span: int = 4) -> Tuple[int,
     end = max(start + min_span, mx + pad)
     return start, end
 
+def window_for(frets: Iterable, mode: str = "zoom", max_fret: int | None = None) -> Tuple[int, int]:
+    """Fret window a diagram shows: auto_window for zoom, the whole neck for full."""
+    if mode == "full":
+        return 0, max_fret or CAVACO.max_fret
+    return auto_window(frets)
+
 def setup_axes_vertical(strings: int, y0: float, y1: float, ax=None, figsize=(4, 12)):
     """Create/clear a vertical fretboard axes: strings = x (0..strings-1), frets = y (0..N)."""
     if ax is None:
+        import matplotlib.pyplot as plt   # only standalone figures need pyplot (and a GUI backend)
         fig, ax = plt.subplots(figsize=figsize, dpi=120)
     else:
         fig = ax.figure
@@ -29,15 +39,15 @@ def setup_axes_vertical(strings: int, y0: float, y1: float, ax=None, figsize=(4,
     return fig, ax
 
 def draw_grid_vertical(ax, strings: int, y0: int, y1: int):
-    """Black strings + frets; thick nut at 0 if in range."""
+    """Black strings + frets; thick nut at 0 if in range. One collection each."""
+    from matplotlib.collections import LineCollection
     # strings (vertical)
-    for s in range(strings):
-        ax.plot([s, s], [y0, y1], color="black", linewidth=2)
+    ax.add_collection(LineCollection([[(s, y0), (s, y1)] for s in range(strings)],
+                                     colors="black", linewidths=2))
     # frets (horizontal)
-    start, end = int(y0), int(y1)
-    for f in range(start, end + 1):
-        lw = 3 if f == 0 else 1
-        ax.plot([-0.5, strings - 0.5], [f, f], color="black", linewidth=lw)
+    frets = range(int(y0), int(y1) + 1)
+    ax.add_collection(LineCollection([[(-0.5, f), (strings - 0.5, f)] for f in frets],
+                                     colors="black", linewidths=[3 if f == 0 else 1 for f in frets]))
 
 def label_vertical(ax, tuning, y0: float, y1: float):
     # tuning above nut
@@ -48,10 +58,14 @@ def label_vertical(ax, tuning, y0: float, y1: float):
         ax.text(-0.65, f, str(f), va="center", ha="right", fontsize=8)
 
 def plot_notes_vertical(ax, frets, strings: int, y0: float, y1: float, color="red", show_mutes=True):
-    """Red dots between frets. No 'O' markers. Optional 'X' for mutes."""
+    """Red dots between frets (one scatter). No 'O' markers. Optional 'X' for mutes."""
+    xs, ys = [], []
     for s_idx, fret in enumerate(frets):
         if isinstance(fret, int):
             if 1 <= fret <= y1:
-                ax.scatter(s_idx, fret - 0.5, s=140, zorder=3, color=color)
+                xs.append(s_idx)
+                ys.append(fret - 0.5)
         elif show_mutes and isinstance(fret, str) and fret.lower() == "x":
             ax.text(s_idx, y0 - 0.25, "X", ha="center", va="bottom", fontsize=10)
+    if xs:
+        ax.scatter(xs, ys, s=140, zorder=3, color=color)
@@ -2,10 +2,12 @@
 from typing import Tuple
 from ..theory.tabs import TabShape
 from ..instrument.cavaco import CAVACO
+from .. import timing
 from .common import auto_window, setup_axes_vertical, draw_grid_vertical, label_vertical, plot_notes_vertical
 
 DEFAULT_TUNING = CAVACO.tuning
 
+@timing.timed("draw_shape")
 def draw_shape(tab_shape: TabShape, tuning: Tuple[str, ...] = DEFAULT_TUNING, ax=None):
     strings = len(tuning)
     y0, y1 = auto_window(tab_shape.frets)  # choose a tight window
@@ -14,5 +16,6 @@ def draw_shape(tab_shape: TabShape, tuning: Tuple[str, ...] = DEFAULT_TUNING, ax
     label_vertical(ax, tuning, y0, y1)
     plot_notes_vertical(ax, tab_shape.frets, strings, y0, y1, color="red", show_mutes=True)
     ax.set_title(tab_shape.name, fontsize=12, pad=6)
-    fig.tight_layout()
+    with timing.span("tight_layout"):
+        fig.tight_layout()
     return fig, ax
@@ -0,0 +1,201 @@
+# src/cavacohero/render/raster.py
+"""
+Cache of rendered chord diagrams as Agg RGBA buffers.
+
+Diagrams are keyed by (frets, name, mode, tuning, figure size, dpi); a hit can
+be copied straight into an Agg canvas and blitted, skipping matplotlib's draw
+entirely. Off-screen rendering (render_rgba) uses a private Figure per
+thread, never pyplot, so it is safe to call from worker threads.
+"""
+import io
+import threading
+from typing import Tuple
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .. import timing
+from ..lru import ByteLRU
+from ..instrument.cavaco import CAVACO
+from .view import FretboardView
+
+DEFAULT_TUNING = CAVACO.tuning
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+# figure geometry used when the caller doesn't give one — same as draw_shape / draw_shape_full
+FIGURE_DEFAULTS = {"zoom": ((3.2, 5.0), 120), "full": ((3.2, 10.0), 85)}
+
+
+def raster_key(tab_shape, mode: str, tuning: Tuple[str, ...], figsize, dpi) -> tuple:
+    return (tuple(tab_shape.frets), tab_shape.name, mode, tuple(tuning),
+            tuple(round(float(v), 3) for v in figsize), round(float(dpi), 3))
+
+
+class RasterCache(ByteLRU):
+    """ByteLRU of RGBA arrays. Budget in bytes (a default full-neck diagram is ~0.9 MB)."""
+
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET):
+        super().__init__(max_bytes)
+
+    def rgba(self, tab_shape, mode: str = "zoom", tuning: Tuple[str, ...] = DEFAULT_TUNING,
+             figsize=None, dpi=None) -> np.ndarray:
+        """Cached render_rgba()."""
+        figsize, dpi = _geometry(mode, figsize, dpi)
+        key = raster_key(tab_shape, mode, tuning, figsize, dpi)
+        img = self.get(key)
+        if img is None:
+            img = render_rgba(tab_shape, mode, tuning, figsize, dpi)
+            self.put(key, img)
+        return img
+
+
+RASTER_CACHE = RasterCache()
+
+
+def _geometry(mode, figsize, dpi):
+    default_size, default_dpi = FIGURE_DEFAULTS["full" if mode == "full" else "zoom"]
+    return tuple(figsize or default_size), dpi or default_dpi
+
+
+_local = threading.local()
+
+
+def offscreen_view(mode, tuning, figsize, dpi) -> FretboardView:
+    """This thread's off-screen (Agg, no pyplot) view for the given geometry."""
+    views = getattr(_local, "views", None)
+    if views is None:
+        views = _local.views = {}
+    key = (mode, tuple(tuning), figsize, dpi)
+    view = views.get(key)
+    if view is None:
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        view = views[key] = FretboardView(fig.add_subplot(111), tuning=tuning, mode=mode)
+    return view
+
+
+def render_rgba(tab_shape, mode: str = "zoom", tuning: Tuple[str, ...] = DEFAULT_TUNING,
+                figsize=None, dpi=None) -> np.ndarray:
+    """Render one diagram off-screen; returns an (H, W, 4) uint8 copy of the Agg buffer."""
+    figsize, dpi = _geometry(mode, figsize, dpi)
+    view = offscreen_view(mode, tuning, figsize, dpi)
+    if view.update(tab_shape):
+        with timing.span("tight_layout"):
+            view.fig.tight_layout()
+    canvas = view.fig.canvas
+    with timing.span("canvas.draw", chord=tab_shape.name):
+        canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def render_bytes(tab_shape, mode: str = "zoom", fmt: str = "png", tuning: Tuple[str, ...] = DEFAULT_TUNING,
+                 figsize=None, dpi=None) -> bytes:
+    """Render one diagram off-screen and encode it as 'fmt' (png, svg, pdf)."""
+    figsize, dpi = _geometry(mode, figsize, dpi)
+    view = offscreen_view(mode, tuning, figsize, dpi)
+    if view.update(tab_shape):
+        with timing.span("tight_layout"):
+            view.fig.tight_layout()
+    buf = io.BytesIO()
+    with timing.span("savefig", fmt=fmt):
+        view.fig.savefig(buf, format=fmt)
+    return buf.getvalue()
+
+
+def present_rgba(canvas, rgba: np.ndarray) -> bool:
+    """
+    Copy a cached frame into an Agg-based canvas and blit it. Returns False if
+    the canvas can't take it (not Agg, nothing drawn yet, or a different size).
+    """
+    if not getattr(canvas, "supports_blit", False) or not hasattr(canvas, "buffer_rgba"):
+        return False
+    try:
+        buf = np.asarray(canvas.buffer_rgba())
+    except (AttributeError, RuntimeError):
+        return False
+    if buf.shape != rgba.shape or not buf.flags.writeable:
+        return False
+    buf[...] = rgba
+    canvas.blit()
+    return True
+
+
+def show_cached(view: FretboardView, tab_shape, cache: RasterCache, mode: str | None = None) -> bool:
+    """
+    Show 'tab_shape' on the view's (on-screen) canvas, from 'cache' when
+    possible; otherwise draw through the view and keep the result.
+    Returns True on a cache hit.
+    """
+    fig = view.fig
+    key = raster_key(tab_shape, mode or view.mode, view.tuning, fig.get_size_inches(), fig.dpi)
+    rgba = cache.get(key)
+    if rgba is not None:
+        # the artists follow along (no drawing), so a later full redraw shows this chord too
+        view.update(tab_shape, mode)
+        if present_rgba(fig.canvas, rgba):
+            view.invalidate()           # the canvas no longer holds the view's background
+            timing.count("raster.hits")
+            return True
+    timing.count("raster.misses")
+    view.show(tab_shape, mode)
+    if hasattr(fig.canvas, "buffer_rgba"):
+        cache.put(key, np.asarray(fig.canvas.buffer_rgba()).copy())
+    return False
+
+
+def view_geometry(view: FretboardView, mode: str | None = None) -> tuple:
+    """(mode, tuning, figsize, dpi, axes bounds) of an on-screen view; read it on the GUI thread."""
+    fig = view.fig
+    return (mode or view.mode, view.tuning, tuple(float(v) for v in fig.get_size_inches()), float(fig.dpi),
+            tuple(view.ax.get_position().bounds))
+
+
+def twin_view(geometry: tuple) -> FretboardView:
+    """
+    This thread's off-screen (Agg) twin of a view with the given
+    view_geometry(). Only the latest geometry's twin is kept: a resize or a
+    mode switch replaces it, and the old figure is cleared for the collector.
+    """
+    twin = getattr(_local, "twin", None)
+    if twin is not None and _local.geometry == geometry:
+        return twin
+    if twin is not None:
+        twin.fig.clear()
+    mode, tuning, figsize, dpi, bounds = geometry
+    twin_fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(twin_fig)
+    _local.twin = FretboardView(twin_fig.add_axes(bounds), tuning=tuning, mode=mode)
+    _local.geometry = geometry
+    return _local.twin
+
+
+def render_twin(tab_shape, geometry: tuple, cache: RasterCache | None = None) -> np.ndarray:
+    """
+    The frame show_cached() would put on a view with this geometry, rendered
+    on the calling thread (from 'cache' when it has it, and kept there).
+    """
+    mode, tuning, figsize, dpi, _ = geometry
+    key = raster_key(tab_shape, mode, tuning, figsize, dpi)
+    rgba = cache.get(key) if cache is not None else None
+    if rgba is None:
+        twin = twin_view(geometry)
+        twin.update(tab_shape)
+        with timing.span("canvas.draw", chord=tab_shape.name):
+            twin.fig.canvas.draw()
+        rgba = np.asarray(twin.fig.canvas.buffer_rgba()).copy()
+        if cache is not None:
+            cache.put(key, rgba)
+    return rgba
+
+
+def prerender(view: FretboardView, tab_shape, cache: RasterCache, mode: str | None = None) -> None:
+    """
+    Render 'tab_shape' into 'cache' exactly as show_cached() would show it on
+    'view', but off-screen on the calling thread (an Agg twin of the view's
+    figure with the same size, dpi and axes position). Used for prefetching.
+    """
+    geometry = view_geometry(view, mode)
+    mode, tuning, figsize, dpi, _ = geometry
+    if raster_key(tab_shape, mode, tuning, figsize, dpi) not in cache:
+        render_twin(tab_shape, geometry, cache)
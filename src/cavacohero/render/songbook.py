@@ -0,0 +1,321 @@
+# src/cavacohero/render/songbook.py
+"""
+Songbook sheets: many chord diagrams per page, paginated, to PDF or images.
+
+A page is one figure with one axes in "board units" (1 = the distance
+between two strings). Every diagram on it is laid out in a grid cell and
+its parts go into shared per-page arrays, so however many chords a page
+holds it is drawn with four artists: one LineCollection for all strings,
+frets and nuts, one scatter for the dots, one for the muted strings, and
+one PathCollection holding every label (titles, tuning, fret numbers) as glyph
+outlines from TextPath, cached per string. Pages are drawn and written one
+at a time (PdfPages for a multi-page PDF, numbered files otherwise) from an
+iterable of shapes, so memory does not grow with the length of the book.
+"""
+from __future__ import annotations
+import math
+import time
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .. import timing
+from ..instrument.cavaco import CAVACO
+from .common import window_for
+
+PAPER = {"a4": (8.27, 11.69), "letter": (8.5, 11.0)}
+
+# board units: string spacing 1, fret spacing 1
+_LEFT = 1.0               # room for fret numbers left of the first string
+_RIGHT = 0.6
+_TITLE = 0.9              # title band above the tuning row
+_TUNING = 0.55
+_GAP = 0.6                # below each board
+_MARGIN = 0.3             # board drawn from y0 - margin to y1 + margin (in frets)
+_SIZES = {"title": 0.6, "tuning": 0.38, "fret": 0.32}
+
+
+class PageLayout(NamedTuple):
+    cols: int = 6
+    rows: int = 5
+    size_in: Tuple[float, float] = PAPER["a4"]
+    margin_in: float = 0.4
+    header_in: float = 0.35   # page title band
+
+    @property
+    def per_page(self) -> int:
+        return self.cols * self.rows
+
+
+class SongbookSummary(NamedTuple):
+    pages: int
+    chords: int
+    artists: int              # most artists on one page
+    seconds: float
+
+    def __str__(self) -> str:
+        return (f"{self.chords} chords on {self.pages} pages ({self.artists} artists per page) "
+                f"in {self.seconds:.1f}s")
+
+
+# ---------- text as paths ----------
+
+@lru_cache(maxsize=4096)
+def _glyphs(text: str):
+    """Outline of 'text' at size 1 (vertices, codes, width, height), shared by every page."""
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path as MplPath
+    from matplotlib.textpath import TextPath
+
+    path = TextPath((0, 0), text, size=1, prop=FontProperties(family="DejaVu Sans"))
+    # control points bound the outline closely enough for placing labels (and skip bezier solving)
+    points = path.vertices[path.codes != MplPath.CLOSEPOLY]
+    if not len(points):                     # blanks only
+        return path.vertices, path.codes, 0.0, 0.0
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    return path.vertices - (lo[0], 0), path.codes, hi[0] - lo[0], hi[1]
+
+
+class _Text:
+    """Labels of one page, merged into a single compound path."""
+
+    def __init__(self):
+        self.vertices, self.codes = [], []
+
+    def add(self, text: str, x: float, y: float, size: float, ha: str = "center", va: str = "baseline"):
+        if not text:
+            return
+        v, c, w, h = _glyphs(text)
+        dx = {"center": -w / 2, "right": -w, "left": 0.0}[ha] * size
+        dy = {"center": -h / 2, "top": -h, "baseline": 0.0}[va] * size
+        self.vertices.append(v * size + (x + dx, y + dy))
+        self.codes.append(c)
+
+    def collection(self, **kwargs):
+        from matplotlib.collections import PathCollection
+        from matplotlib.path import Path as MplPath
+        if not self.vertices:
+            return None
+        return PathCollection([MplPath(np.concatenate(self.vertices), np.concatenate(self.codes))], **kwargs)
+
+
+# ---------- layout ----------
+
+def cell_size(strings: int, span: int) -> Tuple[float, float]:
+    """(width, height) in board units of a cell showing 'span' frets."""
+    return _LEFT + strings - 1 + _RIGHT, _TITLE + _TUNING + span + 2 * _MARGIN + _GAP
+
+
+def page_geometry(shapes: Sequence, mode: str, tuning: Sequence[str], cols: int,
+                  max_fret: int | None = None) -> dict:
+    """
+    Everything a page draws, in board units (y grows upwards, the top row at
+    y = 0): 'segments' (n, 2, 2) with 'widths' (relative: 1 fret, 2 string,
+    3 nut), 'dots' and 'mutes' (k, 2), a _Text of the labels, and the
+    'cell' size (width, height). Cells are as tall as the page's widest window.
+    """
+    strings = len(tuning)
+    max_fret = max_fret or CAVACO.max_fret
+    windows = [window_for(s.frets, mode, max_fret) for s in shapes]
+    span = max((y1 - y0 for y0, y1 in windows), default=4)
+    cw, ch = cell_size(strings, span)
+
+    segments, widths, dots, mutes = [], [], [], []
+    text = _Text()
+    xs = np.arange(strings, dtype=float)
+    for k, (shape, (y0, y1)) in enumerate(zip(shapes, windows)):
+        ox = (k % cols) * cw + _LEFT
+        top = -(k // cols) * ch - _TITLE - _TUNING - _MARGIN     # y of fret y0
+        fy = lambda f: top - (f - y0)                              # fret -> y
+
+        text.add(shape.name, ox + (strings - 1) / 2, -(k // cols) * ch - _TITLE * 0.8,
+                 _SIZES["title"], va="center")
+        for s, note in enumerate(tuning):
+            text.add(note, ox + s, top + _MARGIN + 0.12, _SIZES["tuning"])
+        for f in range(y0, y1 + 1):
+            text.add(str(f), ox - 0.6, fy(f), _SIZES["fret"], ha="right", va="center")
+
+        segments.append(np.stack([np.stack([ox + xs, np.full(strings, fy(y0))], 1),
+                                  np.stack([ox + xs, np.full(strings, fy(y1))], 1)], 1))
+        widths.append(np.full(strings, 2.0))
+        frets = np.arange(y0, y1 + 1)
+        ys = fy(frets)
+        segments.append(np.stack([np.stack([np.full(len(frets), ox - 0.5), ys], 1),
+                                  np.stack([np.full(len(frets), ox + strings - 0.5), ys], 1)], 1))
+        widths.append(np.where(frets == 0, 3.0, 1.0))
+
+        for s, fret in enumerate(shape.frets):
+            if isinstance(fret, int):
+                if 1 <= fret <= y1:
+                    dots.append((ox + s, fy(fret - 0.5)))
+            elif isinstance(fret, str) and fret.lower() == "x":
+                mutes.append((ox + s, top + _MARGIN * 0.5))
+
+    return {
+        "segments": np.concatenate(segments) if segments else np.zeros((0, 2, 2)),
+        "widths": np.concatenate(widths) if widths else np.zeros(0),
+        "dots": np.array(dots, dtype=float).reshape(-1, 2),
+        "mutes": np.array(mutes, dtype=float).reshape(-1, 2),
+        "text": text,
+        "cell": (cw, ch),
+    }
+
+
+def draw_page(fig, shapes: Sequence, mode: str = "zoom", tuning: Sequence[str] = CAVACO.tuning,
+              layout: PageLayout = PageLayout(), title: str | None = None, max_fret: int | None = None):
+    """Draw one page of 'shapes' (at most layout.per_page) into an empty figure; returns the axes."""
+    from matplotlib.collections import LineCollection
+
+    geo = page_geometry(shapes, mode, tuning, layout.cols, max_fret)
+    width_in, height_in = layout.size_in
+    m, head = layout.margin_in, layout.header_in if title else 0.0
+    ax = fig.add_axes([m / width_in, m / height_in, 1 - 2 * m / width_in, 1 - (2 * m + head) / height_in])
+    ax.axis("off")
+    # the grid always spans the full rows x cols, so cells keep their size on a short last page
+    full_w, full_h = layout.cols * geo["cell"][0], layout.rows * geo["cell"][1]
+    ax.set_xlim(0, full_w)
+    ax.set_ylim(-full_h, 0)
+    ax.set_aspect("equal", anchor="N")
+
+    # points per board unit once the aspect is fixed, for line widths and marker sizes
+    box_w = (width_in - 2 * m) * 72
+    box_h = (height_in - 2 * m - head) * 72
+    ppu = min(box_w / full_w, box_h / full_h)
+
+    # limits are fixed above: autolim=False spares matplotlib walking thousands of glyph curves
+    ax.add_collection(LineCollection(geo["segments"], colors="black", linewidths=geo["widths"] * 0.035 * ppu,
+                                     capstyle="butt"), autolim=False)
+    if len(geo["dots"]):
+        ax.scatter(geo["dots"][:, 0], geo["dots"][:, 1], s=(0.62 * ppu) ** 2, color="red", linewidths=0,
+                   zorder=3)
+    if len(geo["mutes"]):
+        ax.scatter(geo["mutes"][:, 0], geo["mutes"][:, 1], s=(0.3 * ppu) ** 2, marker="x", color="black",
+                   linewidths=0.05 * ppu)
+    text = geo["text"].collection(facecolors="black", edgecolors="none", transform=ax.transData)
+    if text is not None:
+        ax.add_collection(text, autolim=False)
+    if title:
+        fig.text(0.5, 1 - (m + head / 2) / height_in, title, ha="center", va="center", fontsize=11)
+    return ax
+
+
+# ---------- whole books ----------
+
+def chunks(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        page = list(islice(it, size))
+        if not page:
+            return
+        yield page
+
+
+def write_songbook(path: Path, shapes: Iterable, mode: str = "zoom", tuning: Sequence[str] = CAVACO.tuning,
+                   layout: PageLayout = PageLayout(), title: str | None = None, total: int | None = None,
+                   max_fret: int | None = None, dpi: int = 150) -> SongbookSummary:
+    """
+    Lay 'shapes' (any iterable of TabShapes, consumed a page at a time) out
+    on pages. A '.pdf' path gets one multi-page PDF; any other suffix one
+    file per page, numbered ('book.png' -> 'book-001.png', ...). 'total'
+    (the number of shapes, when known) puts 'page i/n' in the page titles.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_pages = math.ceil(total / layout.per_page) if total is not None else None
+    t0 = time.perf_counter()
+    pages = chords = artists = 0
+
+    pdf = None
+    if path.suffix.lower() == ".pdf":
+        from matplotlib.backends.backend_pdf import PdfPages
+        pdf = PdfPages(path)
+    try:
+        for page in chunks(shapes, layout.per_page):
+            pages += 1
+            fig = Figure(figsize=layout.size_in)
+            FigureCanvasAgg(fig)
+            head = title
+            if n_pages is not None:
+                head = f"{title + ' - ' if title else ''}page {pages}/{n_pages}"
+            with timing.span("songbook.page", chords=len(page)):
+                ax = draw_page(fig, page, mode, tuning, layout, head, max_fret)
+            artists = max(artists, len(ax.collections))
+            with timing.span("savefig"):
+                if pdf is not None:
+                    pdf.savefig(fig)
+                else:
+                    fig.savefig(path.with_name(f"{path.stem}-{pages:03d}{path.suffix}"), dpi=dpi)
+            chords += len(page)
+            fig.clear()                     # drop this page before drawing the next one
+    finally:
+        if pdf is not None:
+            pdf.close()
+    return SongbookSummary(pages, chords, artists, time.perf_counter() - t0)
+
+
+def book_shapes(names: Iterable[str], shapes_by_name, all_variants: bool = False) -> Iterator:
+    """
+    The first shape of each chord (every shape, titled 'C (2)' and so on,
+    with all_variants), generated as the pages ask for them.
+    """
+    from ..theory.tabs import TabShape
+
+    for name in names:
+        shapes = shapes_by_name[name]
+        if all_variants and len(shapes) > 1:
+            for v, shape in enumerate(shapes):
+                yield TabShape(name=f"{name} ({v + 1})", frets=shape.frets)
+        elif len(shapes):
+            yield shapes[0]
+
+
+# ---------- CLI ----------
+
+def add_songbook_parser(sub) -> None:
+    p = sub.add_parser("songbook", help="print a chord set as pages of diagrams (PDF, PNG or SVG)")
+    p.add_argument("output", type=Path, help="book.pdf (one multi-page file) or book.png/.svg (one per page)")
+    p.add_argument("--set", default="all", help="set name or query (default: all)")
+    p.add_argument("--mode", choices=("zoom", "full"), default="zoom")
+    p.add_argument("--cols", type=int, default=None, help="diagrams per row (default: 6 zoom, 8 full)")
+    p.add_argument("--rows", type=int, default=None, help="rows per page (default: 5 zoom, 3 full)")
+    p.add_argument("--paper", choices=sorted(PAPER), default="a4")
+    p.add_argument("--landscape", action="store_true")
+    p.add_argument("--all-variants", action="store_true", help="every shape of each chord, not just the first")
+    p.add_argument("--title", default=None, help="page heading (default: the set)")
+
+
+def run_songbook(args, load) -> int:
+    """'cavacohero songbook' entry point; 'load' returns the loaded Library."""
+    from ..engine.state import variants_per_chord
+    from ..theory.select import select_chords
+
+    lib = load()
+    try:
+        names = select_chords(lib.shapes_by_name, lib.meta_by_name, lib.sets, args.set)
+    except ValueError as e:
+        print(e)
+        return 1
+    if not names:
+        print(f"No chords matched '{args.set}'.")
+        return 1
+    full = args.mode == "full"
+    cols = args.cols or (8 if full else 6)
+    rows = args.rows or (3 if full else 5)
+    if cols < 1 or rows < 1:
+        print("--cols and --rows must be positive")
+        return 1
+    w, h = PAPER[args.paper]
+    layout = PageLayout(cols=cols, rows=rows, size_in=(h, w) if args.landscape else (w, h))
+
+    counts = variants_per_chord(names, lib.shapes_by_name)
+    total = sum(counts) if args.all_variants else sum(1 for c in counts if c)
+    summary = write_songbook(args.output, book_shapes(names, lib.shapes_by_name, args.all_variants),
+                             args.mode, lib.tuning, layout, title=args.title or args.set, total=total)
+    print(f"{args.output}: {summary}")
+    return 0
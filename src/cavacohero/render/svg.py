@@ -0,0 +1,100 @@
+# src/cavacohero/render/svg.py
+"""
+SVG chord diagrams as plain strings, without matplotlib.
+
+Same layout as draw_shape / draw_shape_full: strings, frets with a thick nut,
+fret numbers on the left, tuning above, red dots between frets, X for muted
+strings, title on top. Everything that depends only on (tuning, window, mode)
+is built once into a cached template; a chord adds just its title, dots and
+mutes, so rendering is a few string joins.
+"""
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+from xml.sax.saxutils import escape
+
+from ..instrument.cavaco import CAVACO
+from .common import window_for
+
+DEFAULT_TUNING = CAVACO.tuning
+
+UNIT = 44                 # px between strings
+PAD_LEFT = 22             # room for the fret numbers left of the board
+PAD = 8                   # right and bottom
+DOT_R = 9
+FONT = 'font-family="DejaVu Sans, Arial, sans-serif"'
+
+# per mode: (margin around the fret window in frets, px per fret, title pad px)
+_MODES = {"zoom": (0.8, 44, 8), "full": (0.5, 30, 21)}
+
+
+class Template(NamedTuple):
+    head: str                 # <svg>, background, grid, fret numbers and tuning
+    title: str                # '<text ...>{}</text>', filled with the escaped chord name
+    string_x: Tuple[str, ...]
+    dot_y: dict               # fret -> cy (only frets inside the window)
+    mute_y: str
+
+
+def _n(v: float) -> str:
+    return f"{v:.1f}".rstrip("0").rstrip(".")
+
+
+@lru_cache(maxsize=256)
+def template(tuning: Tuple[str, ...], y0: int, y1: int, mode: str = "zoom") -> Template:
+    margin, per_fret, title_pad = _MODES["full" if mode == "full" else "zoom"]
+    strings = len(tuning)
+    band = 20 + title_pad
+    width = PAD_LEFT + (strings + 0.25) * UNIT + PAD      # frets run from -0.5 to strings - 0.5
+    height = band + (y1 - y0 + 2 * margin) * per_fret + PAD
+
+    px = lambda x: _n(PAD_LEFT + (x + 0.75) * UNIT)
+    py = lambda y: _n(band + (y - y0 + margin) * per_fret)
+
+    strings_d = " ".join(f"M{px(s)} {py(y0)}V{py(y1)}" for s in range(strings))
+    frets_d = " ".join(f"M{px(-0.5)} {py(f)}H{px(strings - 0.5)}" for f in range(max(y0, 1), y1 + 1))
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_n(width)}" height="{_n(height)}" '
+        f'viewBox="0 0 {_n(width)} {_n(height)}" {FONT}>',
+        '<rect width="100%" height="100%" fill="white"/>',
+        f'<path d="{strings_d}" stroke="black" stroke-width="2"/>',
+    ]
+    if frets_d:
+        parts.append(f'<path d="{frets_d}" stroke="black" stroke-width="1"/>')
+    if y0 == 0:
+        parts.append(f'<path d="M{px(-0.5)} {py(0)}H{px(strings - 0.5)}" stroke="black" stroke-width="3"/>')
+    parts.append('<g font-size="11" text-anchor="end" dominant-baseline="central">')
+    parts.extend(f'<text x="{px(-0.65)}" y="{py(f)}">{f}</text>' for f in range(y0, y1 + 1))
+    parts.append('</g><g font-size="13" text-anchor="middle">')
+    parts.extend(f'<text x="{px(s)}" y="{py(y0 - 0.4)}">{escape(note)}</text>' for s, note in enumerate(tuning))
+    parts.append("</g>")
+
+    return Template(
+        head="".join(parts),
+        title=f'<text x="{px((strings - 1) / 2)}" y="{_n(band - title_pad)}" font-size="16" '
+              f'text-anchor="middle">{{}}</text>',
+        string_x=tuple(px(s) for s in range(strings)),
+        dot_y={f: py(f - 0.5) for f in range(max(y0 + 1, 1), y1 + 1)},
+        mute_y=py(y0 - 0.25),
+    )
+
+
+def render_svg(tab_shape, mode: str = "zoom", tuning: Tuple[str, ...] = DEFAULT_TUNING,
+               max_fret: int | None = None) -> str:
+    """The diagram as an SVG document (str)."""
+    frets = tab_shape.frets
+    t = template(tuple(tuning), *window_for(frets, mode, max_fret), mode)
+    dots, mutes = [], []
+    for s, fret in enumerate(frets[:len(t.string_x)]):
+        if isinstance(fret, int):
+            cy = t.dot_y.get(fret)
+            if cy is not None:
+                dots.append(f'<circle cx="{t.string_x[s]}" cy="{cy}" r="{DOT_R}"/>')
+        elif isinstance(fret, str) and fret.lower() == "x":
+            mutes.append(f'<text x="{t.string_x[s]}" y="{t.mute_y}">X</text>')
+    parts = [t.head, t.title.format(escape(tab_shape.name))]
+    if dots:
+        parts.append('<g fill="red">' + "".join(dots) + "</g>")
+    if mutes:
+        parts.append('<g font-size="13" text-anchor="middle">' + "".join(mutes) + "</g>")
+    parts.append("</svg>")
+    return "".join(parts)
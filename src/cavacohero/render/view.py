@@ -0,0 +1,155 @@
+# src/cavacohero/render/view.py
+"""
+Stateful fretboard on a persistent axes.
+
+draw_shape/draw_shape_full build a diagram from scratch; FretboardView creates
+its artists once (grid as two LineCollections, all dots as one scatter, pooled
+labels) and afterwards only moves/hides them. update() reports whether the
+window changed; when it did not, draw() just restores the saved background
+and blits the per-chord artists (dots, mutes, title).
+"""
+from typing import Tuple
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from .. import timing
+from ..instrument.cavaco import CAVACO
+from .common import auto_window
+
+DEFAULT_TUNING = CAVACO.tuning
+
+# per mode: (margin around the fret window, title pad) — same as draw_shape / draw_shape_full
+_ZOOM = (0.8, 6)
+_FULL = (0.5, 16)
+
+
+class FretboardView:
+    def __init__(self, ax, tuning: Tuple[str, ...] = DEFAULT_TUNING, mode: str = "zoom",
+                 max_fret: int | None = None, blit: bool = False):
+        self.ax = ax
+        self.fig = ax.figure
+        self.tuning = tuple(tuning)
+        self.strings = len(self.tuning)
+        self.max_fret = max_fret or CAVACO.max_fret
+        self.mode = mode
+        self.blit = blit
+        self.window = None            # (y0, y1) currently laid out
+        self._background = None
+
+        ax.clear()
+        ax.axis("off")
+        ax.set_xlim(-0.75, self.strings - 0.25)
+
+        self._string_lines = LineCollection([], colors="black", linewidths=2)
+        self._fret_lines = LineCollection([], colors="black")
+        ax.add_collection(self._string_lines)
+        ax.add_collection(self._fret_lines)
+        self._tuning_labels = [ax.text(s, 0, note, ha="center", va="bottom", fontsize=10)
+                               for s, note in enumerate(self.tuning)]
+        self._fret_labels = []        # grown on demand, hidden when out of window
+
+        self._dots = ax.scatter(np.empty(0), np.empty(0), s=140, zorder=3, color="red")
+        self._mutes = [ax.text(s, 0, "X", ha="center", va="bottom", fontsize=10, visible=False)
+                       for s in range(self.strings)]
+        self._title = ax.set_title("", fontsize=12, pad=_ZOOM[1])
+        self._title_pad = None
+
+        if blit:
+            for a in self._dynamic():
+                a.set_animated(True)
+            self._cid = self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def close(self):
+        """Stop following the canvas' draws (before another view takes over the axes)."""
+        if self.blit:
+            self.fig.canvas.mpl_disconnect(self._cid)
+
+    # ---------- state ----------
+    def _dynamic(self):
+        return [self._dots, self._title, *self._mutes]
+
+    def _window_for(self, frets):
+        if self.mode == "full":
+            return 0, self.max_fret
+        return auto_window(frets)
+
+    def update(self, tab_shape, mode: str | None = None) -> bool:
+        """
+        Show 'tab_shape' (None = empty board). Returns True when the grid had
+        to be laid out again, i.e. a full draw is needed rather than a blit.
+        """
+        if mode is not None and mode != self.mode:
+            self.mode = mode
+            self.window = None
+        frets = tab_shape.frets if tab_shape is not None else ()
+        window = self._window_for(frets) if tab_shape is not None else (self.window or self._window_for(()))
+        relayout = window != self.window
+        if relayout:
+            self._layout(*window)
+        self._place_notes(frets)
+        self._title.set_text(tab_shape.name if tab_shape is not None else "No chords in selection")
+        return relayout
+
+    def _layout(self, y0: int, y1: int):
+        margin, pad = _FULL if self.mode == "full" else _ZOOM
+        s = self.strings
+        self._string_lines.set_segments([[(i, y0), (i, y1)] for i in range(s)])
+        self._fret_lines.set_segments([[(-0.5, f), (s - 0.5, f)] for f in range(y0, y1 + 1)])
+        self._fret_lines.set_linewidths([3 if f == 0 else 1 for f in range(y0, y1 + 1)])
+
+        while len(self._fret_labels) <= y1:
+            f = len(self._fret_labels)
+            self._fret_labels.append(self.ax.text(-0.65, f, str(f), va="center", ha="right", fontsize=8))
+        for f, label in enumerate(self._fret_labels):
+            label.set_visible(y0 <= f <= y1)
+        for label in self._tuning_labels:
+            label.set_y(y0 - 0.4)
+        for mute in self._mutes:
+            mute.set_y(y0 - 0.25)
+
+        self.ax.set_ylim(y1 + margin, y0 - margin)   # inverted: nut at the top
+        if pad != self._title_pad:
+            self.ax.set_title(self._title.get_text(), fontsize=12, pad=pad)
+            self._title_pad = pad
+        self.window = (y0, y1)
+
+    def _place_notes(self, frets):
+        y1 = self.window[1]
+        xs, ys = [], []
+        for s_idx, fret in enumerate(frets):
+            if isinstance(fret, int) and 1 <= fret <= y1:
+                xs.append(s_idx)
+                ys.append(fret - 0.5)
+        self._dots.set_offsets(np.column_stack([xs, ys]) if xs else np.empty((0, 2)))
+        for s_idx, mute in enumerate(self._mutes):
+            fret = frets[s_idx] if s_idx < len(frets) else None
+            mute.set_visible(isinstance(fret, str) and fret.lower() == "x")
+
+    # ---------- drawing ----------
+    def _on_draw(self, _event):
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        for a in self._dynamic():
+            self.fig.draw_artist(a)
+
+    def draw(self, relayout: bool = True):
+        """Push the current state to the canvas: full draw or background restore + blit."""
+        canvas = self.fig.canvas
+        if not self.blit or relayout or self._background is None:
+            with timing.span("canvas.draw"):
+                canvas.draw()             # draw_event recaptures the background
+            return
+        with timing.span("canvas.blit"):
+            canvas.restore_region(self._background)
+            self._draw_dynamic()
+            canvas.blit(self.fig.bbox)
+
+    def invalidate(self):
+        """Forget the saved background (e.g. something else drew on the canvas)."""
+        self._background = None
+
+    def show(self, tab_shape, mode: str | None = None):
+        self.draw(self.update(tab_shape, mode))
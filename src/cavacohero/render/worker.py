@@ -0,0 +1,117 @@
+# src/cavacohero/render/worker.py
+"""
+Rendering off the GUI thread.
+
+FrameWorker runs a render function (job -> RGBA array) on one background
+thread. Both ends hold a single slot: submit() replaces a job that has not
+started yet, and a finished frame the GUI has not collected yet is replaced
+by the next one. When rendering falls behind, intermediate frames are
+dropped (and counted) instead of queueing up, so the screen always shows
+the newest chord as soon as it can. The GUI thread collects frames with
+take(), e.g. from a Tk after() poll; nothing here touches the toolkit. A
+job whose render raised still comes back, as a frame with 'error' set and
+no pixels, so the GUI can draw that chord itself.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, NamedTuple
+
+
+class Frame(NamedTuple):
+    seq: int
+    job: Any
+    rgba: Any                       # None when rendering failed
+    render_ms: float
+    error: BaseException | None = None
+
+
+class FrameWorker:
+    def __init__(self, render: Callable[[Any], Any], name: str = "render", clock=time.perf_counter):
+        self._render = render
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._job = None                # (seq, job) waiting to start
+        self._ready: Frame | None = None
+        self._seq = 0
+        self._busy = False
+        self._closed = False
+        self.dropped = 0                # jobs replaced before rendering + frames replaced before display
+        self.errors = 0
+        self.last_error: BaseException | None = None
+        self._render_ms = deque(maxlen=32)
+        self._shown = deque(maxlen=32)  # display times, for the frame rate
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ---------- GUI side ----------
+    def submit(self, job) -> int:
+        """Queue 'job' (dropping one still waiting); returns its sequence number."""
+        with self._cond:
+            if self._job is not None:
+                self.dropped += 1
+            self._seq += 1
+            self._job = (self._seq, job)
+            self._cond.notify()
+            return self._seq
+
+    def take(self) -> Frame | None:
+        """The newest finished frame, once (None if there is nothing new)."""
+        with self._cond:
+            frame, self._ready = self._ready, None
+        if frame is not None:
+            self._shown.append(self._clock())
+        return frame
+
+    @property
+    def pending(self) -> bool:
+        """A job is waiting, being rendered, or finished but not taken."""
+        with self._cond:
+            return self._job is not None or self._busy or self._ready is not None
+
+    @property
+    def latest(self) -> int:
+        return self._seq
+
+    def stats(self) -> dict:
+        """Mean render time and displayed frames per second over the last few frames."""
+        ms = list(self._render_ms)
+        shown = list(self._shown)
+        fps = 0.0
+        if len(shown) > 1 and shown[-1] > shown[0]:
+            fps = (len(shown) - 1) / (shown[-1] - shown[0])
+        return {"render_ms": sum(ms) / len(ms) if ms else 0.0, "fps": fps, "dropped": self.dropped}
+
+    def close(self, timeout: float | None = 1.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    # ---------- worker side ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                (seq, job), self._job = self._job, None
+                self._busy = True
+            start = self._clock()
+            error = None
+            try:
+                rgba = self._render(job)
+            except Exception as e:          # keep the worker alive; the GUI falls back on its own drawing
+                rgba, error = None, e
+                self.errors += 1
+                self.last_error = e
+            elapsed = (self._clock() - start) * 1000.0
+            with self._cond:
+                self._busy = False
+                if error is None:
+                    self._render_ms.append(elapsed)
+                if self._ready is not None:
+                    self.dropped += 1
+                self._ready = Frame(seq, job, rgba, elapsed, error)
@@ -0,0 +1,196 @@
+# src/cavacohero/theory/identify.py
+"""
+Reverse lookup: fret tuple -> chord name.
+
+A shape is reduced to the pitch classes it sounds (a 12-bit mask, from the
+tuning) and the pitch class of its lowest sounding string. ChordIdentifier
+precomputes, for every root x formula, the masks of the full chord and of
+its usual omissions (the fifth; the root in 4+ note chords), plus the
+library's own chords under their library names. A (mask, bass) table then
+holds the best candidate, so naming an array of shapes is one fancy-index.
+Inversions come out as slash chords ('C/E'); roots are spelled the usual
+way ('Bb', 'F#') with the other spelling kept as an alias.
+"""
+from __future__ import annotations
+import weakref
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .notes import FLAT_NAMES, ROOT_NAMES, SHARP_NAMES, pc_mask, pitch_class, split_note
+from .store import MUTE
+from .voicings import FORMULAS, Formula
+
+NO_MATCH = -1
+
+
+class Match(NamedTuple):
+    name: str                       # e.g. 'Am7', 'C/E', or the library's own name
+    root: int | None                # pitch class (None for library names without a note root)
+    quality: str | None
+    bass: int
+    inversion: int                  # 0 = root position, 1 = third in the bass, ...; -1 bass not a chord tone
+    omitted: Tuple[int, ...]        # intervals missing from the shape
+    source: str                     # 'library' or 'formula'
+    aliases: Tuple[str, ...] = ()   # other spellings ('A#m7' for 'Bbm7')
+
+    def __str__(self) -> str:
+        text = self.name
+        if self.omitted:
+            text += " (no " + ", ".join(_INTERVAL_NAMES.get(i, str(i)) for i in self.omitted) + ")"
+        return text
+
+
+_INTERVAL_NAMES = {0: "root", 3: "3", 4: "3", 7: "5", 10: "7", 11: "7"}
+
+
+class _Entry(NamedTuple):
+    mask: int
+    root: int | None
+    name: str                       # name without the bass
+    quality: str | None
+    intervals: Tuple[int, ...]      # of the full chord, for inversion numbers
+    omitted: Tuple[int, ...]
+    source: str
+    cost: float
+
+
+def _spell(pc: int, like: str) -> str:
+    """Note name of 'pc', with flats if the chord root 'like' is flat-spelled."""
+    return (FLAT_NAMES if "b" in like[1:2] else SHARP_NAMES)[pc % 12]
+
+
+def _omissions(formula: Formula) -> List[Tuple[Tuple[int, ...], float]]:
+    """(omitted intervals, extra cost) variants a shape may still be named after."""
+    out = [((), 0.0)]
+    out += [((i,), 1.0) for i in formula.optional]
+    if len(formula.intervals) >= 4:
+        out.append(((0,), 2.0))                              # rootless
+        out += [((0, i), 3.0) for i in formula.optional]
+    return out
+
+
+class ChordIdentifier:
+    def __init__(self, tuning: Sequence[str], formulas: Iterable[Formula] = FORMULAS.values(), library=None):
+        self.tuning = tuple(tuning)
+        self.open_pc = np.array([pitch_class(n) for n in self.tuning], dtype=np.int16)
+        entries: List[_Entry] = []
+
+        for rank, formula in enumerate(formulas):
+            for root in range(12):
+                name = ROOT_NAMES[root] + formula.suffix
+                for omitted, extra in _omissions(formula):
+                    kept = [i for i in formula.intervals if i not in omitted]
+                    entries.append(_Entry(pc_mask(root + i for i in kept), root, name, formula.quality,
+                                          formula.intervals, omitted, "formula",
+                                          extra + 0.1 * len(formula.intervals) + 0.001 * rank))
+
+        if library is not None:
+            # the library's names win over derived ones for the pitch sets its shapes sound
+            masks, _ = self.masks(library.store.frets)
+            owner = library.store.chord_of_shape()
+            for mask, i in sorted(set(zip(masks.tolist(), owner.tolist()))):
+                name = library.store.names[i]
+                try:
+                    root = pitch_class(split_note(name)[0])
+                except ValueError:
+                    root = None
+                entries.append(_Entry(mask, root, name, library.store.quality(i), (), (), "library", -1.0))
+
+        self._entries = entries
+        self._by_mask: dict = {}
+        for k, e in enumerate(entries):
+            self._by_mask.setdefault(e.mask, []).append(k)
+        for ids in self._by_mask.values():
+            ids.sort(key=lambda k: entries[k].cost)
+
+        # best entry per (mask, bass): cheapest, preferring a root in the bass
+        self.table = np.full((4096, 12), NO_MATCH, dtype=np.int32)
+        for mask, ids in self._by_mask.items():
+            for bass in range(12):
+                if mask >> bass & 1:
+                    self.table[mask, bass] = min(ids, key=lambda k: self._cost(entries[k], bass))
+
+    @staticmethod
+    def _cost(e: _Entry, bass: int) -> float:
+        return e.cost + (0.0 if e.root == bass else 0.5)
+
+    # ---------- shapes -> pitch classes ----------
+    def masks(self, frets) -> Tuple[np.ndarray, np.ndarray]:
+        """(pitch-class mask, bass pitch class) per row of an (n, strings) fret array (MUTE or 'x' = muted)."""
+        frets = np.asarray(_as_rows(frets), dtype=np.int16).reshape(-1, len(self.tuning))
+        played = frets != MUTE
+        pcs = (self.open_pc + frets) % 12
+        mask = np.bitwise_or.reduce(np.where(played, 1 << pcs, 0), axis=1)
+        first = played.argmax(axis=1)
+        bass = np.where(played.any(axis=1), pcs[np.arange(len(frets)), first], 0)
+        return mask, bass
+
+    # ---------- lookup ----------
+    def _match(self, k: int, bass: int) -> Match:
+        e = self._entries[k]
+        name = e.name
+        if e.root is not None and bass != e.root:
+            name += "/" + _spell(bass, name)
+        inversion = 0
+        if e.intervals and e.root is not None:
+            rel = (bass - e.root) % 12
+            degrees = sorted({i % 12 for i in e.intervals})
+            inversion = degrees.index(rel) if rel in degrees else -1
+        aliases = ()
+        if e.root is not None and e.source == "formula":
+            root_name, rest = split_note(e.name)
+            aliases = tuple(a + rest for a in (SHARP_NAMES[e.root], FLAT_NAMES[e.root]) if a != root_name)
+        return Match(name, e.root, e.quality, bass, inversion, e.omitted, e.source, aliases)
+
+    def identify(self, frets) -> List[Match]:
+        """Every reading of one shape, best first."""
+        mask, bass = self.masks([frets])
+        mask, bass = int(mask[0]), int(bass[0])
+        ids = sorted(self._by_mask.get(mask, ()), key=lambda k: self._cost(self._entries[k], bass))
+        out, seen = [], set()
+        for k in ids:
+            m = self._match(k, bass)
+            if (m.name, m.omitted) not in seen:     # a library chord and its formula twin
+                seen.add((m.name, m.omitted))
+                out.append(m)
+        return out
+
+    def best(self, frets) -> Match | None:
+        found = self.identify(frets)
+        return found[0] if found else None
+
+    def identify_many(self, frets) -> List[Match | None]:
+        """Best reading of every row of an (n, strings) fret array (or a list of shapes)."""
+        mask, bass = self.masks(frets)
+        ids = self.table[mask, bass]
+        return [self._match(int(k), int(b)) if k != NO_MATCH else None for k, b in zip(ids, bass)]
+
+
+def _as_rows(frets):
+    """Accept an int array, TabShapes, or fret tuples with 'x' for mutes."""
+    if isinstance(frets, np.ndarray):
+        return frets
+    rows = []
+    for row in frets:
+        row = getattr(row, "frets", row)
+        rows.append([MUTE if isinstance(f, str) else f for f in row])
+    return rows
+
+
+_IDENTIFIERS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_BY_TUNING: dict = {}
+
+
+def chord_identifier(tuning: Sequence[str], library=None) -> ChordIdentifier:
+    """Shared identifier: one per library store (built on first use), or per tuning without a library."""
+    if library is None:
+        key = tuple(tuning)
+        if key not in _BY_TUNING:
+            _BY_TUNING[key] = ChordIdentifier(key)
+        return _BY_TUNING[key]
+    store = library.store
+    ident = _IDENTIFIERS.get(store)
+    if ident is None:
+        ident = _IDENTIFIERS[store] = ChordIdentifier(store.tuning, library=library)
+    return ident
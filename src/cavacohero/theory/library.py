@@ -1,12 +1,47 @@
 from __future__ import annotations
+import os
+import numpy as np
 import yaml
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
-from .tabs import TabShape, parse_cavaco_shape
+from typing import Dict, List, Tuple, Any, Mapping, NamedTuple, Sequence
+from .tabs import TabShape, ShapeEncoding, parse_shapes
+from .store import ChordStore, MUTE
+from .transpose import with_movable
+from ..io import cache as _cache
+from ..io import includes as _includes
+from .. import timing
 
 DEFAULT_TUNING = ("D", "G", "B", "D")
 
-def load_library(p: Path) -> tuple[tuple[str, ...], Dict[str, List[TabShape]], Dict[str, dict], dict]:
+# bump whenever the parsed representation (or the snapshot payload) changes
+LIBRARY_SCHEMA = 3
+
+# libyaml's C loader when available (much faster on big libraries)
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class Library(NamedTuple):
+    """
+    What load_library returns. Still unpacks as the classic 4-tuple; the two
+    mappings are read-only views over a columnar ChordStore.
+    """
+    tuning: tuple[str, ...]
+    shapes_by_name: Mapping[str, List[TabShape]]
+    meta_by_name: Mapping[str, dict]
+    sets: dict
+
+    @property
+    def store(self) -> ChordStore:
+        return self.shapes_by_name.store
+
+    @classmethod
+    def from_store(cls, store: ChordStore, sets: dict) -> "Library":
+        return cls(store.tuning, store.shapes_by_name, store.meta_by_name, sets)
+
+
+@timing.timed("load_library")
+def load_library(p: Path | Sequence[Path], use_cache: bool = True, rebuild_cache: bool = False,
+                 workers: int | None = None) -> Library:
     """
     Loads the new YAML schema:
       tuning: [...]
@@ -17,42 +52,393 @@ def load_library(p: Path) -> tuple[tuple[str, ...], Dict[str, List[TabShape]], D
           shapes: [[42,30,21,12], ...]
       sets:
         ...
+      string_digits: 2      # optional; digits of the string number in a token (default: enough for the tuning)
+      movable: true         # optional; default for chords without their own 'movable' (see transpose.py)
+      max_fret: 15          # optional; how far up the neck movable shapes may go
     Returns: (tuning, shapes_by_name, meta_by_name, sets)
+
+    'p' may also be several files, and any file can 'include' others (see
+    io/includes.py); they are read on 'workers' threads and merged, later
+    definitions overriding earlier ones.
+
+    A library with problems raises LibraryError listing all of them, with
+    YAML line numbers.
+
+    Parsed libraries are snapshotted on disk (see io/cache.py) and reused
+    while the file content (and that of every included file) is unchanged.
+    use_cache=False skips the snapshot entirely; rebuild_cache=True ignores
+    it and writes a fresh one. Several root files are composed afresh each time.
     """
-    data = yaml.safe_load(p.read_text(encoding="utf-8"))
+    roots = _roots(p)
+    key = roots[0] if len(roots) == 1 else None
+    if use_cache and not rebuild_cache and key is not None:
+        payload = _cache.read_snapshot(key, LIBRARY_SCHEMA, check=_includes.unchanged)
+        if payload is not None:
+            timing.count("library.snapshot_hits")
+            return _from_payload(payload)
+
+    timing.count("library.parses")
+
+    sources = _includes.read_tree(roots, workers)
+    result = _compose(sources)
+    if use_cache and key is not None:
+        _cache.write_snapshot(key, LIBRARY_SCHEMA, _to_payload(result), sources[-1].raw, _deps(sources))
+    return result
+
+
+def _roots(p) -> List[Path]:
+    if isinstance(p, (str, Path)):
+        return [Path(p)]
+    roots = [Path(x) for x in p]
+    if not roots:
+        raise ValueError("no library files given")
+    return roots
+
+
+def _deps(sources) -> dict | None:
+    """Snapshot dependencies beyond the root file itself (None for a lone file)."""
+    return _includes.signature(sources) if len(sources) > 1 or sources[0].patterns else None
+
+
+def _compose(sources) -> Library:
+    if len(sources) == 1:
+        return parse_library(sources[0].data, sources[0].raw)
+    data, origin = _includes.merge(sources)
+    return parse_library(data, origin)
+
 
+def parse_library(data: Any, raw: bytes | str | Mapping | None = None) -> Library:
+    """
+    Build a Library from a loaded YAML document. 'raw' only serves error line
+    numbers: the document's text, or {chord: Source} for a merged library.
+    """
+    if data is None:
+        data = {}
     tuning = tuple(data.get("tuning", DEFAULT_TUNING))
-    strings_expected = len(tuning)
+    chords = _chords_of(data)
+    names, quals, tags, frets, counts = _parse_chords(chords, len(tuning), _encoding_of(data), raw)
+    store = ChordStore.from_matrix(tuning, names, quals, tags, frets, counts)
+    return Library.from_store(_with_movable(store, data), _sets_of(data))
 
-    shapes_by_name: Dict[str, List[TabShape]] = {}
-    meta_by_name: Dict[str, dict] = {}
 
+def _chords_of(data) -> dict:
     chords = data.get("chords", {})
     if not isinstance(chords, dict):
         raise ValueError("'chords' must be a mapping")
+    return chords
+
+
+def _sets_of(data) -> dict:
+    sets = data.get("sets", {})
+    if sets is None: sets = {}
+    if not isinstance(sets, dict):
+        raise ValueError("'sets' must be a mapping if present")
+    return sets
+
+
+def _encoding_of(data) -> ShapeEncoding:
+    digits = data.get("string_digits")
+    if digits is not None and (not isinstance(digits, int) or digits < 1):
+        raise ValueError("'string_digits' must be a positive integer")
+    return ShapeEncoding.for_strings(len(data.get("tuning", DEFAULT_TUNING)), digits)
+
+
+def _movable_of(data) -> List[str]:
+    """Chords marked 'movable' (each chord's own flag, else the document's default)."""
+    default = data.get("movable", False)
+    return [name for name, spec in _chords_of(data).items()
+            if isinstance(spec, dict) and spec.get("movable", default)]
+
+
+def _with_movable(store: ChordStore, data) -> ChordStore:
+    max_fret = data.get("max_fret")
+    if max_fret is not None and (not isinstance(max_fret, int) or max_fret < 1):
+        raise ValueError("'max_fret' must be a positive integer")
+    return with_movable(store, _movable_of(data), max_fret)
+
+
+# ---- parsing, with every problem collected ----
+
+class LibraryIssue(NamedTuple):
+    chord: Any
+    message: str
+    path: tuple = ()            # (shape, token) indices inside the chord entry, as far as known
+    line: int | None = None     # 1-based YAML line
+    file: str | None = None     # set for libraries merged from several files
+
+    def __str__(self) -> str:
+        where = " ".join(filter(None, (self.file, f"line {self.line}" if self.line else None)))
+        return f"{where}: {self.message}" if where else self.message
+
+
+class LibraryError(ValueError):
+    """All problems found in a library (still a ValueError for callers that catch one)."""
 
+    def __init__(self, issues):
+        self.issues = list(issues)
+        if len(self.issues) == 1:
+            text = str(self.issues[0])
+        else:
+            text = f"{len(self.issues)} problems:\n" + "\n".join(f"  {i}" for i in self.issues)
+        super().__init__(text)
+
+
+def _parse_chords(chords: dict, strings: int, encoding: ShapeEncoding, raw=None):
+    """
+    YAML chord entries -> (names, qualities, tag lists, fret matrix, shapes per
+    chord). Every shape of every chord is decoded in one parse_shapes() pass;
+    problems are gathered across the whole library and raised together.
+    """
+    names, quals, tag_lists, counts = [], [], [], []
+    flat, issues = [], []
     for name, spec in chords.items():
         if not isinstance(spec, dict):
-            raise ValueError(f"Chord '{name}' must be a mapping with quality/tags/shapes")
+            issues.append(LibraryIssue(name, f"Chord '{name}' must be a mapping with quality/tags/shapes"))
+            continue
         variants = spec.get("shapes", [])
         if not isinstance(variants, list) or not variants:
-            raise ValueError(f"Chord '{name}' must have a non-empty 'shapes' list")
+            issues.append(LibraryIssue(name, f"Chord '{name}' must have a non-empty 'shapes' list"))
+            continue
+        names.append(name)
+        quals.append(spec.get("quality"))
+        tag_lists.append(list(dict.fromkeys(spec.get("tags") or [])))
+        counts.append(len(variants))
+        if all(isinstance(shape, (list, tuple)) for shape in variants):
+            flat.extend(variants)
+            continue
+        for k, shape in enumerate(variants):
+            if not isinstance(shape, (list, tuple)):
+                issues.append(LibraryIssue(name, f"Chord '{name}' shape must be a list like [42,30,21,12]", (k,)))
+                shape = ("x",) * strings
+            flat.append(shape)
 
-        parsed: List[TabShape] = []
-        for raw in variants:
-            if not isinstance(raw, (list, tuple)):
-                raise ValueError(f"Chord '{name}' shape must be a list like [42,30,21,12]")
-            parsed.append(parse_cavaco_shape(name, raw, strings_expected=strings_expected))
+    # identical shapes (common once libraries are merged from many files) are decoded once
+    unique, inverse = _unique_rows(flat)
+    decoded, errors = parse_shapes(unique, strings, encoding)
+    frets = decoded[inverse]
+    starts = np.cumsum([0] + counts)
+    for e in errors:
+        for row in np.flatnonzero(inverse == e.shape).tolist():
+            j = int(np.searchsorted(starts, row, side="right")) - 1
+            name, k = names[j], row - int(starts[j])
+            issues.append(LibraryIssue(name, f"{name}: shape {k + 1}: {e.message}",
+                                       (k,) if e.token is None else (k, e.token)))
+    if issues:
+        order = {name: i for i, name in enumerate(chords)}
+        issues.sort(key=lambda i: (order[i.chord], i.path))
+        raise LibraryError(_locate(issues, raw))
+    return names, quals, tag_lists, frets, counts
 
-        shapes_by_name[name] = parsed
-        meta_by_name[name] = {
-            "quality": spec.get("quality"),
-            "tags": set(spec.get("tags", [])),
-        }
 
-    sets = data.get("sets", {})
-    if sets is None: sets = {}
-    if not isinstance(sets, dict):
-        raise ValueError("'sets' must be a mapping if present")
+def _unique_rows(rows: list) -> Tuple[list, np.ndarray]:
+    """Distinct token rows, and for every row its index among them."""
+    index: dict = {}
+    unique, inverse = [], np.empty(len(rows), dtype=np.int64)
+    for i, row in enumerate(rows):
+        try:
+            key = tuple(row)
+            u = index.get(key)
+        except TypeError:                   # a malformed (unhashable) token: keep the row as is
+            key, u = None, None
+        if u is None:
+            u = len(unique)
+            unique.append(row)
+            if key is not None:
+                index[key] = u
+        inverse[i] = u
+    return unique, inverse
+
+
+def _locate(issues: List[LibraryIssue], raw) -> List[LibraryIssue]:
+    """Fill in YAML line numbers by walking the composed node tree (only done when there are errors)."""
+    if raw is None:
+        return issues
+    if isinstance(raw, Mapping):                 # merged library: each chord in the file it came from
+        by_file: dict = {}
+        for i, issue in enumerate(issues):
+            src = raw.get(issue.chord)
+            if src is not None:
+                by_file.setdefault(src.path, (src, []))[1].append(i)
+        located = list(issues)
+        for src, idx in by_file.values():
+            found = _locate([issues[i]._replace(file=_shown(src.path)) for i in idx], src.raw)
+            for i, issue in zip(idx, found):
+                located[i] = issue
+        return located
+    try:
+        root = yaml.compose(raw, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        return issues
+    chords = _child(root, "chords")
+    entries = {key.value: (key, value) for key, value in chords.value} if chords is not None else {}
+
+    located = []
+    for issue in issues:
+        key, node = entries.get(str(issue.chord), (None, None))
+        if node is None:
+            located.append(issue)
+            continue
+        best = key
+        shapes = _child(node, "shapes")
+        for i in issue.path:
+            if shapes is None or not isinstance(shapes, yaml.SequenceNode) or i >= len(shapes.value):
+                break
+            best = shapes = shapes.value[i]
+        located.append(issue._replace(line=best.start_mark.line + 1))
+    return located
+
+
+def _shown(path: Path) -> str:
+    rel = os.path.relpath(path)
+    return str(path) if rel.startswith("..") else rel
+
+
+def _child(node, key: str):
+    if isinstance(node, yaml.MappingNode):
+        for k, v in node.value:
+            if k.value == key:
+                return v
+    return None
+
+
+# ---- incremental reload ----
+
+class LibraryDiff(NamedTuple):
+    added: frozenset
+    removed: frozenset
+    changed: frozenset          # shapes and/or metadata differ
+    meta_changed: frozenset     # quality or tags differ (a subset of 'changed')
+    sets_changed: bool
+    reparsed: int               # chords whose shapes went through the parser
+    tuning_changed: bool = False   # every diagram's labels (and cached pixels) are stale
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.sets_changed or self.tuning_changed)
+
+    def affects_selection(self) -> bool:
+        """Whether set/query results may differ (shape edits alone don't change them)."""
+        return bool(self.added or self.removed or self.meta_changed or self.sets_changed)
+
+    def __str__(self) -> str:
+        parts = [f"{len(v)} {k}" for k, v in
+                 (("added", self.added), ("removed", self.removed), ("changed", self.changed)) if v]
+        if self.sets_changed:
+            parts.append("sets changed")
+        if self.tuning_changed:
+            parts.append("tuning changed")
+        return ", ".join(parts) or "no changes"
+
+
+def _tokens(store: ChordStore, name: str) -> list:
+    """A stored chord's shapes back in YAML token form ([42, 30, 21, 12] -> ['42', '30', '21', '12'])."""
+    strings = store.strings
+    return [["x" if f == MUTE else f"{strings - i}{f}" for i, f in enumerate(row)]
+            for row in store.rows(name).tolist()]
+
+
+def _same_chord(store: ChordStore, name: str, spec) -> bool:
+    if not isinstance(spec, dict) or not isinstance(spec.get("shapes"), list):
+        return False
+    i = store.chord_id(name)
+    if spec.get("quality") != store.quality(i):
+        return False
+    if list(dict.fromkeys(spec.get("tags") or [])) != store.tag_list(i):
+        return False
+    new = [[str(t).lower() for t in raw] if isinstance(raw, (list, tuple)) else None for raw in spec["shapes"]]
+    return new == _tokens(store, name)
+
+
+def update_library(old: Library, data: Any, raw: bytes | str | None = None) -> Tuple[Library, LibraryDiff]:
+    """
+    Build the library for a re-loaded YAML document, re-parsing only the
+    chords whose entry differs from 'old' (compared in canonical token form);
+    unchanged chords reuse their stored rows. Returns a new Library — 'old'
+    is left untouched, so callers swap it in with one assignment.
+    """
+    if data is None:
+        data = {}
+    tuning = tuple(data.get("tuning", DEFAULT_TUNING))
+    chords = _chords_of(data)
+    sets = _sets_of(data)
+    store = getattr(old.store, "base", old.store)      # the typed chords; derived keys are rebuilt below
+    same_tuning = tuning == store.tuning
+
+    todo = {name: spec for name, spec in chords.items()
+            if not (same_tuning and name in store and _same_chord(store, name, spec))}
+    names, quals, tags, frets, counts = _parse_chords(todo, len(tuning), _encoding_of(data), raw)
+    offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+    parsed = {name: (name, q, t, frets[offsets[j]:offsets[j + 1]].tolist())
+              for j, (name, q, t) in enumerate(zip(names, quals, tags))}
+
+    rows, changed, meta_changed = [], set(), set()
+    for name in chords:
+        row = parsed.get(name)
+        if row is None:
+            i = store.chord_id(name)
+            rows.append((name, store.quality(i), store.tag_list(i), store.rows(name).tolist()))
+            continue
+        rows.append(row)
+        if name in store:
+            changed.add(name)
+            meta = old.meta_by_name[name]
+            if row[1] != meta["quality"] or frozenset(row[2]) != meta["tags"]:
+                meta_changed.add(name)
+
+    new = Library.from_store(_with_movable(ChordStore.build(tuning, rows), data), sets)
+    # a derived key changes with the chord it is transposed from
+    derived = getattr(new.store, "source", None)
+    if derived is not None:
+        base_names = new.store.base.names
+        for name, src in zip(new.store.names[len(base_names):], derived[len(base_names):].tolist()):
+            if base_names[src] in changed:
+                changed.add(name)
+                if base_names[src] in meta_changed:
+                    meta_changed.add(name)
+    names, old_names = set(new.store.names), set(old.store.names)
+    diff = LibraryDiff(
+        added=frozenset(names - old_names),
+        removed=frozenset(old_names - names),
+        changed=frozenset(changed & old_names),
+        meta_changed=frozenset(meta_changed & old_names),
+        sets_changed=sets != old.sets,
+        reparsed=len(parsed),
+        tuning_changed=not same_tuning,
+    )
+    return new, diff
+
+
+def reload_library(p: Path | Sequence[Path], old: Library, use_cache: bool = True,
+                   sources=None) -> Tuple[Library, LibraryDiff]:
+    """
+    Re-read 'p' (or use its already-read sources, see io/includes.py) into an
+    updated copy of 'old'; refreshes the snapshot.
+    """
+    roots = _roots(p)
+    if sources is None:
+        sources = _includes.read_tree(roots)
+    if len(sources) == 1:
+        new, diff = update_library(old, sources[0].data, sources[0].raw)
+    else:
+        data, origin = _includes.merge(sources)
+        new, diff = update_library(old, data, origin)
+    if use_cache and len(roots) == 1:
+        _cache.write_snapshot(roots[0], LIBRARY_SCHEMA, _to_payload(new), sources[-1].raw, _deps(sources))
+    return new, diff
+
+
+# ---- snapshot payload: the store's arrays as-is, so loading is a few memcpys ----
+# (the typed chords only; movable ones are re-derived, lazily, on load)
+
+def _to_payload(lib: Library):
+    store = lib.store
+    base = getattr(store, "base", store)
+    movable = (store.movable, store.max_fret) if base is not store else None
+    return (base.to_state(), lib.sets, movable)
+
 
-    return tuning, shapes_by_name, meta_by_name, sets
+def _from_payload(payload) -> Library:
+    state, sets, movable = payload
+    store = ChordStore.from_state(state)
+    if movable is not None:
+        store = with_movable(store, *movable)
+    return Library.from_store(store, sets)
@@ -0,0 +1,64 @@
+# src/cavacohero/theory/notes.py
+"""
+Note names <-> pitch classes (0 = C ... 11 = B).
+
+Accepts sharps and flats in ASCII or Unicode ('C#', 'Db', 'C♯'), double
+accidentals ('F##', 'Fx', 'Bbb') and an optional octave ('D4'), so tunings
+and chord roots can be spelled either way.
+"""
+import re
+from typing import List, Tuple
+
+NATURALS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+SHARP_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+FLAT_NAMES = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+# the usual spelling of each root in chord names
+ROOT_NAMES = ("C", "C#", "D", "Eb", "E", "F", "F#", "G", "Ab", "A", "Bb", "B")
+
+_ACCIDENTALS = {"": 0, "#": 1, "♯": 1, "##": 2, "x": 2, "b": -1, "♭": -1, "bb": -2}
+_NOTE = re.compile(r"([A-Ga-g])(##|#|♯|x|bb|b|♭)?")
+_OCTAVE = re.compile(r"-?\d+")
+
+
+def split_note(text: str) -> Tuple[str, str]:
+    """Leading note name and the rest: 'Bbm7' -> ('Bb', 'm7'), 'F#/A#' -> ('F#', '/A#')."""
+    m = _NOTE.match(text.strip())
+    if not m:
+        raise ValueError(f"{text}: does not start with a note name")
+    note, rest = m.group(0), text.strip()[m.end():]
+    return note[0].upper() + note[1:], rest
+
+
+def pitch_class(name: str) -> int:
+    """'C' -> 0, 'C#'/'Db' -> 1, ..., 'B' -> 11; an octave number is ignored ('D4' -> 2)."""
+    note, rest = split_note(name)
+    if rest and not _OCTAVE.fullmatch(rest):
+        raise ValueError(f"{name}: not a note name")
+    return (NATURALS[note[0]] + _ACCIDENTALS[note[1:]]) % 12
+
+
+def note_name(pc: int, flats: bool = False) -> str:
+    return (FLAT_NAMES if flats else SHARP_NAMES)[pc % 12]
+
+
+def enharmonics(name: str) -> List[str]:
+    """Spellings of the same pitch with at most one accidental: 'C#' -> ['C#', 'Db'], 'E' -> ['E', 'Fb']."""
+    pc = pitch_class(name)
+    out = []
+    for acc in ("", "#", "b"):
+        for letter, natural in NATURALS.items():
+            if (natural + _ACCIDENTALS[acc]) % 12 == pc:
+                out.append(letter + acc)
+    return out
+
+
+def same_pitch(a: str, b: str) -> bool:
+    return pitch_class(a) == pitch_class(b)
+
+
+def pc_mask(pcs) -> int:
+    """Pitch classes as a 12-bit mask (bit pc set)."""
+    mask = 0
+    for pc in pcs:
+        mask |= 1 << (pc % 12)
+    return mask
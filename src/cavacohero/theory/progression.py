@@ -0,0 +1,166 @@
+# src/cavacohero/theory/progression.py
+"""
+Voice leading: which variant of each chord to play in a progression.
+
+Chords can have several shapes; plan_variants() picks one per position so
+the hand moves as little as possible overall. The cost of going from shape
+a to shape b is the shift of hand position (lowest fretted fret) plus the
+strings whose fingering changes; each shape also pays a little for its
+span. Dynamic programming over the variants (Viterbi) finds the cheapest
+sequence in O(positions x variants^2), with the transition matrix of each
+distinct chord pair computed once, so song-length progressions are cheap.
+
+Plans are memoized per (progression, library store): a hot reload makes a
+new store and with it fresh plans.
+"""
+from __future__ import annotations
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .store import MUTE
+from .tabs import TabShape
+
+
+class Weights(NamedTuple):
+    shift: float = 1.0       # per fret the hand position moves
+    change: float = 0.5      # per string whose fingering changes
+    span: float = 0.25       # per fret of stretch within a shape
+
+
+DEFAULT_WEIGHTS = Weights()
+_PLANS_PER_STORE = 64
+
+
+def _rows(shapes_by_name: Mapping, name: str) -> np.ndarray:
+    store = getattr(shapes_by_name, "store", None)
+    if store is not None:
+        return store.rows(name)
+    return np.array([[MUTE if isinstance(f, str) else f for f in s.frets] for s in shapes_by_name[name]],
+                    dtype=np.int8)
+
+
+def _position(rows: np.ndarray) -> np.ndarray:
+    """Lowest fretted fret per shape; NaN for open-only shapes (the hand can be anywhere)."""
+    fretted = rows > 0
+    lo = np.where(fretted, rows, np.iinfo(np.int8).max).min(axis=1).astype(float)
+    lo[~fretted.any(axis=1)] = np.nan
+    return lo
+
+
+def shape_cost(rows: np.ndarray, weights: Weights = DEFAULT_WEIGHTS) -> np.ndarray:
+    fretted = rows > 0
+    hi = np.where(fretted, rows, 0).max(axis=1)
+    lo = np.where(fretted, rows, np.iinfo(np.int8).max).min(axis=1)
+    span = np.where(fretted.any(axis=1), hi - lo, 0)
+    # variant order breaks ties, so equal costs keep the library's first choice
+    return weights.span * span + 1e-3 * np.arange(len(rows))
+
+
+def transition_cost(a: np.ndarray, b: np.ndarray, weights: Weights = DEFAULT_WEIGHTS) -> np.ndarray:
+    """(len(a), len(b)) cost of moving from each shape in 'a' to each shape in 'b'."""
+    shift = np.abs(_position(a)[:, None] - _position(b)[None, :])
+    shift = np.nan_to_num(shift, nan=0.0)
+    a3, b3 = a[:, None, :].astype(np.int16), b[None, :, :].astype(np.int16)
+    changed = ((a3 != b3) & ((a3 > 0) | (b3 > 0))).sum(axis=2)
+    return weights.shift * shift + weights.change * changed
+
+
+def solve(rows: Sequence[np.ndarray], weights: Weights = DEFAULT_WEIGHTS, cyclic: bool = False,
+          keys: Sequence | None = None) -> Tuple[Tuple[int, ...], float]:
+    """
+    Cheapest variant per position, and its total cost. rows[k] holds the
+    variants of position k; with cyclic=True the move from the last chord
+    back to the first counts too (looping playback). 'keys' (e.g. chord
+    names) lets repeated chord pairs share one transition matrix.
+    """
+    n = len(rows)
+    if n == 0:
+        return (), 0.0
+    keys = list(keys) if keys is not None else list(range(n))
+    static = [shape_cost(r, weights) for r in rows]
+    pairs: dict = {}
+
+    def trans(i, j):
+        key = (keys[i], keys[j])
+        t = pairs.get(key)
+        if t is None:
+            t = pairs[key] = transition_cost(rows[i], rows[j], weights)
+        return t
+
+    # One pass for every possible first variant at once when cyclic (row s of
+    # 'cost' = paths that start with variant s), a single row otherwise.
+    if cyclic and n > 1:
+        cost = np.full((len(rows[0]), len(rows[0])), np.inf)
+        np.fill_diagonal(cost, static[0])
+    else:
+        cost = static[0][None, :]
+    back = []
+    for k in range(1, n):
+        total = cost[:, :, None] + trans(k - 1, k)[None, :, :] + static[k][None, None, :]
+        back.append(total.argmin(axis=1))
+        cost = total.min(axis=1)
+    if cyclic and n > 1:
+        cost = cost + trans(n - 1, 0).T          # back to the first chord, per start
+    s, last = np.unravel_index(int(cost.argmin()), cost.shape)
+    best = float(cost[s, last])
+    path = [int(last)]
+    for b in reversed(back):
+        path.append(int(b[s, path[-1]]))
+    return tuple(reversed(path)), best
+
+
+_PLANS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def plan_variants(names: Sequence[str], shapes_by_name: Mapping, weights: Weights = DEFAULT_WEIGHTS,
+                  cyclic: bool = False) -> Tuple[int, ...]:
+    """Variant index for every position of 'names' (store-backed libraries memoize the plan)."""
+    store = getattr(shapes_by_name, "store", None)
+    key = (tuple(names), weights, cyclic)
+    memo = _PLANS.get(store) if store is not None else None
+    if memo is not None and key in memo:
+        memo.move_to_end(key)
+        return memo[key]
+    plan, _ = solve([_rows(shapes_by_name, n) for n in names], weights, cyclic, keys=names)
+    if store is not None:
+        memo = _PLANS.setdefault(store, OrderedDict())
+        memo[key] = plan
+        if len(memo) > _PLANS_PER_STORE:
+            memo.popitem(last=False)
+    return plan
+
+
+class Voicing(Mapping):
+    """{name: TabShape} with the planned variant of each chord of a progression."""
+
+    def __init__(self, names: Sequence[str], shapes_by_name: Mapping, plan: Sequence[int]):
+        self.shapes_by_name = shapes_by_name
+        self.variants: Dict[str, int] = {}
+        for name, v in zip(names, plan):
+            self.variants.setdefault(name, v)      # a chord that repeats keeps its first variant
+
+    def __getitem__(self, name) -> TabShape:
+        return self.shapes_by_name[name][self.variants.get(name, 0)]
+
+    def __contains__(self, name) -> bool:
+        return name in self.shapes_by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.variants)
+
+    def __len__(self) -> int:
+        return len(self.variants)
+
+
+def voiced_shapes(names: Sequence[str], shapes_by_name: Mapping, weights: Weights = DEFAULT_WEIGHTS) -> Voicing:
+    """The shape to show for each chord of 'names' played in order, looping (what autoplay does)."""
+    return Voicing(names, shapes_by_name, plan_variants(names, shapes_by_name, weights, cyclic=True))
+
+
+def first_shapes(names: Sequence[str], shapes_by_name: Mapping) -> Voicing:
+    """Every chord in its first variant: for orders not known in advance (shuffled autoplay), nothing to plan."""
+    return Voicing(names, shapes_by_name, [0] * len(names))
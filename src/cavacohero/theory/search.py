@@ -0,0 +1,291 @@
+# src/cavacohero/theory/search.py
+"""
+Chord-name search: exact, alias/enharmonic, prefix and typo-tolerant.
+
+Every name is reduced to a key (root pitch class + canonical suffix + bass),
+so 'Dbmin7', 'c#-7' and 'C#m7' all find the library's 'C#m7'. Completion
+walks a trie of the lower-cased names (each root spelled both ways), whose
+nodes keep the ids below them in library order, so a prefix costs its own
+length plus the answer. Typos go through a bigram index: postings are
+NumPy arrays counted with bincount, and only the best few candidates are
+ranked by edit distance.
+"""
+from __future__ import annotations
+import heapq
+import weakref
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .notes import FLAT_NAMES, SHARP_NAMES, pitch_class, split_note
+
+# canonical suffix (as in voicings.FORMULAS) for the usual ways of writing it
+SUFFIX_ALIASES = {
+    "": "", "maj": "", "major": "", "M": "",
+    "m": "m", "min": "m", "minor": "m", "mi": "m", "-": "m",
+    "7": "7", "dom": "7", "dom7": "7",
+    "maj7": "maj7", "M7": "maj7", "ma7": "maj7", "Δ": "maj7", "Δ7": "maj7",
+    "m7": "m7", "min7": "m7", "mi7": "m7", "-7": "m7",
+    "m7b5": "m7b5", "min7b5": "m7b5", "-7b5": "m7b5", "ø": "m7b5", "ø7": "m7b5",
+    "dim": "dim", "°": "dim", "o": "dim", "dim7": "dim7", "°7": "dim7", "o7": "dim7",
+    "aug": "aug", "+": "aug", "+5": "aug", "7#5": "7#5", "+7": "7#5", "aug7": "7#5", "7+5": "7#5",
+    "m(maj7)": "m(maj7)", "mM7": "m(maj7)", "m/maj7": "m(maj7)", "mmaj7": "m(maj7)", "minmaj7": "m(maj7)",
+    "sus": "sus4", "sus4": "sus4", "sus2": "sus2", "7sus": "7sus4", "7sus4": "7sus4",
+    "6": "6", "m6": "m6", "min6": "m6", "-6": "m6",
+    "9": "9", "dom9": "9", "maj9": "maj9", "M9": "maj9", "m9": "m9", "min9": "m9", "-9": "m9",
+    "add9": "add9", "add2": "add9", "6/9": "6/9", "69": "6/9", "7b9": "7b9",
+}
+# case-insensitive fallback; where only case tells two apart ('M7'/'m7') the lower-case reading wins
+_LOWER_ALIASES: Dict[str, str] = {}
+for _alias, _canon in sorted(SUFFIX_ALIASES.items(), key=lambda kv: kv[0] != kv[0].lower()):
+    _LOWER_ALIASES.setdefault(_alias.lower(), _canon)
+
+
+def canonical_suffix(suffix: str) -> str:
+    s = suffix.strip()
+    if s in SUFFIX_ALIASES:
+        return SUFFIX_ALIASES[s]
+    return _LOWER_ALIASES.get(s.lower(), s)
+
+
+def chord_key(name: str) -> str | None:
+    """'Dbmin7' -> '1:m7', 'C/E' -> '0:/4'; None if 'name' does not start with a note."""
+    try:
+        root, rest = split_note(name)
+        pc = pitch_class(root)
+    except ValueError:
+        return None
+    bass = ""
+    if rest not in SUFFIX_ALIASES and "/" in rest:
+        head, _, tail = rest.rpartition("/")
+        try:
+            bass, rest = f"/{pitch_class(tail)}", head
+        except ValueError:
+            pass
+    return f"{pc}:{canonical_suffix(rest)}{bass}"
+
+
+def spellings(name: str) -> List[str]:
+    """Lower-cased ways to type 'name': as written, and with the root's other spelling."""
+    out = [name.lower()]
+    try:
+        root, rest = split_note(name)
+        pc = pitch_class(root)
+    except ValueError:
+        return out
+    for alt in (SHARP_NAMES[pc], FLAT_NAMES[pc]):
+        if alt != root:
+            out.append((alt + rest).lower())
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int = 3) -> int:
+    """Optimal string alignment distance (adjacent swaps cost 1), cut off at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _bigrams(text: str) -> set:
+    # bigrams rather than trigrams: chord names are short, 'c#m' and 'cm' share no trigram
+    padded = f"^{text}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def _well_formed(text: str) -> bool:
+    """A chord name in its own right ('Bb7'): never 'corrected' into a different chord."""
+    key = chord_key(text)
+    if key is None:
+        return False
+    suffix = key.split(":", 1)[1].split("/")[0]
+    return suffix in _CANONICAL
+
+
+_CANONICAL = set(SUFFIX_ALIASES.values())
+
+
+class Hit(NamedTuple):
+    name: str
+    score: float        # lower is better: 0 exact, 1 alias/enharmonic, 2 prefix, 3+ typo distance
+    kind: str           # 'exact' | 'alias' | 'prefix' | 'fuzzy'
+
+
+class ChordSearch:
+    def __init__(self, names: Iterable[str]):
+        self.names = list(dict.fromkeys(names))
+        self.by_key: Dict[str, List[int]] = {}
+        self.by_lower: Dict[str, List[int]] = {}
+        self.trie: dict = {}
+        grams: Dict[str, List[int]] = {}
+        self._forms: List[Tuple[str, int]] = []        # (typed form, name id) for the n-gram side
+        self._root: List[int] = []                       # root pitch class per name, -1 if none
+
+        for i, name in enumerate(self.names):
+            key = chord_key(name)
+            if key is not None:
+                self.by_key.setdefault(key, []).append(i)
+            self._root.append(int(key.split(":")[0]) if key is not None else -1)
+            self.by_lower.setdefault(name.lower(), []).append(i)
+            for form in spellings(name):
+                self._insert(form, i)
+                f = len(self._forms)
+                self._forms.append((form, i))
+                for g in _bigrams(form):
+                    grams.setdefault(g, []).append(f)
+        self.grams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+
+    def _insert(self, form: str, i: int) -> None:
+        node = self.trie
+        for ch in form:
+            node = node.setdefault(ch, {})
+            ids = node.setdefault("", [])
+            if not ids or ids[-1] != i:
+                ids.append(i)
+
+    # ---------- queries ----------
+    def resolve(self, text: str) -> str | None:
+        """The library name 'text' means: exact, else same chord spelled differently, else an unambiguous typo."""
+        text = text.strip()
+        if text in self._ids:
+            return text
+        hits = self.search(text, limit=2)
+        if hits and hits[0].kind in ("exact", "alias"):
+            return hits[0].name
+        if hits and hits[0].kind == "fuzzy" and hits[0].score <= 4 and not _well_formed(text) \
+                and (len(hits) == 1 or hits[1].score > hits[0].score):
+            return hits[0].name
+        return None
+
+    @property
+    def _ids(self) -> Dict[str, int]:
+        ids = self.__dict__.get("_id_map")
+        if ids is None:
+            ids = self.__dict__["_id_map"] = {n: i for i, n in enumerate(self.names)}
+        return ids
+
+    def complete(self, prefix: str, limit: int = 8) -> List[str]:
+        """
+        Names starting with 'prefix' (any case, either root spelling, suffix
+        aliases): those on the typed root first ('F' before 'F#'), then library order.
+        """
+        key = chord_key(prefix)
+        root = int(key.split(":")[0]) if key is not None else -1
+        lists = []
+        for form in self._query_forms(prefix):
+            node = self.trie
+            for ch in form:
+                node = node.get(ch)
+                if node is None:
+                    break
+            else:
+                lists.append(node.get("", ()) if form else range(len(self.names)))
+        # the id lists are sorted: merge them lazily and stop once 'limit' names on the root are in
+        same: List[int] = []
+        other: List[int] = []
+        last = -1
+        for i in heapq.merge(*lists):
+            if i == last:
+                continue
+            last = i
+            if self._root[i] == root:
+                same.append(i)
+                if len(same) == limit:
+                    break
+            elif len(other) < limit:
+                other.append(i)
+        return [self.names[i] for i in (same + other)[:limit]]
+
+    def search(self, text: str, limit: int = 8) -> List[Hit]:
+        text = text.strip()
+        if not text:
+            return []
+        best: Dict[int, Hit] = {}
+
+        def offer(i: int, score: float, kind: str):
+            if i not in best or score < best[i].score:
+                best[i] = Hit(self.names[i], score, kind)
+
+        if text in self._ids:
+            offer(self._ids[text], 0.0, "exact")
+        key = chord_key(text)
+        for i in self.by_key.get(key, ()) if key else ():     # same chord ('EM7' is Emaj7, not Em7)
+            offer(i, 0.5, "alias")
+        for i in self.by_lower.get(text.lower(), ()):
+            offer(i, 1.0, "alias")
+        for rank, name in enumerate(self.complete(text, limit)):
+            offer(self._ids[name], 2.0 + 0.01 * rank, "prefix")
+        if len(best) < limit:
+            for i, d in self._fuzzy(text.lower(), limit):
+                offer(i, 3.0 + d, "fuzzy")
+        return sorted(best.values(), key=lambda h: (h.score, self._ids[h.name]))[:limit]
+
+    def _query_forms(self, text: str) -> List[str]:
+        """Lower-cased spellings of a query: as typed, with the other root spelling, and with the suffix canonical."""
+        forms = spellings(text.strip())
+        try:
+            root, rest = split_note(text.strip())
+        except ValueError:
+            return forms
+        canon = canonical_suffix(rest)
+        if canon != rest and canon:         # 'Fmaj' also means 'F', but should not complete to 'F#'
+            forms += spellings(root + canon)
+        return list(dict.fromkeys(forms))
+
+    def _fuzzy(self, text: str, limit: int) -> List[Tuple[int, int]]:
+        grams = [self.grams[g] for g in _bigrams(text) if g in self.grams]
+        if not grams:
+            return []
+        counts = np.bincount(np.concatenate(grams), minlength=len(self._forms))
+        k = min(max(32, 4 * limit), len(counts))
+        top = np.argpartition(-counts, k - 1)[:k]
+        top = top[np.argsort(-counts[top], kind="stable")]
+        cutoff = max(1, len(text) // 3)
+        scored: Dict[int, int] = {}
+        for f in top.tolist():
+            if counts[f] == 0:
+                break
+            form, i = self._forms[f]
+            d = edit_distance(text, form, cutoff)
+            if d <= cutoff and d < scored.get(i, cutoff + 1):
+                scored[i] = d
+        return sorted(scored.items(), key=lambda kv: (kv[1], kv[0]))
+
+
+_SEARCHES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def chord_search(shapes_by_name: Mapping) -> ChordSearch:
+    """Search index for a library: one per store (built on first use), fresh for plain dicts."""
+    store = getattr(shapes_by_name, "store", None)
+    if store is None:
+        return ChordSearch(shapes_by_name)
+    search = _SEARCHES.get(store)
+    if search is None:
+        search = _SEARCHES[store] = ChordSearch(store.names)
+    return search
+
+
+def resolve_names(items: Sequence[str], shapes_by_name: Mapping) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    """
+    Library names for what the user typed, and what could not be resolved
+    together with up to three suggestions for each.
+    """
+    search = chord_search(shapes_by_name)
+    names, missing = [], []
+    for item in items:
+        name = search.resolve(item)
+        if name is None:
+            missing.append((item, [h.name for h in search.search(item, limit=3)]))
+        else:
+            names.append(name)
+    return names, missing
@@ -1,46 +1,287 @@
 from __future__ import annotations
-from typing import Dict, List, Iterable
+import re
+import weakref
+from typing import Dict, List, Iterable, Mapping
+import numpy as np
 from .tabs import TabShape
+from .. import timing
 
+
+# ---------- inverted index ----------
+
+class ChordIndex:
+    """
+    Inverted index over a library. Every chord gets a bit (bit i = i-th name
+    in sorted order) and each quality/tag maps to a bitset stored as a Python
+    int, so set algebra is plain & | ~ and results come out already sorted.
+    Results of select() are memoized per index; a changed library gets a new
+    index, which is what invalidates them.
+    """
+
+    def __init__(self, names: Iterable[str], quality_bits: Dict, tag_bits: Dict):
+        self.names = list(names)                  # sorted
+        self.position = {n: i for i, n in enumerate(self.names)}
+        self.all = (1 << len(self.names)) - 1
+        self.by_quality = quality_bits
+        self.by_tag = tag_bits
+        self._memo: Dict = {}
+        self._memo_sets = None
+
+    @classmethod
+    def from_store(cls, store) -> "ChordIndex":
+        order = sorted(range(len(store.names)), key=store.names.__getitem__)
+        names = [store.names[i] for i in order]
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+
+        def bits_of(mask: np.ndarray) -> int:
+            hits = np.zeros(len(order), dtype=bool)
+            hits[rank[mask]] = True
+            return int.from_bytes(np.packbits(hits, bitorder="little").tobytes(), "little")
+
+        quality_bits = {q: bits_of(store.quality_mask([q])) for q in store.qualities}
+        tag_bits = {t: bits_of(store.tag_mask([t])) for t in store.tags}
+        return cls(names, quality_bits, tag_bits)
+
+    @classmethod
+    def from_dicts(cls, shapes_by_name: Mapping, meta_by_name: Mapping) -> "ChordIndex":
+        names = sorted(shapes_by_name)
+        quality_bits: Dict = {}
+        tag_bits: Dict = {}
+        for i, n in enumerate(names):
+            m = meta_by_name.get(n) or {}
+            q = m.get("quality")
+            if q is not None:
+                quality_bits[q] = quality_bits.get(q, 0) | (1 << i)
+            for t in m.get("tags") or ():
+                tag_bits[t] = tag_bits.get(t, 0) | (1 << i)
+        return cls(names, quality_bits, tag_bits)
+
+    def bits_for(self, names: Iterable[str]) -> int:
+        bits = 0
+        for n in names:
+            i = self.position.get(n)
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def decode(self, bits: int) -> List[str]:
+        if not bits:
+            return []
+        raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        hits = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        return [self.names[i] for i in hits]
+
+    # ---------- evaluation ----------
+    def select(self, sets: dict, selection: str) -> List[str]:
+        """Names for a YAML set name or a query expression (memoized)."""
+        if self._memo_sets is not sets:
+            self._memo.clear()
+            self._memo_sets = sets
+        hit = self._memo.get(selection)
+        if hit is None:
+            hit = self._memo[selection] = self.decode(self._eval_selection(sets, selection))
+        return list(hit)
+
+    def _eval_selection(self, sets: dict, selection: str) -> int:
+        if selection in sets:
+            return self._eval_set(sets, selection, ())
+        if selection == "all":
+            return self.all
+        if selection in ("major", "minor"):
+            return self.by_quality.get(selection, 0)
+        if is_query(selection):
+            return self._eval_expr(parse_query(selection), sets, ())
+        return 0
+
+    def _eval_set(self, sets: dict, name: str, stack: tuple) -> int:
+        if name in stack:
+            raise ValueError(f"set '{name}' refers to itself: {' -> '.join(stack + (name,))}")
+        stack = stack + (name,)
+        rule = sets[name] or {}
+        if isinstance(rule, str):
+            return self._eval_expr(parse_query(rule), sets, stack)
+
+        include = rule.get("include")
+        picked = 0
+        if include == "*" or name == "all":
+            picked = self.all
+        elif isinstance(include, list):
+            picked |= self.bits_for(include)
+        for q in rule.get("qualities", []):
+            picked |= self.by_quality.get(q, 0)
+        for t in rule.get("tags", []):
+            picked |= self.by_tag.get(t, 0)
+        for other in rule.get("sets", []):
+            if other not in sets:
+                raise ValueError(f"set '{name}' refers to unknown set '{other}'")
+            picked |= self._eval_set(sets, other, stack)
+        where = rule.get("where")
+        if where:
+            picked |= self._eval_expr(parse_query(where), sets, stack)
+
+        exclude = rule.get("exclude")
+        if isinstance(exclude, str):
+            picked &= ~self._eval_expr(parse_query(exclude), sets, stack)
+        elif exclude:
+            picked &= ~self.bits_for(exclude)
+        return picked & self.all
+
+    def _eval_expr(self, node: tuple, sets: dict, stack: tuple) -> int:
+        op = node[0]
+        if op == "or":
+            return self._eval_expr(node[1], sets, stack) | self._eval_expr(node[2], sets, stack)
+        if op == "and":
+            return self._eval_expr(node[1], sets, stack) & self._eval_expr(node[2], sets, stack)
+        if op == "not":
+            return self.all & ~self._eval_expr(node[1], sets, stack)
+        if op == "all":
+            return self.all
+        field, value = node[1], node[2]
+        if field == "quality":
+            return self.by_quality.get(value, 0)
+        if field == "tag":
+            return self.by_tag.get(value, 0)
+        if field == "name":
+            return self.bits_for([value])
+        # field == "set"
+        if value not in sets:
+            raise ValueError(f"query refers to unknown set '{value}'")
+        return self._eval_set(sets, value, stack)
+
+
+_INDEXES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def chord_index(shapes_by_name: Mapping, meta_by_name: Mapping) -> ChordIndex:
+    """
+    Index for a library. Store-backed libraries (what load_library returns)
+    get one index per store, built on first use; plain dicts can change under
+    us, so they get a fresh index every call.
+    """
+    store = getattr(shapes_by_name, "store", None)
+    if store is None:
+        return ChordIndex.from_dicts(shapes_by_name, meta_by_name)
+    index = _INDEXES.get(store)
+    if index is None:
+        index = _INDEXES[store] = ChordIndex.from_store(store)
+    return index
+
+
+# ---------- query expressions ----------
+#   tags: seventh AND NOT quality: minor
+#   (set: my_progression OR name: G7) AND NOT tag: triad
+# fields: quality/qualities, tag/tags, name, set; '*' matches everything.
+
+_FIELDS = {"quality": "quality", "qualities": "quality", "tag": "tag", "tags": "tag",
+           "name": "name", "set": "set", "sets": "set"}
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|(\*)|"([^"]*)"|\'([^\']*)\'|(:)|([^\s():"\']+))')
+
+
+def is_query(text: str) -> bool:
+    return ":" in text or "(" in text or text.strip() == "*"
+
+
+def _tokenize(text: str) -> List[tuple]:
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise ValueError(f"bad query near {text[pos:]!r}")
+        pos = m.end()
+        lparen, rparen, star, dq, sq, colon, word = m.groups()
+        if dq is not None or sq is not None:
+            tokens.append(("word", dq if dq is not None else sq))
+        elif word is not None:
+            tokens.append(("word", word))
+        else:
+            tokens.append(("op", lparen or rparen or star or colon))
+    return tokens
+
+
+def parse_query(text: str) -> tuple:
+    """Parse a query into a small tuple AST: ('or'|'and', a, b), ('not', a), ('term', field, value), ('all',)."""
+    tokens = _tokenize(text)
+    pos = 0
+
+    def peek_kw():
+        if pos < len(tokens) and tokens[pos][0] == "word":
+            return tokens[pos][1].upper()
+        return None
+
+    def parse_or():
+        nonlocal pos
+        node = parse_and()
+        while peek_kw() == "OR":
+            pos += 1
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        nonlocal pos
+        node = parse_not()
+        while peek_kw() == "AND":
+            pos += 1
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        nonlocal pos
+        if peek_kw() == "NOT":
+            pos += 1
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError(f"incomplete query: {text!r}")
+        kind, value = tokens[pos]
+        if (kind, value) == ("op", "("):
+            pos += 1
+            node = parse_or()
+            if pos >= len(tokens) or tokens[pos] != ("op", ")"):
+                raise ValueError(f"missing ')' in query: {text!r}")
+            pos += 1
+            return node
+        if (kind, value) == ("op", "*"):
+            pos += 1
+            return ("all",)
+        field = _FIELDS.get(value.lower()) if kind == "word" else None
+        if (field is None or pos + 2 >= len(tokens)
+                or tokens[pos + 1] != ("op", ":") or tokens[pos + 2][0] != "word"):
+            raise ValueError(f"expected 'field: value' at {value!r} in query: {text!r}")
+        pos += 3
+        return ("term", field, tokens[pos - 1][1])
+
+    node = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"unexpected {tokens[pos][1]!r} in query: {text!r}")
+    return node
+
+
+# ---------- public entry point ----------
+
+@timing.timed("select_chords")
 def select_chords(
     shapes_by_name: Dict[str, List[TabShape]],
     meta_by_name: Dict[str, dict],
     sets: dict,
     selection: str | Iterable[str] = "all",
 ) -> List[str]:
-    names = list(shapes_by_name.keys())
-
+    """
+    Chord names for a selection:
+      - a list/tuple of names (kept in the given order, unknown names dropped)
+      - a set defined in YAML: include ("*" or names), qualities, tags, sets
+        (other set names) and where (a query) are unioned, then exclude (names
+        or a query) is removed. A set may also be just a query string.
+      - 'all' / 'major' / 'minor'
+      - a query such as "tags: seventh AND NOT quality: minor"
+    Unknown tokens select nothing.
+    """
     # explicit list from user: ["C","Dm","G7"]
     if isinstance(selection, (list, tuple)):
         return [n for n in selection if n in shapes_by_name]
 
-    # named set in YAML
-    if isinstance(selection, str) and selection in sets:
-        rule = sets[selection] or {}
-        include = rule.get("include")
-        quals  = set(rule.get("qualities", []))
-        tags   = set(rule.get("tags", []))
-
-        picked = set()
-        if include == "*" or selection == "all":
-            picked.update(names)
-        elif isinstance(include, list):
-            picked.update([n for n in include if n in shapes_by_name])
-
-        if quals:
-            picked.update([n for n,m in meta_by_name.items() if m.get("quality") in quals])
-        if tags:
-            picked.update([n for n,m in meta_by_name.items() if m.get("tags") & tags])
-
-        return sorted(picked)
-
-    # convenience shortcuts
-    if selection == "all":
-        return sorted(names)
-    if selection == "major":
-        return sorted([n for n,m in meta_by_name.items() if m.get("quality") == "major"])
-    if selection == "minor":
-        return sorted([n for n,m in meta_by_name.items() if m.get("quality") == "minor"])
-
-    # unknown token → fallback to empty (or all, your call)
-    return []
+    return chord_index(shapes_by_name, meta_by_name).select(sets or {}, selection)
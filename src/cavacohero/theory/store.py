@@ -0,0 +1,248 @@
+# src/cavacohero/theory/store.py
+"""
+Columnar chord storage.
+
+All shapes of a library live in one contiguous int8 matrix (one row per shape,
+one column per string, MUTE for 'x'). Chords are integer ids 0..n-1 in library
+order; offsets[i]:offsets[i+1] are the rows of chord i. Qualities and tags are
+interned into small integer codes (tags as a CSR list per chord).
+
+TabShape objects are only created when someone asks for them, through the
+dict-like views 'shapes_by_name' and 'meta_by_name'.
+"""
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+from .tabs import TabShape, Fret, MUTE, MAX_FRET, intern_shape
+
+NO_QUALITY = -1           # quality code for chords without a quality
+
+
+def _intern(value, vocab: list, lookup: dict) -> int:
+    code = lookup.get(value)
+    if code is None:
+        code = lookup[value] = len(vocab)
+        vocab.append(value)
+    return code
+
+
+class ChordStore:
+    def __init__(
+        self,
+        tuning: Sequence[str],
+        names: Sequence[str],
+        frets: np.ndarray,
+        offsets: np.ndarray,
+        qualities: Sequence,
+        quality_codes: np.ndarray,
+        tags: Sequence,
+        tag_offsets: np.ndarray,
+        tag_codes: np.ndarray,
+    ):
+        self.tuning = tuple(tuning)
+        self.names = tuple(names)
+        self.frets = frets
+        self.offsets = offsets
+        self.qualities = tuple(qualities)
+        self.quality_codes = quality_codes
+        self.tags = tuple(tags)
+        self.tag_offsets = tag_offsets
+        self.tag_codes = tag_codes
+        self._ids = {n: i for i, n in enumerate(self.names)}
+        self.shapes_by_name = ShapesView(self)
+        self.meta_by_name = MetaView(self)
+
+    # ---------- building ----------
+    @classmethod
+    def build(cls, tuning: Sequence[str], chords: Iterable[tuple]) -> "ChordStore":
+        """
+        chords: iterable of (name, quality, tags, variants) where variants is a
+        list of fret tuples (ints >= 0 or 'x').
+        """
+        strings = len(tuning)
+        names: list[str] = []
+        rows: list[tuple] = []
+        counts: list[int] = []
+        quals: list = []
+        tag_lists: list = []
+        for name, quality, tags, variants in chords:
+            names.append(name)
+            quals.append(quality)
+            tag_lists.append(tuple(tags or ()))
+            counts.append(len(variants))
+            for frets in variants:
+                if len(frets) != strings:
+                    raise ValueError(f"{name}: expected {strings} strings, got {len(frets)}")
+                rows.append(tuple(MUTE if isinstance(f, str) else f for f in frets))
+
+        try:
+            matrix = np.array(rows, dtype=np.int8).reshape(len(rows), strings)
+        except OverflowError:
+            raise ValueError(f"fret numbers above {MAX_FRET} are not supported") from None
+        return cls.from_matrix(tuning, names, quals, tag_lists, matrix, counts)
+
+    @classmethod
+    def from_matrix(cls, tuning: Sequence[str], names: Sequence[str], quals: Sequence, tag_lists: Sequence,
+                    matrix: np.ndarray, counts: Sequence[int]) -> "ChordStore":
+        """Build from an already decoded (n_shapes, strings) int8 fret matrix and shapes per chord."""
+        offsets = np.zeros(len(names) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+
+        qualities: list = []
+        q_lookup: dict = {}
+        q_codes = [NO_QUALITY if q is None else _intern(q, qualities, q_lookup) for q in quals]
+        tags: list = []
+        t_lookup: dict = {}
+        t_codes = [_intern(t, tags, t_lookup) for ts in tag_lists for t in ts]
+        t_offsets = np.zeros(len(names) + 1, dtype=np.int32)
+        np.cumsum([len(t) for t in tag_lists], out=t_offsets[1:])
+
+        return cls(
+            tuning, names, matrix, offsets,
+            qualities, np.array(q_codes, dtype=np.int16),
+            tags, t_offsets, np.array(t_codes, dtype=np.int16),
+        )
+
+    @classmethod
+    def from_dicts(cls, tuning, shapes_by_name: Mapping, meta_by_name: Mapping) -> "ChordStore":
+        """Build from the classic {name: [TabShape]} / {name: {quality, tags}} pair."""
+        return cls.build(tuning, (
+            (name, (meta_by_name.get(name) or {}).get("quality"),
+             sorted((meta_by_name.get(name) or {}).get("tags", ())),
+             [s.frets for s in shapes])
+            for name, shapes in shapes_by_name.items()
+        ))
+
+    # ---------- snapshot ----------
+    def to_state(self) -> dict:
+        return {
+            "tuning": self.tuning, "names": self.names,
+            "frets": self.frets, "offsets": self.offsets,
+            "qualities": self.qualities, "quality_codes": self.quality_codes,
+            "tags": self.tags, "tag_offsets": self.tag_offsets, "tag_codes": self.tag_codes,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ChordStore":
+        return cls(**state)
+
+    # ---------- chord-level access ----------
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._ids
+
+    @property
+    def n_shapes(self) -> int:
+        return int(self.frets.shape[0])
+
+    @property
+    def strings(self) -> int:
+        return int(self.frets.shape[1])
+
+    def chord_id(self, name: str) -> int:
+        return self._ids[name]
+
+    def ids(self, names: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._ids[n] for n in names), dtype=np.int32)
+
+    def rows(self, name: str) -> np.ndarray:
+        """Fret matrix rows (view) of all variants of 'name'."""
+        i = self._ids[name]
+        return self.frets[self.offsets[i]:self.offsets[i + 1]]
+
+    def variant_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def chord_of_shape(self) -> np.ndarray:
+        """Chord id of every row of the fret matrix."""
+        return np.repeat(np.arange(len(self.names), dtype=np.int32), self.variant_counts())
+
+    def quality(self, i: int):
+        code = int(self.quality_codes[i])
+        return None if code == NO_QUALITY else self.qualities[code]
+
+    def tags_of(self, i: int) -> frozenset:
+        return frozenset(self.tag_list(i))
+
+    def tag_list(self, i: int) -> list:
+        """Tags of chord i in library order."""
+        lo, hi = self.tag_offsets[i], self.tag_offsets[i + 1]
+        return [self.tags[c] for c in self.tag_codes[lo:hi]]
+
+    def quality_mask(self, qualities: Iterable) -> np.ndarray:
+        """Boolean array over chord ids: quality in 'qualities'."""
+        codes = [self.qualities.index(q) for q in qualities if q in self.qualities]
+        return np.isin(self.quality_codes, codes)
+
+    def tag_mask(self, tags: Iterable) -> np.ndarray:
+        """Boolean array over chord ids: has any of 'tags'."""
+        codes = [self.tags.index(t) for t in tags if t in self.tags]
+        hit = np.isin(self.tag_codes, codes)
+        owner = np.repeat(np.arange(len(self.names)), np.diff(self.tag_offsets))
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[owner[hit]] = True
+        return mask
+
+    # ---------- shape views ----------
+    def shape(self, name: str, variant: int = 0) -> TabShape:
+        i = self._ids[name]
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        if not 0 <= variant < hi - lo:
+            raise IndexError(f"{name}: no variant {variant}")
+        return self._tab(name, self.frets[lo + variant])
+
+    def shapes(self, name: str) -> list[TabShape]:
+        return [self._tab(name, row) for row in self.rows(name)]
+
+    @staticmethod
+    def _tab(name: str, row: np.ndarray) -> TabShape:
+        frets: tuple[Fret, ...] = tuple("x" if f == MUTE else f for f in row.tolist())
+        return intern_shape(name, frets)
+
+
+class ShapesView(Mapping):
+    """Read-only {name: [TabShape, ...]} view of a ChordStore."""
+
+    def __init__(self, store: ChordStore):
+        self.store = store
+
+    def __getitem__(self, name) -> list[TabShape]:
+        if name not in self.store:
+            raise KeyError(name)
+        return self.store.shapes(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self.store
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.names)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+class MetaView(Mapping):
+    """Read-only {name: {"quality": ..., "tags": frozenset}} view of a ChordStore."""
+
+    def __init__(self, store: ChordStore):
+        self.store = store
+
+    def __getitem__(self, name) -> dict:
+        if name not in self.store:
+            raise KeyError(name)
+        i = self.store.chord_id(name)
+        return {"quality": self.store.quality(i), "tags": self.store.tags_of(i)}
+
+    def __contains__(self, name) -> bool:
+        return name in self.store
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.names)
+
+    def __len__(self) -> int:
+        return len(self.store)
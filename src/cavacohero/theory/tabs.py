@@ -1,9 +1,15 @@
 # src/cavacohero/theory/tabs.py
+import weakref
 from dataclasses import dataclass
-from typing import Union, Sequence
+from typing import List, NamedTuple, Tuple, Union, Sequence
+
+import numpy as np
 
 Fret = Union[int, str]  # int >= 0 or "x"
 
+MUTE = -1                          # a muted string in fret arrays (see store.py)
+MAX_FRET = np.iinfo(np.int8).max   # fret arrays are int8
+
 @dataclass(frozen=True)
 class TabShape:
     name: str
@@ -23,6 +29,18 @@ class TabShape:
                 raise ValueError(f"{self.name}: invalid fret type {type(f)}")
 
 
+_INTERNED: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+
+def intern_shape(name: str, frets: tuple) -> TabShape:
+    """One shared TabShape per (name, frets) while anyone holds it, however many views or files produce it."""
+    key = (name, frets)
+    shape = _INTERNED.get(key)
+    if shape is None:
+        shape = _INTERNED[key] = TabShape(name=name, frets=frets)
+    return shape
+
+
 # src/cavacohero/theory/tabs.py
 
 def parse_cavaco_shape(name: str, encoded: Sequence[Union[int, str]], strings_expected: int = 4) -> TabShape:
@@ -31,6 +49,7 @@ def parse_cavaco_shape(name: str, encoded: Sequence[Union[int, str]], strings_ex
     Supports multi-digit frets, e.g. 112 -> string 1, fret 12.
     Order in the list must be strings_expected → ... → 1 (e.g., 4,3,2,1 for cavaco).
     'x' or 'X' = mute.
+    Whole libraries go through parse_shapes() below, which reports every bad token at once.
     """
     if len(encoded) != strings_expected:
         raise ValueError(f"{name}: expected {strings_expected} items (strings {strings_expected}→…→1), got {len(encoded)}")
@@ -70,3 +89,94 @@ def parse_cavaco_shape(name: str, encoded: Sequence[Union[int, str]], strings_ex
     shape.validate(strings_expected)
     return shape
 
+
+
+# ---------- bulk parsing ----------
+
+class ShapeEncoding(NamedTuple):
+    """
+    How a token splits into string and fret: the first 'string_digits'
+    digits are the string, the rest the fret. One digit covers up to 9
+    strings; with two, '1003' is string 10 fret 3 and '0512' string 5 fret 12.
+    """
+    string_digits: int = 1
+
+    @classmethod
+    def for_strings(cls, strings: int, string_digits: int | None = None) -> "ShapeEncoding":
+        digits = string_digits or len(str(strings))
+        if digits < len(str(strings)):
+            raise ValueError(f"{digits} string digit(s) cannot encode {strings} strings")
+        return cls(digits)
+
+
+class TokenError(NamedTuple):
+    shape: int              # row in the batch
+    token: int | None       # position in the shape; None when the shape itself is wrong
+    message: str
+
+
+def parse_shapes(rows: Sequence[Sequence], strings: int,
+                 encoding: ShapeEncoding | None = None) -> Tuple[np.ndarray, List[TokenError]]:
+    """
+    Decode many encoded shapes at once (see parse_cavaco_shape for the format).
+    Returns an (n, strings) int8 fret array (MUTE for 'x'; rows with errors
+    are left as zeros) and every problem found, in row/token order, instead
+    of stopping at the first.
+    """
+    encoding = encoding or ShapeEncoding.for_strings(strings)
+    d = encoding.string_digits
+    frets = np.zeros((len(rows), strings), dtype=np.int8)
+    errors: List[TokenError] = []
+
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    whole = np.flatnonzero(lengths == strings)
+    for i in np.flatnonzero(lengths != strings).tolist():
+        errors.append(TokenError(i, None, f"expected {strings} items (strings {strings}→…→1), got {lengths[i]}"))
+    if len(whole) == 0:
+        return frets, errors
+
+    kept = [rows[i] for i in whole.tolist()] if len(whole) < len(rows) else rows
+    try:
+        text = np.array(kept, dtype=str).reshape(len(whole), strings)
+    except ValueError:                                       # a token that is itself a list/mapping
+        text = np.array([[str(t) for t in row] for row in kept], dtype=str).reshape(len(whole), strings)
+    # Decode straight from the UTF-32 code points of the fixed-width string array:
+    # digits are code - '0', and each one is weighted by its place in the string or fret part.
+    width_max = text.dtype.itemsize // 4
+    codes = text.view(np.uint32).reshape(len(whole), strings, width_max).astype(np.int64)
+    width = (codes != 0).sum(axis=2)
+    pos = np.arange(width_max)
+    mute = (width == 1) & ((codes[..., 0] == ord("x")) | (codes[..., 0] == ord("X")))
+    numeric = (((codes >= ord("0")) & (codes <= ord("9"))) | (codes == 0)).all(axis=2)
+    numeric &= (width > 0) & (width <= 18)                   # fits an int64
+    digits = np.where(numeric[..., None], codes - ord("0"), 0)
+
+    head = np.minimum(width, d)[..., None]                   # a token of only the string digits means fret 0
+    in_string = pos < head
+    in_fret = (pos >= d) & (pos < width[..., None])
+    string = (digits * np.where(in_string, 10 ** np.clip(head - 1 - pos, 0, None), 0)).sum(axis=2)
+    fret = (digits * np.where(in_fret, 10 ** np.clip(width[..., None] - 1 - pos, 0, None), 0)).sum(axis=2)
+    expected = strings - np.arange(strings)
+
+    bad = ~mute & ~numeric
+    out_of_range = numeric & ((string < 1) | (string > strings))
+    misplaced = numeric & ~out_of_range & (string != expected)
+    too_high = numeric & ~out_of_range & ~misplaced & (fret > MAX_FRET)
+    problem = bad | out_of_range | misplaced | too_high
+
+    frets[whole] = np.where(mute, MUTE, np.where(problem, 0, fret)).astype(np.int8)
+    for r, c in zip(*np.nonzero(problem)):
+        token, i = text[r, c], int(whole[r])
+        if bad[r, c]:
+            message = f"token '{token}' must be an integer like 42 or 'x'"
+        elif out_of_range[r, c]:
+            message = f"string {string[r, c]} out of range 1..{strings} in token '{token}'"
+        elif misplaced[r, c]:
+            message = (f"token '{token}' says string {string[r, c]} but position expects string {expected[c]} "
+                       f"(order must be {strings}→…→1)")
+        else:
+            message = f"fret {fret[r, c]} in token '{token}' is above {MAX_FRET}"
+        errors.append(TokenError(i, int(c), message))
+        frets[i] = 0
+    errors.sort(key=lambda e: (e.shape, -1 if e.token is None else e.token))
+    return frets, errors
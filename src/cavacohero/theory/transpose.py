@@ -0,0 +1,195 @@
+# src/cavacohero/theory/transpose.py
+"""
+Movable shapes: one fingering, every key.
+
+A chord marked 'movable' in the library stands for all twelve roots: its
+shapes slide up or down the neck (every sounding string moves, so open
+strings become a barre). TransposedStore is a ChordStore whose names include
+those derived chords ('C' movable -> 'C#', 'D', ... 'B') but whose fret
+matrix holds only the typed shapes. Which keys exist, and how many shapes
+each has, is worked out up front from every movable shape's lowest and
+highest fret (one vectorized pass over all 11 shifts); the frets of a
+derived chord are made the first time someone asks for them and cached.
+
+Explicit chords always win: a key the library spells out itself (in any
+spelling, 'Db' for 'C#') is not derived.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from ..instrument.cavaco import CAVACO
+from .notes import ROOT_NAMES, pitch_class, split_note
+from .search import chord_key
+from .store import ChordStore, ShapesView, MetaView, MUTE
+
+
+def transposed_name(name: str, semitones: int) -> str | None:
+    """'Am7' up 2 -> 'Bm7', 'C/E' up 1 -> 'C#/F'; None if 'name' has no note root."""
+    try:
+        root, rest = split_note(name)
+        pc = pitch_class(root)
+    except ValueError:
+        return None
+    head, slash, bass = rest.rpartition("/")
+    if slash and head not in ("6", "m6"):           # a slash bass, not '6/9'
+        try:
+            rest = f"{head}/{ROOT_NAMES[(pitch_class(bass) + semitones) % 12]}"
+        except ValueError:
+            pass
+    return ROOT_NAMES[(pc + semitones) % 12] + rest
+
+
+class TransposedStore(ChordStore):
+    """
+    A ChordStore plus the transpositions of its movable chords. Metadata of
+    a derived chord (quality, tags) is its source's; its shapes are built on
+    first access. 'frets'/'offsets' expand everything (identify and bulk
+    exports need them), so everyday access goes through rows()/shapes().
+    """
+
+    def __init__(self, base: ChordStore, movable: Iterable[str], max_fret: int = CAVACO.max_fret):
+        self.base = base
+        self.max_fret = int(max_fret)
+        self.movable = tuple(n for n in dict.fromkeys(movable) if n in base)
+        self.tuning = base.tuning
+        self.qualities = base.qualities
+        self.tags = base.tags
+
+        # keys the library spells out itself, whatever the spelling
+        taken = {chord_key(n) for n in base.names} - {None}
+        src_ids = [base.chord_id(n) for n in self.movable]
+        counts = self._placements(src_ids)              # (movable, 12) shapes per shift
+
+        names: List[str] = list(base.names)
+        source: List[int] = list(range(len(base)))
+        shift: List[int] = [0] * len(base)
+        n_shapes: List[int] = list(base.variant_counts().tolist())
+        seen = set(names)
+        for j, i in enumerate(src_ids):
+            for s in range(1, 12):
+                if not counts[j, s]:
+                    continue
+                name = transposed_name(base.names[i], s)
+                if name is None or name in seen or chord_key(name) in taken:
+                    continue
+                seen.add(name)
+                taken.add(chord_key(name))
+                names.append(name)
+                source.append(i)
+                shift.append(s)
+                n_shapes.append(int(counts[j, s]))
+
+        self.names = tuple(names)
+        self.source = np.array(source, dtype=np.int32)     # base chord id of every name
+        self.shift = np.array(shift, dtype=np.int8)        # semitones up from it
+        self._counts = np.array(n_shapes, dtype=np.int32)
+        self._ids = {n: i for i, n in enumerate(self.names)}
+        self._made: Dict[int, np.ndarray] = {}
+        self._all = None
+
+        self.quality_codes = base.quality_codes[self.source]
+        tag_counts = np.diff(base.tag_offsets)[self.source]
+        self.tag_offsets = np.zeros(len(self.names) + 1, dtype=np.int32)
+        np.cumsum(tag_counts, out=self.tag_offsets[1:])
+        starts = np.repeat(base.tag_offsets[self.source] - self.tag_offsets[:-1], tag_counts)
+        self.tag_codes = base.tag_codes[starts + np.arange(int(self.tag_offsets[-1]))]
+
+        self.shapes_by_name = ShapesView(self)
+        self.meta_by_name = MetaView(self)
+
+    # ---------- which shifts fit on the neck ----------
+    def _bounds(self, rows: np.ndarray):
+        sounding = rows != MUTE
+        lo = np.where(sounding, rows, np.iinfo(np.int8).max).min(axis=1).astype(np.int16)
+        hi = np.where(sounding, rows, -1).max(axis=1).astype(np.int16)
+        return lo, hi
+
+    def _fits(self, lo: np.ndarray, hi: np.ndarray):
+        """(rows, 12) bools: shape moved up s frets fits, moved down 12 - s frets fits."""
+        s = np.arange(12, dtype=np.int16)[None, :]
+        up = hi[:, None] + s <= self.max_fret
+        down = (lo[:, None] + s - 12 >= 0) & (s > 0)
+        return down, up
+
+    def _placements(self, src_ids: List[int]) -> np.ndarray:
+        if not src_ids:
+            return np.zeros((0, 12), dtype=np.int32)
+        rows = [self.base.rows(self.base.names[i]) for i in src_ids]
+        lo, hi = self._bounds(np.concatenate(rows))
+        down, up = self._fits(lo, hi)
+        per_shape = down.astype(np.int32) + up
+        starts = np.cumsum([0] + [len(r) for r in rows[:-1]])
+        return np.add.reduceat(per_shape, starts, axis=0)
+
+    # ---------- lazy rows ----------
+    def rows(self, name: str) -> np.ndarray:
+        i = self._ids[name]
+        if self.shift[i] == 0:
+            return self.base.rows(name)
+        made = self._made.get(i)
+        if made is None:
+            made = self._made[i] = self._transpose(int(self.source[i]), int(self.shift[i]))
+        return made
+
+    def _transpose(self, src: int, s: int) -> np.ndarray:
+        rows = self.base.rows(self.base.names[src]).astype(np.int16)
+        lo, hi = self._bounds(rows)
+        down, up = self._fits(lo, hi)
+        sounding = rows != MUTE
+        cand = np.stack([rows + (s - 12), rows + s], axis=1)
+        keep = np.stack([down[:, s], up[:, s]], axis=1)
+        out = np.where(np.stack([sounding, sounding], axis=1), cand, MUTE)[keep]
+        # lowest hand position first; the library's variant order breaks ties
+        out = out[np.argsort(self._bounds(out)[0], kind="stable")].astype(np.int8)
+        out.flags.writeable = False
+        return out
+
+    @property
+    def materialized(self) -> int:
+        """Derived chords whose shapes have been built so far."""
+        return len(self._made)
+
+    # ---------- ChordStore API that needs the derived shapes ----------
+    def variant_counts(self) -> np.ndarray:
+        return self._counts
+
+    @property
+    def n_shapes(self) -> int:
+        return int(self._counts.sum())
+
+    @property
+    def strings(self) -> int:
+        return self.base.strings
+
+    def shape(self, name: str, variant: int = 0):
+        rows = self.rows(name)
+        if not 0 <= variant < len(rows):
+            raise IndexError(f"{name}: no variant {variant}")
+        return self._tab(name, rows[variant])
+
+    def _expand(self):
+        if self._all is None:
+            frets = np.concatenate([self.rows(n) for n in self.names]) if self.names \
+                else self.base.frets[:0]
+            offsets = np.zeros(len(self.names) + 1, dtype=np.int32)
+            np.cumsum(self._counts, out=offsets[1:])
+            self._all = (frets, offsets)
+        return self._all
+
+    @property
+    def frets(self) -> np.ndarray:
+        return self._expand()[0]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._expand()[1]
+
+
+def with_movable(store: ChordStore, movable: Iterable[str], max_fret: int | None = None) -> ChordStore:
+    """'store' extended with the other keys of its 'movable' chords (the store itself if there are none)."""
+    movable = [n for n in movable if n in store]
+    if not movable:
+        return store
+    return TransposedStore(store, movable, CAVACO.max_fret if max_fret is None else max_fret)
@@ -0,0 +1,189 @@
+# src/cavacohero/theory/voicings.py
+"""
+Voicing generator: every playable fingering of a chord on an Instrument.
+
+fret_grid() enumerates, once per (tuning, max_fret, rules), every fingering
+that satisfies the physical rules (fret span, mutes, fingers) as one NumPy
+array, together with the pitch classes each one sounds as a 12-bit mask. A
+chord is then two mask comparisons over that array (only chord tones, all
+required tones present), ranked by position, span, mutes and root in the
+bass. Results are cached per (tuning, root, formula, rules), so a full
+12-key library is a few hundred vectorized passes.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from ..instrument.cavaco import Instrument, CAVACO
+from .notes import ROOT_NAMES, pitch_class, pc_mask
+from .store import ChordStore, MUTE
+from .tabs import TabShape
+
+
+class Formula(NamedTuple):
+    quality: str
+    suffix: str                        # appended to the root in chord names
+    intervals: Tuple[int, ...]         # semitones above the root
+    optional: Tuple[int, ...] = ()     # intervals a voicing may leave out
+    tags: Tuple[str, ...] = ()
+
+
+_F = [
+    Formula("major", "", (0, 4, 7), tags=("triad",)),
+    Formula("minor", "m", (0, 3, 7), tags=("triad",)),
+    Formula("diminished", "dim", (0, 3, 6), tags=("triad",)),
+    Formula("augmented", "aug", (0, 4, 8), tags=("triad",)),
+    Formula("sus2", "sus2", (0, 2, 7), tags=("triad", "sus")),
+    Formula("sus4", "sus4", (0, 5, 7), tags=("triad", "sus")),
+    Formula("dominant7", "7", (0, 4, 7, 10), (7,), ("seventh",)),
+    Formula("major7", "maj7", (0, 4, 7, 11), (7,), ("seventh",)),
+    Formula("minor7", "m7", (0, 3, 7, 10), (7,), ("seventh",)),
+    Formula("half-diminished", "m7b5", (0, 3, 6, 10), tags=("seventh",)),
+    Formula("diminished7", "dim7", (0, 3, 6, 9), tags=("seventh",)),
+    Formula("minor-major7", "m(maj7)", (0, 3, 7, 11), (7,), ("seventh",)),
+    Formula("7sus4", "7sus4", (0, 5, 7, 10), (7,), ("seventh", "sus")),
+    Formula("augmented7", "7#5", (0, 4, 8, 10), tags=("seventh",)),
+    Formula("sixth", "6", (0, 4, 7, 9), (7,), ("sixth",)),
+    Formula("minor6", "m6", (0, 3, 7, 9), (7,), ("sixth",)),
+    Formula("add9", "add9", (0, 4, 7, 14), (7,), ("added",)),
+    Formula("6/9", "6/9", (0, 4, 7, 9, 14), (7,), ("sixth", "extended")),
+    Formula("dominant9", "9", (0, 4, 7, 10, 14), (7,), ("seventh", "extended")),
+    Formula("major9", "maj9", (0, 4, 7, 11, 14), (7,), ("seventh", "extended")),
+    Formula("minor9", "m9", (0, 3, 7, 10, 14), (7,), ("seventh", "extended")),
+    Formula("dominant7b9", "7b9", (0, 4, 7, 10, 13), (7,), ("seventh", "extended")),
+]
+FORMULAS: Dict[str, Formula] = {f.quality: f for f in _F}
+_BY_SUFFIX: Dict[str, Formula] = {f.suffix: f for f in _F}
+
+
+def formula_for(text: str) -> Formula:
+    """A Formula by quality ('dominant7') or by chord-name suffix ('7', 'm7b5', '' for major)."""
+    formula = FORMULAS.get(text) or _BY_SUFFIX.get(text)
+    if formula is None:
+        raise ValueError(f"unknown chord quality '{text}' (known: {', '.join(FORMULAS)})")
+    return formula
+
+
+@dataclass(frozen=True)
+class Rules:
+    max_span: int = 3            # highest minus lowest fretted fret
+    max_mutes: int = 1
+    inner_mutes: bool = False    # allow a muted string between two sounding ones
+    max_fingers: int = 4         # fretted strings
+    root_in_bass: bool = False   # require the root on the lowest sounding string
+
+
+DEFAULT_RULES = Rules()
+
+
+class FretGrid(NamedTuple):
+    """Every playable fingering of an instrument under some Rules, whatever the chord."""
+    frets: np.ndarray        # (n, strings) int8, MUTE = muted
+    bits: np.ndarray         # pitch classes sounded, as a 12-bit mask
+    bass: np.ndarray         # pitch class of the lowest sounding string
+    score: np.ndarray        # chord-independent part of the ranking (lower is better)
+
+
+@lru_cache(maxsize=32)
+def fret_grid(tuning: Tuple[str, ...], max_fret: int, rules: Rules = DEFAULT_RULES) -> FretGrid:
+    open_pc = np.array([pitch_class(n) for n in tuning], dtype=np.int16)
+    strings = len(tuning)
+
+    # For each hand position w (lowest fretted fret) every string is muted, open,
+    # or fretted within [w, w + max_span]; crossing those short lists per window
+    # covers the playable part of the grid without its (max_fret + 2) ** strings bulk.
+    blocks, starts = [], []
+    for w in range(1, max_fret + 1):
+        choices = np.array([MUTE, 0, *range(w, min(w + rules.max_span, max_fret) + 1)], dtype=np.int16)
+        block = np.stack(np.meshgrid(*[choices] * strings, indexing="ij"), axis=-1).reshape(-1, strings)
+        blocks.append(block)
+        starts.append(np.full(len(block), w, dtype=np.int16))
+    grid = np.concatenate(blocks)
+    start = np.concatenate(starts)
+
+    played = grid != MUTE
+    fretted = grid > 0
+    n_played = played.sum(axis=1)
+    n_fretted = fretted.sum(axis=1)
+    lo = np.where(fretted, grid, max_fret + 1).min(axis=1)
+    hi = np.where(fretted, grid, -1).max(axis=1)
+    first = played.argmax(axis=1)
+    last = strings - 1 - played[:, ::-1].argmax(axis=1)
+
+    # each fingering once: in the window starting at its lowest fretted fret (all-open ones in the first)
+    keep = np.where(n_fretted > 0, lo == start, start == 1)
+    keep &= (hi - lo <= rules.max_span) | (n_fretted == 0)
+    keep &= (strings - n_played <= rules.max_mutes) & (n_fretted <= rules.max_fingers) & (n_played > 0)
+    if not rules.inner_mutes:
+        keep &= n_played == last - first + 1
+
+    grid, played, first = grid[keep], played[keep], first[keep]
+    n_fretted, lo, hi = n_fretted[keep], lo[keep], hi[keep]
+    pcs = (open_pc + grid) % 12
+    bits = np.bitwise_or.reduce(np.where(played, 1 << pcs, 0), axis=1).astype(np.uint16)
+    position = np.where(n_fretted > 0, lo, 0)
+    span = np.where(n_fretted > 0, hi - lo, 0)
+    score = position + 2.0 * span + 4.0 * (strings - played.sum(axis=1)) + 0.25 * n_fretted
+    return FretGrid(grid.astype(np.int8), bits, pcs[np.arange(len(grid)), first], score)
+
+
+@lru_cache(maxsize=4096)
+def _ranked(tuning: Tuple[str, ...], max_fret: int, root: int, formula: Formula, rules: Rules) -> np.ndarray:
+    """All voicings passing 'rules', best first, as a read-only (n, strings) int8 array (MUTE = muted)."""
+    grid = fret_grid(tuning, max_fret, rules)
+    chord = pc_mask(root + i for i in formula.intervals)
+    required = pc_mask(root + i for i in formula.intervals if i not in formula.optional)
+
+    # only chord tones, and at least the required ones
+    keep = ((grid.bits & (0xFFF & ~chord)) == 0) & ((grid.bits & required) == required)
+    if rules.root_in_bass:
+        keep &= grid.bass == root
+    hits = np.flatnonzero(keep)
+    score = grid.score[hits] + 1.5 * (grid.bass[hits] != root)
+    ranked = grid.frets[hits[np.argsort(score, kind="stable")]]
+    ranked.flags.writeable = False
+    return ranked
+
+
+def chord_name(root: int, formula: Formula) -> str:
+    return ROOT_NAMES[root % 12] + formula.suffix
+
+
+def voicings(
+    root: int | str,
+    formula: Formula | str,
+    instrument: Instrument = CAVACO,
+    rules: Rules = DEFAULT_RULES,
+    limit: int | None = None,
+    name: str | None = None,
+) -> List[TabShape]:
+    """Voicings of root + formula (a Formula, quality or suffix), best first, as TabShapes."""
+    if isinstance(root, str):
+        root = pitch_class(root)
+    if isinstance(formula, str):
+        formula = formula_for(formula)
+    rows = _ranked(tuple(instrument.tuning), instrument.max_fret, root % 12, formula, rules)
+    name = name or chord_name(root, formula)
+    return [TabShape(name, tuple("x" if f == MUTE else f for f in row))
+            for row in rows[:limit].tolist()]
+
+
+def generate_store(
+    instrument: Instrument = CAVACO,
+    roots: Iterable[int] = range(12),
+    formulas: Iterable[Formula] = FORMULAS.values(),
+    rules: Rules = DEFAULT_RULES,
+    limit: int | None = 6,
+) -> ChordStore:
+    """A ChordStore with the best 'limit' voicings of every root x formula (chords with none are left out)."""
+    tuning = tuple(instrument.tuning)
+    rows = []
+    for formula in formulas:
+        for root in roots:
+            ranked = _ranked(tuning, instrument.max_fret, root % 12, formula, rules)[:limit]
+            if len(ranked):
+                rows.append((chord_name(root, formula), formula.quality, list(formula.tags), ranked.tolist()))
+    return ChordStore.build(tuning, rows)
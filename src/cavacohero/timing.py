@@ -0,0 +1,208 @@
+# src/cavacohero/timing.py
+"""
+Where the time goes: timing spans and counters around the hot paths.
+
+Off by default. While off, span() hands back one shared do-nothing context
+manager, @timed functions call straight through after a single flag check
+and count() returns at once, so instrumented code pays a global lookup per
+call. enable() (the --profile flag) starts recording: every span appends
+(name, thread, start, duration) to a bounded buffer and counters add up in
+a dict. write_chrome_trace() saves the recording in the Chrome trace-event
+format (chrome://tracing, ui.perfetto.dev); summary() gives count, total
+and percentiles per span name for the end-of-session report.
+
+Only the standard library is used: the library loader imports this module.
+"""
+from __future__ import annotations
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+_on = False
+_events: deque = deque(maxlen=500_000)      # (name, thread id, start ns, duration ns, args)
+_counters: Dict[str, int] = {}
+_threads: Dict[int, str] = {}
+_origin = time.perf_counter_ns()
+_lock = threading.Lock()                    # counters only; deque.append is atomic
+
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _Noop()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict | None):
+        self.name, self.args = name, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        tid = threading.get_ident()
+        if tid not in _threads:
+            _threads[tid] = threading.current_thread().name
+        _events.append((self.name, tid, self.start, end - self.start, self.args))
+        return False
+
+
+# ---------- switching ----------
+
+def enabled() -> bool:
+    return _on
+
+
+def enable(max_events: int = 500_000) -> None:
+    """Start recording (from scratch); at most 'max_events' spans are kept, the newest."""
+    global _on, _events, _origin
+    reset()
+    _events = deque(maxlen=max_events)
+    _origin = time.perf_counter_ns()
+    _on = True
+
+
+def disable() -> None:
+    global _on
+    _on = False
+
+
+def reset() -> None:
+    _events.clear()
+    _counters.clear()
+    _threads.clear()
+
+
+# ---------- recording ----------
+
+def span(name: str, **args):
+    """Context manager timing the block as 'name' (args end up in the trace)."""
+    if not _on:
+        return _NOOP
+    return _Span(name, args or None)
+
+
+def timed(name: str | None = None):
+    """Decorator: every call is a span (named after the function unless 'name' is given)."""
+    def wrap(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not _on:
+                return func(*args, **kwargs)
+            with _Span(label, None):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def count(name: str, n: int = 1) -> None:
+    if not _on:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def events() -> list:
+    return list(_events)
+
+
+# ---------- reports ----------
+
+def summary() -> List[dict]:
+    """Per span name: count, total/mean/p50/p90/p99/max in ms; slowest total first."""
+    by_name: Dict[str, list] = {}
+    for name, _, _, dur, _ in list(_events):
+        by_name.setdefault(name, []).append(dur)
+    rows = []
+    for name, durs in by_name.items():
+        durs.sort()
+        pick = lambda q: durs[min(len(durs) - 1, int(q * len(durs)))] / 1e6
+        total = sum(durs) / 1e6
+        rows.append({"name": name, "count": len(durs), "total_ms": total, "mean_ms": total / len(durs),
+                     "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": durs[-1] / 1e6})
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+
+def format_summary() -> str:
+    rows = summary()
+    width = max([len(r["name"]) for r in rows] + [4])
+    lines = [f"{'span':<{width}} {'count':>7} {'total ms':>10} {'mean':>8} {'p50':>8} {'p90':>8} "
+             f"{'p99':>8} {'max':>8}"]
+    for r in rows:
+        lines.append(f"{r['name']:<{width}} {r['count']:>7} {r['total_ms']:>10.1f} {r['mean_ms']:>8.2f} "
+                     f"{r['p50_ms']:>8.2f} {r['p90_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}")
+    for name, value in sorted(counters().items()):
+        lines.append(f"{name}: {value}")
+    if len(_events) == _events.maxlen:
+        lines.append(f"(only the last {_events.maxlen} spans were kept)")
+    return "\n".join(lines)
+
+
+def chrome_trace() -> dict:
+    """The recording as a Chrome trace-event document (complete events, counters, thread names)."""
+    pid = os.getpid()
+    recorded = list(_events)
+    tids = {tid: i for i, tid in enumerate(dict.fromkeys(e[1] for e in recorded))}
+    out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": i, "args": {"name": _threads.get(tid, str(tid))}}
+           for tid, i in tids.items()]
+    end = 0.0
+    for name, tid, start, dur, args in recorded:
+        ts = (start - _origin) / 1000.0
+        end = max(end, ts + dur / 1000.0)
+        event = {"name": name, "cat": "cavacohero", "ph": "X", "ts": ts, "dur": dur / 1000.0,
+                 "pid": pid, "tid": tids[tid]}
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        out.append(event)
+    for name, value in sorted(counters().items()):
+        out.append({"name": name, "cat": "cavacohero", "ph": "C", "ts": end, "pid": pid, "args": {name: value}})
+    return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(chrome_trace()), encoding="utf-8")
+    return path
+
+
+@contextmanager
+def session(trace_path: Path | None, report=print):
+    """Record while the block runs (nothing at all if trace_path is None); then write the trace and report."""
+    if trace_path is None:
+        yield
+        return
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+        path = write_chrome_trace(trace_path)
+        if report is not None:
+            report(format_summary())
+            report(f"trace: {path} ({len(_events)} spans; open in chrome://tracing or ui.perfetto.dev)")
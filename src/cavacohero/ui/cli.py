@@ -1,9 +1,9 @@
 # src/cavacohero/ui/cli.py
-import time
+import sys
 from pathlib import Path
-import matplotlib.pyplot as plt
 
 from ..theory.library import load_library
+from .options import DEFAULT_LIBRARY
 
 # optional: advanced selector (if you created it)
 try:
@@ -11,12 +11,82 @@ try:
 except Exception:
     _select = None
 
-# draw functions
-from ..render.fretboard import draw_shape as draw_zoom
-from ..render.fretboard_full import draw_shape_full
+from ..engine.playback import Playback, period_from_bpm
+from ..engine.state import AppState, PracticeEngine, AGAIN, HARD, GOOD, EASY, GRADES, variants_per_chord
+from ..io.practice import PracticeLog, practice_path
+from .. import timing
+from ..instrument.cavaco import CAVACO
+from ..theory.progression import first_shapes, voiced_shapes
+from ..theory.search import resolve_names
 
-def run_cli():
-    data = load_library(Path("presets/chords.yaml"))
+# matplotlib (and with it the GUI backend) is imported on first draw, not here;
+# with renderer='ansi' it is never imported at all
+
+
+def _open_view(mode, tuning):
+    """One window per mode; its artists are reused for every chord."""
+    import matplotlib.pyplot as plt
+    from ..render.view import FretboardView
+
+    figsize = (3.2, 5.0) if mode == "zoom" else (3.2, 14.0)
+    fig, ax = plt.subplots(figsize=figsize, dpi=120 if mode == "zoom" else 85)
+    view = FretboardView(ax, tuning=tuning, mode=mode)
+    return fig, view
+
+
+class _FigureDisplay:
+    """Chords in a matplotlib window (renderer 'mpl')."""
+
+    def __init__(self, tuning, cache=None):
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        self.tuning = tuning
+        self.cache = cache
+        self.view = None
+
+    def open(self, mode, shape):
+        # a fresh window per mode keeps sizing simple/predictable
+        self.plt.close("all")
+        fig, self.view = _open_view(mode, self.tuning)
+        self.view.update(shape)
+        with timing.span("tight_layout"):
+            fig.tight_layout()
+        self.plt.show(block=False); self.plt.pause(0.01)
+
+    def show(self, shape):
+        # artists updated in place, redrawn on pause
+        self.view.update(shape)
+        self.plt.pause(0.01)
+
+    def autoplay(self, names, shapes, mode, delay, randomize, state=None):
+        autoplay(names, shapes, mode=mode, delay=delay, randomize=randomize, view=self.view,
+                 cache=self.cache, state=state)
+
+
+class _TextDisplay:
+    """Chords printed in the terminal (renderer 'ansi'); never imports matplotlib."""
+
+    def __init__(self, tuning, out=None):
+        self.tuning = tuning
+        self.out = out or sys.stdout
+        self.mode = "zoom"
+
+    def open(self, mode, shape):
+        self.mode = mode
+        self.show(shape)
+
+    def show(self, shape):
+        from ..render.ansi import render_text, use_color
+        print(render_text(shape, self.mode, self.tuning, color=use_color(self.out)), file=self.out)
+
+    def autoplay(self, names, shapes, mode, delay, randomize, state=None):
+        autoplay_text(names, shapes, mode=mode, delay=delay, randomize=randomize,
+                      tuning=self.tuning, out=self.out, state=state)
+
+
+def run_cli(library: Path = DEFAULT_LIBRARY, use_cache: bool = True, rebuild_cache: bool = False,
+            raster_cache=None, renderer: str = "mpl"):
+    data = load_library(library, use_cache=use_cache, rebuild_cache=rebuild_cache)
 
     # Support both loader signatures:
     #   old: (tuning, shapes)
@@ -34,7 +104,7 @@ def run_cli():
         # If you have the formal selector, use it
         if _select:
             if selection == "custom" and custom_list:
-                return [n for n in custom_list if n in shapes_by_name]
+                return resolve_names(custom_list, shapes_by_name)[0]
             return _select(shapes_by_name, meta_by_name, sets, selection)
 
         # Fallback (simple heuristics if you haven't added the selector yet)
@@ -53,16 +123,18 @@ def run_cli():
         return
 
     i = 0
+    # one variant per chord, chosen for the smoothest hand movement through the set
+    voiced = voiced_shapes(names, shapes_by_name)
 
-    # Start with a zoom window
-    fig, ax = plt.subplots(figsize=(3.2, 5.0), dpi=120)
-    draw_zoom(shapes_by_name[names[i]][0], ax=ax)
-    plt.show(block=False); plt.pause(0.01)
+    # Start in zoom mode
+    display = _TextDisplay(tuning) if renderer == "ansi" else _FigureDisplay(tuning, raster_cache)
+    display.open(mode, voiced[names[i]])
 
-    print("Commands: n p q | mode zoom|full | set all|major|minor|sevenths|my_progression|custom")
+    print("Commands: n p q | mode zoom|full | set all|major|minor|sevenths|my_progression|custom|<query> | auto | practice")
 
     while True:
-        cmd = input("> ").strip().lower()
+        line = input("> ").strip()
+        cmd = line.lower()
 
         if cmd == "q":
             break
@@ -77,85 +149,195 @@ def run_cli():
             _, _, token = cmd.partition(" ")
             if token in ("zoom", "full"):
                 mode = token
-                # Create a fresh window for each mode to keep sizing simple/predictable
-                plt.close('all')
-                if mode == "zoom":
-                    fig, ax = plt.subplots(figsize=(3.2, 5.0), dpi=120)
                 print(f"view: {mode}")
+                display.open(mode, voiced[names[i]])
             else:
                 print("Use: mode zoom|full")
                 continue
 
         elif cmd.startswith("set"):
-            _, _, token = cmd.partition(" ")
+            # keep the original case: queries may name chords ("set name: C7 OR tag: triad")
+            _, _, token = line.partition(" ")
+            token = token.strip()
             if token == "custom":
                 raw = input("Enter chords comma-separated: ")
                 custom = [s.strip() for s in raw.split(",") if s.strip()]
-                names = pick_names("custom", custom_list=custom)
+                names, missing = resolve_names(custom, shapes_by_name)
+                unknown = {typed for typed, _ in missing}
+                for typed, name in zip([c for c in custom if c not in unknown], names):
+                    if typed != name:
+                        print(f"  {typed} -> {name}")
+                for typed, suggestions in missing:
+                    hint = f" (did you mean {', '.join(suggestions)}?)" if suggestions else ""
+                    print(f"  unknown chord '{typed}'{hint}")
             else:
-                names = pick_names(token or "all")
+                try:
+                    names = pick_names(token or "all")
+                except ValueError as e:
+                    print(f"Bad set: {e}")
+                    continue
             i = 0
+            voiced = voiced_shapes(names, shapes_by_name)
             print(f"set: {token or 'all'} ({len(names)} chords)")
             if not names:
                 print("No chords matched that set.")
                 continue
             
+        elif cmd == "practice":
+            practice(names, shapes_by_name, display, library)
+            continue
+
         elif cmd.startswith("auto"):
+            # auto [seconds] [bpm N [beats M]] [random] [practice]
             parts = cmd.split()
             delay = 3.0
+            bpm = None
+            beats = 4.0
             randomize = False
+            practise = False
 
-            for p in parts[1:]:
+            it = iter(parts[1:])
+            for p in it:
                 if p.replace('.', '', 1).isdigit():
                     delay = float(p)
+                elif p in ("bpm", "beats"):
+                    value = next(it, "")
+                    if not value.replace('.', '', 1).isdigit() or float(value) <= 0:
+                        print(f"Use: auto {p} <positive number>")
+                        break
+                    if p == "bpm":
+                        bpm = float(value)
+                    else:
+                        beats = float(value)
                 elif p in ("random", "rand", "shuffle"):
                     randomize = True
-
-            autoplay(names, shapes_by_name, mode=mode, delay=delay, randomize=randomize)
+                elif p == "practice":
+                    practise = True
+            else:
+                if bpm is not None:
+                    delay = period_from_bpm(bpm, beats)
+                state = None
+                if practise:
+                    # one card per chord, the most overdue first; progress is kept between sessions
+                    state = PracticeEngine(names, tempo_s=delay, randomize=randomize,
+                                           log=PracticeLog(practice_path(library)))
+                # a shuffled order is not the one the variants were planned for
+                shapes = first_shapes(names, shapes_by_name) if randomize else voiced
+                try:
+                    display.autoplay(names, shapes, mode, delay, randomize, state=state)
+                finally:
+                    if state is not None:
+                        state.close()
             continue
 
         else:
-            print("Commands: n p q | mode zoom|full | set all|major|minor|sevenths|my_progression|custom")
+            print("Commands: n p q | mode zoom|full | set all|major|minor|sevenths|my_progression|custom|<query> | auto [s] [bpm N] [random] [practice] | practice")
             continue
 
         # Draw current chord in current mode
-        if mode == "zoom":
-            draw_zoom(shapes_by_name[names[i]][0], ax=ax)
-            plt.pause(0.01)
-        else:
-            # Full-neck always opens a tall figure so height changes actually stick
-            draw_shape_full(shapes_by_name[names[i]][0], height_in=14.0)
-            plt.show(block=False); plt.pause(0.01)
-
+        display.show(voiced[names[i]])
 
-import time
-import random
 
-def autoplay(names, shapes_by_name, mode="zoom", delay=3.0, randomize=False):
+def autoplay(names, shapes, mode="zoom", delay=3.0, randomize=False, view=None, cache=None, state=None):
     """
     Loop through given chord names, displaying each for 'delay' seconds
+    ('shapes' maps each name to the shape to show, e.g. voiced_shapes())
     in fullscreen until interrupted (Ctrl+C).
     If randomize=True, shuffle the order each time.
+    Reuses 'view' (a FretboardView) when given, else opens one window for the whole run.
+    With a RasterCache, chords seen before are blitted from their cached image and
+    the next chord is pre-rendered in the background while the current one shows.
+    Timing runs on absolute deadlines (see engine/playback.py), so it doesn't drift.
+    'state' replaces the AppState built from names/delay/randomize (e.g. a PracticeEngine).
     """
+    import matplotlib.pyplot as plt
+    from ..render.raster import show_cached, prerender
+
     plt.ion()
+    if view is None:
+        _, view = _open_view(mode, CAVACO.tuning)
+
+    def show(chord_name):
+        shape = shapes[chord_name]
+        if cache is not None:
+            show_cached(view, shape, cache, mode=mode)
+        else:
+            view.update(shape, mode=mode)
+            view.fig.canvas.draw_idle()
+        view.fig.canvas.flush_events()
+
+    prefetch = None
+    if cache is not None:
+        prefetch = lambda chord_name: prerender(view, shapes[chord_name], cache, mode=mode)
+    playback = Playback(state or AppState(names, tempo_s=delay, randomize=randomize), prefetch=prefetch)
     try:
-        while True:
-            chord_order = names.copy()
-            if randomize:
-                random.shuffle(chord_order)
-
-            for chord_name in chord_order:
-                if mode == "zoom":
-                    fig, ax = plt.subplots(figsize=(3.2, 5.0), dpi=120)
-                    draw_zoom(shapes_by_name[chord_name][0], ax=ax)
-                else:
-                    fig, ax = draw_shape_full(shapes_by_name[chord_name][0], height_in=14.0)
-
-                plt.pause(0.01)
-                time.sleep(delay)
-                plt.close(fig)
+        playback.run(show, wait=plt.pause)
     except KeyboardInterrupt:
-        print("\nAutoplay stopped.")
+        _report(playback, cache)
     finally:
+        playback.close()
         plt.ioff()
 
+
+def autoplay_text(names, shapes, mode="zoom", delay=3.0, randomize=False,
+                  tuning=CAVACO.tuning, out=None, state=None):
+    """
+    autoplay() in the terminal: the board is drawn once and afterwards only
+    the cells that change between chords are rewritten (see render/ansi.py).
+    Sleeps until each deadline, so it costs next to no CPU even at high rates.
+    """
+    from ..render.ansi import AnsiScreen, board_cells
+
+    screen = AnsiScreen(out)
+    show = lambda chord_name: screen.show(board_cells(shapes[chord_name], mode, tuning))
+    playback = Playback(state or AppState(names, tempo_s=delay, randomize=randomize))
+    screen.out.write("\x1b[?25l")            # hide the cursor while the board updates
+    try:
+        playback.run(show, max_wait=1.0)
+    except KeyboardInterrupt:
+        _report(playback)
+        shown = playback.jitter.summary()["count"] + 1
+        print(f"terminal: {screen.bytes_written / shown:.0f} bytes per chord")
+    finally:
+        playback.close()
+        screen.out.write("\x1b[?25h")
+        screen.out.flush()
+
+
+def practice(names, shapes_by_name, display, library=DEFAULT_LIBRARY, ask=input):
+    """
+    Spaced-repetition drill over every shape of 'names': show a card, read a
+    grade, show the card the engine picks next. Progress is saved per library
+    (see io/practice.py), so the next session picks up where this one stopped.
+    """
+    keys = {"1": AGAIN, "2": HARD, "3": GOOD, "4": EASY, "": GOOD, **GRADES}
+    engine = PracticeEngine(names, variants_per_chord(names, shapes_by_name),
+                            log=PracticeLog(practice_path(library)))
+    print("Grade each shape: 1 again, 2 hard, 3 good (Enter), 4 easy; q to stop")
+    try:
+        while engine.current_chord() is not None:
+            name, variant = engine.current_chord(), engine.current_variant()
+            display.show(shapes_by_name[name][variant])
+            answer = ask(f"{name} #{variant + 1}> ").strip().lower()
+            if answer == "q":
+                break
+            if answer not in keys:
+                print("Use 1-4 (again, hard, good, easy) or q")
+                continue
+            engine.next_chord(keys[answer])
+    except (KeyboardInterrupt, EOFError):
+        print()
+    finally:
+        engine.close()
+    st = engine.stats()
+    print(f"practice: {st['seen']}/{st['cards']} shapes seen, {st['due']} due, {st['lapses']} misses so far")
+    return st
+
+
+def _report(playback, cache=None):
+    print("\nAutoplay stopped.")
+    print(f"timing: {playback.jitter}")
+    if cache is not None:
+        st = cache.stats()
+        print(f"raster cache: {st['hits']} hits / {st['misses']} misses, "
+              f"{st['entries']} images, {st['bytes'] / 2**20:.1f} of {st['max_bytes'] / 2**20:.0f} MB")
@@ -0,0 +1,60 @@
+# src/cavacohero/ui/options.py
+"""Command-line options shared by the CLI and the Tk front end."""
+import argparse
+from pathlib import Path
+
+DEFAULT_LIBRARY = Path("presets/chords.yaml")
+
+
+class _AppendLibrary(argparse.Action):
+    """--library may be repeated; the first one given replaces the default."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        current = getattr(namespace, self.dest)
+        setattr(namespace, self.dest, ([] if current is self.default else current) + [values])
+
+
+def add_library_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--library", type=Path, action=_AppendLibrary, default=[DEFAULT_LIBRARY],
+                        help=f"chord library YAML; repeat to merge several, later ones win (default: {DEFAULT_LIBRARY})")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-cache", dest="use_cache", action="store_false",
+                       help="parse the YAML directly; don't read or write the library cache")
+    group.add_argument("--rebuild-cache", action="store_true",
+                       help="ignore any cached snapshot and write a fresh one")
+
+
+def library_kwargs(args: argparse.Namespace) -> dict:
+    """Keyword arguments for load_library() taken from parsed options."""
+    return {"use_cache": args.use_cache, "rebuild_cache": args.rebuild_cache}
+
+
+def add_render_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--raster-cache-mb", type=float, default=64.0, metavar="MB",
+                        help="memory budget for cached chord images (0 disables; default: 64)")
+
+
+def raster_cache(args: argparse.Namespace):
+    """RasterCache sized from the options, or None when disabled."""
+    if args.raster_cache_mb <= 0:
+        return None
+    from ..render.raster import RasterCache
+    return RasterCache(int(args.raster_cache_mb * 1024 * 1024))
+
+
+def add_profile_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", action="store_true",
+                        help="time the hot paths; on exit write a Chrome trace and print a summary")
+    parser.add_argument("--profile-out", type=Path, default=Path("cavacohero-trace.json"), metavar="TRACE",
+                        help="where --profile writes the trace (default: cavacohero-trace.json)")
+
+
+def profiling(args: argparse.Namespace):
+    """Context manager recording spans for the run when --profile was given (see timing.py)."""
+    from ..timing import session
+    return session(args.profile_out if getattr(args, "profile", False) else None)
+
+
+def add_reload_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--reload", type=float, default=1.0, metavar="S",
+                        help="check the library file for edits every S seconds (0 disables; default: 1)")
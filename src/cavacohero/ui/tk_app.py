@@ -1,15 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-import random
+import argparse
 from pathlib import Path
 
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-
 from ..theory.library import load_library
+from .options import (DEFAULT_LIBRARY, add_library_options, library_kwargs, add_render_options, raster_cache,
+                      add_reload_options, add_profile_options, profiling)
+from .. import timing
 
 # optional selector (if you created it); otherwise we fall back to simple rules
 try:
@@ -17,19 +15,21 @@ try:
 except Exception:
     _select = None
 
-# renderers
-from ..render.fretboard import draw_shape as draw_zoom
-from ..render.fretboard_full import draw_shape_full
+from ..engine.playback import Playback, period_from_bpm
+from ..engine.state import AppState, PracticeEngine, AGAIN, HARD, GOOD, EASY
+from ..theory.progression import first_shapes, voiced_shapes
+from ..theory.search import chord_search, resolve_names
 
 
 class CavacoHeroTk(tk.Tk):
-    def __init__(self):
+    def __init__(self, library: Path = DEFAULT_LIBRARY, use_cache: bool = True, rebuild_cache: bool = False,
+                 raster_cache=None, reload_interval: float = 1.0):
         super().__init__()
         self.title("CavacoHero")
         self.geometry("1280x860")
 
         # ---- data ----
-        data = load_library(Path("presets/chords.yaml"))
+        data = load_library(library, use_cache=use_cache, rebuild_cache=rebuild_cache)
         if len(data) == 4:
             self.tuning, self.shapes_by_name, self.meta_by_name, self.sets = data
         else:
@@ -41,12 +41,20 @@ class CavacoHeroTk(tk.Tk):
         self.mode = tk.StringVar(value="zoom")        # zoom | full
         self.current_set = tk.StringVar(value="all")  # all | major | minor | ...
         self.randomize = tk.BooleanVar(value=False)
+        self.practice = tk.BooleanVar(value=False)    # autoplay by spaced repetition, graded with 1-4
         self.period_s = tk.DoubleVar(value=3.0)
+        self.bpm = tk.DoubleVar(value=0.0)            # > 0 overrides the period
+        self.beats = tk.DoubleVar(value=4.0)          # beats per chord at that BPM
         self.custom_list = tk.StringVar(value="")     # e.g., "C, Dm, G7"
 
         self.names = self._pick_names("all")
         self.idx = 0
         self._autoplay_job = None
+        self._playback = None
+        self.raster_cache = raster_cache   # RasterCache or None
+        self._reload_note = ""             # last hot-reload result, shown in the status bar
+        self._render_note = ""             # last background render failure, likewise
+        self.library = library
 
         # ---- UI ----
         self._build_controls()
@@ -54,6 +62,14 @@ class CavacoHeroTk(tk.Tk):
 
         self._render()  # first draw
 
+        # ---- hot reload: poll the YAML, swap in the updated library ----
+        self._watcher = None
+        self._reload_ms = int(reload_interval * 1000)
+        if self._reload_ms > 0 and hasattr(self.shapes_by_name, "store"):
+            from ..io.watch import LibraryWatcher
+            self._watcher = LibraryWatcher(library, data, use_cache=use_cache)
+            self.after(self._reload_ms, self._poll_library)
+
     # ---------- UI BUILDERS ----------
     def _build_controls(self):
         bar = ttk.Frame(self)
@@ -68,12 +84,18 @@ class CavacoHeroTk(tk.Tk):
         ttk.Label(bar, text="Mode:").pack(side=tk.LEFT, padx=(12,4))
         mode_combo = ttk.Combobox(bar, values=["zoom","full"], textvariable=self.mode, width=8, state="readonly")
         mode_combo.pack(side=tk.LEFT)
-        mode_combo.bind("<<ComboboxSelected>>", lambda e: self._render())
+        mode_combo.bind("<<ComboboxSelected>>", self._on_mode_change)
 
         ttk.Label(bar, text="Custom:").pack(side=tk.LEFT, padx=(12,4))
         custom_entry = ttk.Entry(bar, textvariable=self.custom_list, width=24)
         custom_entry.pack(side=tk.LEFT)
+        # as-you-type completion of the chord being typed; Tab takes the first suggestion
+        custom_entry.bind("<KeyRelease>", self._on_custom_key)
+        custom_entry.bind("<Tab>", self._accept_completion)
+        custom_entry.bind("<Return>", lambda _e: self._apply_custom())
         ttk.Button(bar, text="Apply", command=self._apply_custom).pack(side=tk.LEFT, padx=(4,0))
+        self.suggestions = ttk.Label(bar, width=24, foreground="gray")
+        self.suggestions.pack(side=tk.LEFT, padx=(6,0))
 
         ttk.Separator(bar, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=10)
 
@@ -86,8 +108,16 @@ class CavacoHeroTk(tk.Tk):
         period = ttk.Spinbox(bar, from_=0.2, to=60.0, increment=0.2, width=6, textvariable=self.period_s)
         period.pack(side=tk.LEFT)
 
+        ttk.Label(bar, text="BPM:").pack(side=tk.LEFT, padx=(8,4))
+        ttk.Spinbox(bar, from_=0, to=400, increment=5, width=5, textvariable=self.bpm).pack(side=tk.LEFT)
+        ttk.Label(bar, text="Beats:").pack(side=tk.LEFT, padx=(6,4))
+        ttk.Spinbox(bar, from_=1, to=16, increment=1, width=3, textvariable=self.beats).pack(side=tk.LEFT)
+
         rnd = ttk.Checkbutton(bar, text="Random", variable=self.randomize)
         rnd.pack(side=tk.LEFT, padx=(10,0))
+        ttk.Checkbutton(bar, text="Practice", variable=self.practice).pack(side=tk.LEFT, padx=(6,0))
+        for key, grade in (("1", AGAIN), ("2", HARD), ("3", GOOD), ("4", EASY)):
+            self.bind(f"<Key-{key}>", lambda e, g=grade: self._grade(e, g))
 
         self.start_btn = ttk.Button(bar, text="Start", command=self.start_autoplay)
         self.start_btn.pack(side=tk.LEFT, padx=(10,2))
@@ -99,40 +129,99 @@ class CavacoHeroTk(tk.Tk):
         self.status.pack(side=tk.BOTTOM, fill=tk.X)
 
     def _build_canvas(self):
+        # matplotlib is imported here, once the window exists, not at module import.
+        # The canvas is embedded directly (no pyplot), so no global backend switch is needed.
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from ..render.view import FretboardView
+
         # Create one persistent Figure/Axes so the plot doesn't jump around
-        self.fig = plt.Figure(figsize=(5.0, 6.0), dpi=120)   # fixed size inside the window
+        self.fig = Figure(figsize=(5.0, 6.0), dpi=120)   # fixed size inside the window
         self.ax = self.fig.add_subplot(111)
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=(0,10))
 
+        # grid/labels are drawn once per window change; dots, mutes and title are blitted
+        self.view = FretboardView(self.ax, tuning=self.tuning, mode=self.mode.get(), blit=True)
+
+        # Diagrams are rendered off-screen on a worker thread and copied into the
+        # canvas here, so a slow full-neck draw never blocks the UI; when the
+        # worker falls behind, intermediate chords are skipped, not queued.
+        from ..render.worker import FrameWorker
+        self._frames = FrameWorker(self._render_frame)
+        self._frame_poll = None
+        self._shown_seq = 0
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
     # ---------- RENDER ----------
     def _render(self):
         if not self.names:
-            self.ax.clear()
-            self.ax.set_title("No chords in selection")
-            self.canvas.draw()
+            self.view.show(None, mode=self.mode.get())
+            self._update_status()
             return
 
         chord_name = self.names[self.idx]
-        shape = self.shapes_by_name[chord_name][0]
+        shape = self._shape(chord_name)
+        mode = self.mode.get()
 
-        # Clear the existing axes and redraw in-place to keep layout stable
-        self.ax.clear()
-        try:
-            if self.mode.get() == "zoom":
-                draw_zoom(shape, ax=self.ax)
-            else:
-                # prefer API that accepts ax; if your version returns (fig,ax), draw again onto our ax
-                out = draw_shape_full(shape, ax=self.ax)
-                # some versions may return (fig, ax); ignore result—we already drew into self.ax
-        except TypeError:
-            # Fallback: newer draw_shape_full may not accept ax; draw then copy image (rare). Simpler: warn.
-            self.ax.text(0.5, 0.5, "Update render/fretboard_full.py to accept ax=...", ha="center")
-        self.canvas.draw()
+        # The on-screen artists follow along (cheap, no drawing) so a resize redraw
+        # shows the right chord; the pixels come from the worker.
+        from ..render.raster import view_geometry
+        self.view.update(shape, mode=mode)
+        self._frames.submit((shape, view_geometry(self.view, mode)))
+        if self._frame_poll is None:
+            self._frame_poll = self.after(2, self._present_frame)
         self._update_status()
 
+    def _render_frame(self, job):
+        """Worker thread: one RGBA frame (through the raster cache when there is one)."""
+        from ..render.raster import render_twin
+        shape, geometry = job
+        return render_twin(shape, geometry, self.raster_cache)
+
+    def _present_frame(self):
+        """Tk thread: blit the newest finished frame; poll again while the worker is busy."""
+        from ..render.raster import present_rgba
+        self._frame_poll = None
+        frame = self._frames.take()
+        if frame is not None and frame.seq > self._shown_seq:
+            self._shown_seq = frame.seq
+            shape, (mode, *_) = frame.job
+            shown = False
+            if frame.error is not None:
+                self._render_note = f"Render failed ({shape.name}): {frame.error}"
+            else:
+                self._render_note = ""
+                with timing.span("present", chord=shape.name):
+                    shown = present_rgba(self.canvas, frame.rgba)
+            if shown:
+                self.view.invalidate()          # the canvas no longer holds the view's background
+            else:
+                # window resized, nothing drawn yet, or the worker failed: draw this one here
+                self.view.show(shape, mode=mode)
+            self._update_status()
+        if self._frames.pending:
+            self._frame_poll = self.after(2, self._present_frame)
+
+    def _close(self):
+        if self._frame_poll is not None:
+            self.after_cancel(self._frame_poll)
+        self.stop_autoplay()
+        self._frames.close()
+        self.destroy()
+
+    def _shape(self, chord_name):
+        """
+        The variant that keeps hand movement through the current set smallest
+        (plans are memoized); the first variant while autoplay shuffles, since
+        the plan follows the set's order.
+        """
+        if self._playback is not None and self._playback.state.randomize:
+            return first_shapes(self.names, self.shapes_by_name)[chord_name]
+        return voiced_shapes(self.names, self.shapes_by_name)[chord_name]
+
     # ---------- NAV ----------
     def next(self):
         if not self.names: return
@@ -145,65 +234,197 @@ class CavacoHeroTk(tk.Tk):
         self._render()
 
     # ---------- AUTOPLAY ----------
+    def _period(self):
+        """Seconds per chord: from BPM x beats when BPM > 0, else the period box."""
+        try:
+            bpm, beats = self.bpm.get(), self.beats.get()
+            if bpm > 0 and beats > 0:
+                return period_from_bpm(bpm, beats)
+            return max(0.05, self.period_s.get())
+        except (tk.TclError, ValueError):
+            return 3.0
+
     def start_autoplay(self):
         if not self.names:
             messagebox.showinfo("Autoplay", "No chords to play.")
             return
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
+        if self.practice.get():
+            from ..io.practice import PracticeLog, practice_path
+            state = PracticeEngine(self.names, tempo_s=self._period(), randomize=self.randomize.get(),
+                                   log=PracticeLog(practice_path(self.library)))
+            self.idx = state.index
+            self._render()
+        else:
+            state = AppState(self.names, tempo_s=self._period(), randomize=self.randomize.get(), start=self.idx)
+        prefetch = None
+        if self.raster_cache is not None:
+            from ..render.raster import prerender
+            mode = self.mode.get()
+            prefetch = lambda name: prerender(self.view, self._shape(name), self.raster_cache, mode=mode)
+        self._playback = Playback(state, prefetch=prefetch)
+        self._playback.start()
         self._schedule_next()
 
     def stop_autoplay(self):
         if self._autoplay_job is not None:
             self.after_cancel(self._autoplay_job)
             self._autoplay_job = None
+        if self._playback is not None:
+            self._playback.close()
+            if isinstance(self._playback.state, PracticeEngine):
+                self._playback.state.close()
+            self._playback = None
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
+        self._update_status()
+
+    def _restart_autoplay(self):
+        """Running autoplay follows a new selection/mode from the current chord on."""
+        if self._playback is not None:
+            self.stop_autoplay()
+            if self.names:
+                self.start_autoplay()
 
     def _schedule_next(self):
-        delay_ms = max(50, int(self.period_s.get() * 1000))
+        # wake up at the absolute deadline (Tk timers are ms-grained, so round up)
+        delay_ms = int(self._playback.wait_time() * 1000) + 1
         self._autoplay_job = self.after(delay_ms, self._tick)
 
     def _tick(self):
-        if not self.names:
+        if not self.names or self._playback is None:
             self.stop_autoplay()
             return
-        if self.randomize.get():
-            self.idx = random.randrange(len(self.names))
-        else:
-            self.idx = (self.idx + 1) % len(self.names)
+        self._playback.state.tempo_s = self._period()
+        name = self._playback.poll()
+        if name is not None:
+            self.idx = self._playback.state.index
+            self._render()
+        self._schedule_next()
+
+    # ---------- HOT RELOAD ----------
+    def _grade(self, event, grade):
+        """1-4 while practising: grade the chord on screen and move on at once."""
+        if isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return                          # typing a chord list or a number
+        if self._playback is None or not isinstance(self._playback.state, PracticeEngine):
+            return
+        self._playback.state.next_chord(grade)
+        self.idx = self._playback.state.index
         self._render()
+        if self._autoplay_job is not None:  # the new chord gets a full period
+            self.after_cancel(self._autoplay_job)
+        self._playback.start()
         self._schedule_next()
 
+    def _poll_library(self):
+        try:
+            diff = self._watcher.poll()
+        except ValueError as e:
+            self._reload_note = f"Reload failed: {e}"
+            self._update_status()
+        else:
+            if diff:
+                self._apply_reload(self._watcher.lib, diff)
+        self.after(self._reload_ms, self._poll_library)
+
+    def _apply_reload(self, lib, diff):
+        """Swap in the reloaded library; recompute only what the diff can affect."""
+        current = self.names[self.idx] if self.names else None
+        shown = self._shape(current) if current else None
+        self.tuning, self.shapes_by_name, self.meta_by_name, self.sets = lib
+        if diff.tuning_changed:
+            # the grid, string labels and render keys all come from the view's tuning
+            from ..render.view import FretboardView
+            self.view.close()
+            self.view = FretboardView(self.ax, tuning=self.tuning, mode=self.mode.get(), blit=True)
+            self.canvas.draw_idle()
+
+        names_changed = diff.affects_selection()
+        if names_changed:
+            self.set_combo.config(values=sorted(set(self.sets) | {"major", "minor", "sevenths", "custom", "all"}))
+            choice = self.current_set.get()
+            if choice == "custom":
+                items = [s.strip() for s in self.custom_list.get().split(",") if s.strip()]
+                names = self._pick_names("custom", custom_list=items)
+            else:
+                names = self._pick_names(choice)
+            names_changed = names != self.names
+            self.names = names
+            # stay on the same chord if it is still there
+            if current in self.names:
+                self.idx = self.names.index(current)
+            else:
+                self.idx = min(self.idx, max(0, len(self.names) - 1))
+
+        self._reload_note = f"Reloaded: {diff}"
+        if names_changed:
+            self._restart_autoplay()
+        # an edit to any chord of the set can change which variant of the current one is planned
+        if (names_changed or diff.tuning_changed or current in diff.removed
+                or (current and self._shape(current) != shown)):
+            self._render()
+        else:
+            self._update_status()
+
     # ---------- SELECTION ----------
     def _apply_custom(self):
         items = [s.strip() for s in self.custom_list.get().split(",") if s.strip()]
         if not items:
             messagebox.showinfo("Custom", "Type chords separated by commas, e.g. C, Dm, G7")
             return
-        self.names = self._pick_names("custom", custom_list=items)
+        self.names, missing = resolve_names(items, self.shapes_by_name)
+        if missing:
+            lines = [f"{typed}: did you mean {', '.join(hint)}?" if hint else f"{typed}: no such chord"
+                     for typed, hint in missing]
+            messagebox.showwarning("Custom", "Not in the library:\n" + "\n".join(lines))
+        self.current_set.set("custom")     # so a reload re-applies the list
         self.idx = 0
+        self._restart_autoplay()
         self._render()
 
+    def _on_custom_key(self, event=None):
+        if event is not None and event.keysym in ("Tab", "Return"):
+            return
+        head, _, current = self.custom_list.get().rpartition(",")
+        found = chord_search(self.shapes_by_name).complete(current.strip(), limit=6) if current.strip() else []
+        self.suggestions.config(text="  ".join(found))
+
+    def _accept_completion(self, event=None):
+        text = self.custom_list.get()
+        head, sep, current = text.rpartition(",")
+        found = chord_search(self.shapes_by_name).complete(current.strip(), limit=1) if current.strip() else []
+        if found:
+            self.custom_list.set(f"{head}{sep} {found[0]}, " if sep else f"{found[0]}, ")
+            self.suggestions.config(text="")
+            if event is not None:
+                event.widget.icursor(tk.END)
+            return "break"                 # keep the focus in the entry
+
     def _on_set_change(self, _event=None):
         choice = self.current_set.get()
         self.names = self._pick_names(choice)
         self.idx = 0
+        self._restart_autoplay()
+        self._render()
+
+    def _on_mode_change(self, _event=None):
+        self._restart_autoplay()
         self._render()
 
     def _pick_names(self, selection="all", custom_list=None):
         # prefer your select helper if available
         if _select:
             if selection == "custom" and custom_list:
-                # let select_chords filter the valid ones
-                valid = [n for n in custom_list if n in self.shapes_by_name]
-                return valid
+                # spelling variants and small typos resolve to the library's names
+                return resolve_names(custom_list, self.shapes_by_name)[0]
             return _select(self.shapes_by_name, self.meta_by_name, self.sets, selection)
 
         # fallback heuristics
         names = sorted(self.shapes_by_name.keys())
         if selection == "custom" and custom_list:
-            return [n for n in custom_list if n in self.shapes_by_name]
+            return resolve_names(custom_list, self.shapes_by_name)[0]
         if selection == "major":
             return [n for n in names if not n.endswith("m")]
         if selection == "minor":
@@ -225,12 +446,38 @@ class CavacoHeroTk(tk.Tk):
         mode = self.mode.get()
         sname = self.current_set.get()
         chord = self.names[self.idx] if self.names else "-"
-        self.status.config(text=f"Set: {sname} | Mode: {mode} | Chord: {chord} ({self.idx+1}/{len(self.names)})")
-
-
-def main():
-    app = CavacoHeroTk()
-    app.mainloop()
+        text = f"Set: {sname} | Mode: {mode} | Chord: {chord} ({self.idx+1}/{len(self.names)})"
+        if self._playback is not None and self._playback.jitter.samples:
+            j = self._playback.jitter.summary()
+            text += f" | Late: p50 {j['p50_ms']:.1f} ms, p95 {j['p95_ms']:.1f} ms, {j['missed']} missed"
+        if self._playback is not None and isinstance(self._playback.state, PracticeEngine):
+            st = self._playback.state.stats()
+            text += f" | Practice: {st['seen']}/{st['cards']} seen, {st['due']} due, {st['lapses']} misses (1-4 grades)"
+        if self.raster_cache is not None:
+            st = self.raster_cache.stats()
+            text += f" | Cache: {st['hits']}/{st['hits'] + st['misses']} hits, {st['bytes'] / 2**20:.1f} MB"
+        frames = getattr(self, "_frames", None)
+        if frames is not None and frames.stats()["render_ms"]:
+            st = frames.stats()
+            text += f" | Render: {st['render_ms']:.0f} ms, {st['fps']:.1f} fps, {st['dropped']} dropped"
+        if self._render_note:
+            text += f" | {self._render_note}"
+        if self._reload_note:
+            text += f" | {self._reload_note}"
+        self.status.config(text=text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cavacohero-tk", description="Cavaco Hero Tk interface.")
+    add_library_options(parser)
+    add_render_options(parser)
+    add_reload_options(parser)
+    add_profile_options(parser)
+    args = parser.parse_args(argv)
+    with profiling(args):
+        app = CavacoHeroTk(library=args.library, raster_cache=raster_cache(args), reload_interval=args.reload,
+                           **library_kwargs(args))
+        app.mainloop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+# src/cavacohero/web/__init__.py
+"""
+'cavacohero serve': chord library and diagrams over HTTP (see server.py).
+The server module (asyncio, matplotlib) is imported only when serving.
+"""
+
+
+def add_serve_parser(sub) -> None:
+    p = sub.add_parser("serve", help="serve the library and chord diagrams over HTTP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=2, help="threads rendering PNGs (default: 2)")
+    p.add_argument("--cache-mb", type=float, default=64.0, metavar="MB",
+                   help="memory for cached responses (default: 64)")
+    p.add_argument("--dpi", type=int, default=None, help="override the per-mode default PNG dpi")
+    p.add_argument("--log", action="store_true", help="print one line per request")
+
+
+def run_serve(args, load) -> int:
+    """'cavacohero serve' entry point; 'load' returns the loaded Library."""
+    from .server import DiagramService, serve
+    service = DiagramService(load(), cache_bytes=int(args.cache_mb * 1024 * 1024),
+                             workers=args.workers, dpi=args.dpi)
+    serve(service, args.host, args.port, log=args.log)
+    return 0
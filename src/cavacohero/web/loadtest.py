@@ -0,0 +1,103 @@
+# src/cavacohero/web/loadtest.py
+"""
+Load test for 'cavacohero serve':
+
+    python -m cavacohero.web.loadtest http://127.0.0.1:8765 --requests 5000 --concurrency 32
+
+Fetches /library, then requests diagrams of every chord (round robin over
+names, modes and formats) on keep-alive connections and reports requests/s
+and latency percentiles. --revalidate sends If-None-Match with the ETags
+seen so far, to measure the 304 path.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from urllib.parse import quote, urlsplit
+
+
+async def _request(reader, writer, host, path, etag=None):
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+async def run(url, requests=2000, concurrency=16, formats=("svg", "png"), modes=("zoom", "full"),
+              revalidate=False) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, _, body = await _request(reader, writer, host, "/library")
+    writer.close()
+    names = list(json.loads(body)["chords"])
+    paths = itertools.cycle(f"/chord/{quote(n, safe='')}.{fmt}?mode={mode}"
+                            for n in names for fmt in formats for mode in modes)
+
+    latencies, statuses, etags = [], {}, {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                path = next(paths)
+                t0 = time.perf_counter()
+                status, headers, _ = await _request(reader, writer, host, path,
+                                                    etags.get(path) if revalidate else None)
+                latencies.append(time.perf_counter() - t0)
+                statuses[status] = statuses.get(status, 0) + 1
+                if "etag" in headers:
+                    etags[path] = headers["etag"]
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": len(latencies), "seconds": elapsed, "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0, "statuses": statuses,
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m cavacohero.web.loadtest", description=__doc__.split("\n\n")[0])
+    p.add_argument("url", nargs="?", default="http://127.0.0.1:8765")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--format", nargs="+", choices=("svg", "png"), default=["svg", "png"])
+    p.add_argument("--mode", nargs="+", choices=("zoom", "full"), default=["zoom", "full"])
+    p.add_argument("--revalidate", action="store_true", help="send If-None-Match (expect 304s)")
+    args = p.parse_args(argv)
+    r = asyncio.run(run(args.url, args.requests, args.concurrency, args.format, args.mode, args.revalidate))
+    print(f"{r['requests']} requests in {r['seconds']:.2f}s: {r['rps']:.0f} req/s, "
+          f"p50 {r['p50_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms, max {r['max_ms']:.1f} ms, "
+          f"status {r['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
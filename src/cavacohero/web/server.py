@@ -0,0 +1,240 @@
+# src/cavacohero/web/server.py
+"""
+Small asyncio HTTP/1.1 server for the chord library.
+
+  GET /library                         tuning, chords (quality, tags, shapes), set names
+  GET /select?q=<set name or query>    {"selection": ..., "names": [...]}
+  GET /chord/<name>.svg|.png           diagram; ?mode=zoom|full&variant=N
+
+Every response carries a strong ETag (diagrams: the export digest of shape +
+render parameters) and If-None-Match gets a 304. Bodies are kept in a ByteLRU;
+concurrent misses for the same response share one render. PNGs are drawn by
+matplotlib on a fixed pool of worker threads (each with its own off-screen
+figure) so the event loop never blocks; SVGs come from the string backend.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ..io.export import job_digest
+from ..lru import ByteLRU
+from ..theory.select import select_chords
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml", "json": "application/json"}
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    content_type: str = CONTENT_TYPES["json"]
+    etag: str | None = None
+
+
+def _error(status: int, message: str) -> Response:
+    return Response(status, json.dumps({"error": message}).encode("utf-8"))
+
+
+def _json(payload) -> Response:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return Response(200, body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def _render_png(tab_shape, mode, tuning, dpi) -> bytes:
+    from ..render.raster import render_bytes      # matplotlib, on a worker thread
+    return render_bytes(tab_shape, mode, "png", tuning, dpi=dpi)
+
+
+class DiagramService:
+    """Request handling, independent of the socket layer (see serve())."""
+
+    def __init__(self, lib, cache_bytes: int = 64 * 1024 * 1024, workers: int = 2, dpi: int | None = None):
+        self.lib = lib
+        self.dpi = dpi
+        self.cache = ByteLRU(cache_bytes, sizeof=lambda r: len(r.body) + 256)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="render")
+        self._inflight: dict = {}
+        self._library = None
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- routes ----------
+    async def get(self, target: str) -> Response:
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path
+        if path == "/library":
+            return self.library()
+        if path == "/select":
+            return self.select(query.get("q", "all"))
+        if path.startswith("/chord/"):
+            name, dot, fmt = unquote(path[len("/chord/"):]).rpartition(".")
+            if not dot or fmt not in ("png", "svg"):
+                return _error(404, "use /chord/<name>.png or /chord/<name>.svg")
+            return await self.diagram(name, fmt, query.get("mode", "zoom"), query.get("variant", "0"))
+        return _error(404, f"no route for {path}")
+
+    def library(self) -> Response:
+        if self._library is None:
+            lib = self.lib
+            self._library = _json({
+                "tuning": list(lib.tuning),
+                "chords": {
+                    name: {"quality": meta.get("quality"), "tags": sorted(meta.get("tags", ())),
+                           "shapes": [list(s.frets) for s in lib.shapes_by_name[name]]}
+                    for name, meta in lib.meta_by_name.items()
+                },
+                "sets": sorted(lib.sets),
+            })
+        return self._library
+
+    def select(self, selection: str) -> Response:
+        key = ("select", selection)
+        hit = self.cache.get(key)
+        if hit is None:
+            try:
+                names = select_chords(self.lib.shapes_by_name, self.lib.meta_by_name, self.lib.sets, selection)
+            except ValueError as e:
+                return _error(400, str(e))
+            hit = _json({"selection": selection, "names": names})
+            self.cache.put(key, hit)
+        return hit
+
+    async def diagram(self, name: str, fmt: str, mode: str, variant: str) -> Response:
+        if mode not in ("zoom", "full"):
+            return _error(400, "mode must be zoom or full")
+        if not variant.isdigit():
+            return _error(400, "variant must be a number")
+        key = ("chord", name, fmt, mode, variant)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        if name not in self.lib.shapes_by_name:
+            return _error(404, f"unknown chord '{name}'")
+        shapes = self.lib.shapes_by_name[name]
+        if int(variant) >= len(shapes):
+            return _error(404, f"{name}: no variant {variant}")
+        shape = shapes[int(variant)]
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = self._inflight[key] = asyncio.ensure_future(self._render(shape, fmt, mode))
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        resp = await asyncio.shield(pending)
+        self.cache.put(key, resp)
+        return resp
+
+    async def _render(self, shape, fmt: str, mode: str) -> Response:
+        tuning = tuple(self.lib.tuning)
+        etag = f'"{job_digest(shape.name, shape.frets, mode, fmt, tuning, self.dpi)}"'
+        if fmt == "svg":
+            from ..render.svg import render_svg
+            body = render_svg(shape, mode, tuning).encode("utf-8")
+        else:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self._pool, _render_png, shape, mode, tuning, self.dpi)
+        return Response(200, body, CONTENT_TYPES[fmt], etag)
+
+    async def respond(self, method: str, target: str, headers: dict) -> Response:
+        if method not in ("GET", "HEAD"):
+            return _error(405, "only GET and HEAD")
+        try:
+            resp = await self.get(target)
+        except Exception as e:          # keep serving; report what broke
+            return _error(500, f"{type(e).__name__}: {e}")
+        if resp.etag and resp.status == 200:
+            tags = [t.strip() for t in headers.get("if-none-match", "").split(",")]
+            if resp.etag in tags or "*" in tags:
+                return Response(304, b"", resp.content_type, resp.etag)
+        return resp
+
+
+# ---------- HTTP ----------
+
+def encode_response(resp: Response, head: bool = False, keep_alive: bool = True) -> bytes:
+    lines = [f"HTTP/1.1 {resp.status} {REASONS.get(resp.status, '')}",
+             f"Content-Type: {resp.content_type}",
+             f"Content-Length: {len(resp.body) if resp.status != 304 else 0}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if resp.etag:
+        lines += [f"ETag: {resp.etag}", "Cache-Control: no-cache"]   # always revalidate; 304s are cheap
+    out = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return out if head or resp.status == 304 else out + resp.body
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, target, version, headers) or None at end of stream."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode("latin-1").split()
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length:
+        await reader.readexactly(length)      # GET bodies carry nothing we use
+    return method, target, version, headers
+
+
+def make_handler(service: DiagramService, log=None):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError:
+                    writer.write(encode_response(_error(400, "malformed request"), keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                t0 = time.perf_counter()
+                resp = await service.respond(method, target, headers)
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(encode_response(resp, head=method == "HEAD", keep_alive=keep))
+                await writer.drain()
+                if log:
+                    log(f"{method} {target} {resp.status} {len(resp.body)}B "
+                        f"{(time.perf_counter() - t0) * 1000:.1f}ms")
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+async def start_server(service: DiagramService, host: str = "127.0.0.1", port: int = 8765, log=None):
+    return await asyncio.start_server(make_handler(service, log), host, port)
+
+
+def serve(service: DiagramService, host: str = "127.0.0.1", port: int = 8765, log: bool = False) -> None:
+    """Run until Ctrl+C."""
+    async def main():
+        server = await start_server(service, host, port, print if log else None)
+        addr = server.sockets[0].getsockname()
+        print(f"serving {len(service.lib.shapes_by_name)} chords on http://{addr[0]}:{addr[1]}/ (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        st = service.cache.stats()
+        print(f"\nstopped; response cache: {st['hits']} hits / {st['misses']} misses, "
+              f"{st['entries']} entries, {st['bytes'] / 2**20:.1f} MB")
+    finally:
+        service.close()
@@ -0,0 +1,37 @@
+import wave
+
+import numpy as np
+
+from cavacohero.audio.bank import SampleBank
+from cavacohero.audio.synth import SAMPLE_RATE, open_midi, pluck, render_shape, shape_pitches
+from cavacohero.audio.wav import progression_shapes, write_wav
+from cavacohero.theory.voicings import generate_store
+
+
+def test_shapes_sound_at_the_right_pitch():
+    assert open_midi(("D", "G", "B", "D")).tolist() == [62, 67, 71, 74]
+    assert open_midi(("E2", "A2", "D3")).tolist() == [40, 45, 50]
+    assert shape_pitches((2, 0, 1, "x"), ("D", "G", "B", "D")).tolist() == [64, 67, 72, -1]
+
+    for hz in (293.66, 440.0, 659.25):
+        y = pluck([hz], [0], 4 * SAMPLE_RATE, seed=1)
+        spectrum = np.abs(np.fft.rfft(y))
+        peak = np.argmax(spectrum[: int(1.5 * hz * 4)]) / 4      # bins are 0.25 Hz apart
+        assert abs(1200 * np.log2(peak / hz)) < 5, hz               # within 5 cents
+
+    a = render_shape((2, 0, 1, 2), ("D", "G", "B", "D"), 1.0)
+    assert a.dtype == np.float32 and len(a) == SAMPLE_RATE and 0.05 < np.abs(a).max() < 1.0
+    assert np.array_equal(a, render_shape((2, 0, 1, 2), ("D", "G", "B", "D"), 1.0))     # deterministic
+
+
+def test_progression_streams_to_wav_with_cached_chords(tmp_path):
+    store = generate_store(limit=2)
+    bank = SampleBank(max_bytes=10**8)
+    path = tmp_path / "song.wav"
+    summary = write_wav(path, progression_shapes(["C", "Am", "F", "G"], store.shapes_by_name, loops=3),
+                        store.tuning, period_s=0.5, ring_s=1.0, bank=bank)
+    assert summary.chords == 12 and summary.clipped == 0
+    assert (bank.misses, bank.hits) == (4, 8)            # each distinct shape rendered once
+    with wave.open(str(path)) as w:
+        assert (w.getnchannels(), w.getsampwidth(), w.getframerate()) == (1, 2, SAMPLE_RATE)
+        assert w.getnframes() == int(SAMPLE_RATE * (11 * 0.5 + 1.5))
@@ -0,0 +1,114 @@
+import heapq
+import random
+import types
+
+from cavacohero.engine import state
+from cavacohero.engine.state import AppState, PracticeEngine, AGAIN, GOOD, EASY
+from cavacohero.io.practice import PracticeLog
+from cavacohero.engine.playback import Playback, period_from_bpm
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_playback_deadlines_do_not_drift():
+    clock = FakeClock()
+    pb = Playback(AppState(["C", "D", "E"], tempo_s=period_from_bpm(120, 4)), clock=clock)
+    assert pb.start() == "C"
+    assert pb.wait_time() == 2.0
+
+    clock.t += 2.3                       # shown 300 ms late ...
+    assert pb.poll() == "D"
+    assert abs(pb.wait_time() - 1.7) < 1e-9   # ... but the next deadline is still start + 4 s
+    assert pb.poll() is None
+
+    clock.t += 1.7 + 2.5                 # fall more than a period behind
+    assert pb.poll() == "E"
+    stats = pb.jitter.summary()
+    assert stats["count"] == 2 and stats["missed"] == 1
+    assert abs(pb.wait_time() - 1.5) < 1e-9
+
+
+def test_random_order_is_known_in_advance():
+    state = AppState(list("ABCDEF"), randomize=True)
+    seen = [state.current_chord()]
+    for _ in range(11):
+        upcoming = state.peek_next()
+        state.next_chord()
+        assert state.current_chord() == upcoming
+        seen.append(upcoming)
+    # two full cycles, each a permutation, no repeat across the boundary
+    assert sorted(seen[:6]) == sorted(seen[6:]) == list("ABCDEF")
+    assert seen[5] != seen[6]
+
+    firsts = {AppState(list("ABCDEF"), randomize=True, rng=random.Random(seed)).current_chord() for seed in range(20)}
+    assert len(firsts) > 1                                # no bias towards the set's first chord
+    assert AppState(list("ABCDEF"), randomize=True, start=3).current_chord() == "D"
+
+
+def test_practice_brings_misses_back_first_and_scales(monkeypatch):
+    engine = PracticeEngine(list("ABCDEF"), rng=random.Random(0))
+    shown = []
+    for _ in range(40):
+        name = engine.current_chord()
+        grade = AGAIN if name == "B" else EASY
+        upcoming = engine.peek_next(grade)
+        engine.next_chord(grade)
+        assert engine.current_chord() == upcoming
+        shown.append(name)
+    assert shown[:7] == list("ABCDBEF")                  # new cards in order; the miss is back after 3
+    assert shown.count("B") > 2 * max(shown.count(n) for n in "ACDEF")
+    assert engine.stats()["lapses"] == shown.count("B")
+
+    big = PracticeEngine([f"c{i}" for i in range(25_000)], variants=[4] * 25_000)
+    assert big.n_cards == 100_000
+    # a step is a few heap operations on the cards seen so far, never a pass over all of them
+    ops = []
+    heap = types.SimpleNamespace(heappush=lambda h, x: ops.append(len(h)) or heapq.heappush(h, x),
+                                 heappop=lambda h: ops.append(len(h)) or heapq.heappop(h))
+    monkeypatch.setattr(state, "heapq", heap)
+    monkeypatch.setattr(state, "np", None)                  # no array-wide numpy call either
+    for k in range(2000):
+        big.next_chord(AGAIN if k % 5 == 0 else GOOD)
+    assert len(ops) <= 3 * 2000
+    assert max(ops) < 1000 and len(big._heap) < 1000
+
+
+def test_practice_resumes_from_snapshot_and_log(tmp_path):
+    names = [f"c{i}" for i in range(50)]
+    engine = PracticeEngine(names, variants=[2] * 50, log=PracticeLog(tmp_path / "p", snapshot_every=16))
+    rng = random.Random(1)
+    for _ in range(100):
+        engine.next_chord(rng.choice([AGAIN, GOOD, EASY]))
+    engine.log.close()                                    # stop without a final snapshot
+    assert 0 < engine.log.pending < 16
+    card = (engine.current_chord(), engine.current_variant())
+
+    again = PracticeEngine(names, variants=[2] * 50, log=PracticeLog(tmp_path / "p"))
+    assert again.stats() == engine.stats()
+    assert (again.current_chord(), again.current_variant()) == card
+
+    subset = PracticeEngine(names[:5], log=PracticeLog(tmp_path / "p"))   # other cards ride along
+    subset.next_chord(GOOD)
+    subset.close()
+    later = PracticeEngine(names, variants=[2] * 50, log=PracticeLog(tmp_path / "p"))
+    assert later.stats()["seen"] == engine.stats()["seen"] + (engine.shown[0] == 0)
+    assert later.step == engine.step + 1
+
+
+def test_practice_path_takes_the_default_library_list(tmp_path, monkeypatch):
+    from cavacohero.app import build_parser
+    from cavacohero.io.practice import practice_path
+    monkeypatch.setenv("CAVACOHERO_DATA_DIR", str(tmp_path))
+    args = build_parser().parse_args([])
+    assert isinstance(args.library, list)
+    path = practice_path(args.library)
+    assert path.parent == tmp_path
+    assert path == practice_path(args.library[0]) == practice_path(str(args.library[0]))
+    merged = build_parser().parse_args(["--library", "a.yaml", "--library", "b.yaml"]).library
+    assert practice_path(merged) == practice_path(merged[::-1]) != path
@@ -0,0 +1,33 @@
+from cavacohero.theory.store import ChordStore
+from cavacohero.io.export import plan_export, run_jobs
+
+
+def test_export_skips_unchanged(tmp_path):
+    store = ChordStore.build(("D","G","B","D"), [
+        ("C", "major", [], [(2,0,1,2), (5,5,5,5)]),
+        ("F/A", "major", [], [(3,2,1,3)]),
+    ])
+    names = ["C", "F/A"]
+    jobs = plan_export(store.shapes_by_name, names, store.tuning, modes=("zoom",), formats=("png",))
+    assert [j.relpath for j in jobs] == ["zoom/C.png", "zoom/C_v2.png", "zoom/F_A.png"]
+
+    first = run_jobs(jobs, tmp_path, store.tuning, workers=1, progress=None)
+    assert (first.rendered, first.skipped, first.failed) == (3, 0, [])
+    assert (tmp_path / "zoom" / "F_A.png").stat().st_size > 0
+
+    again = run_jobs(jobs, tmp_path, store.tuning, workers=1, progress=None)
+    assert (again.rendered, again.skipped) == (0, 3)
+
+
+def test_export_gives_colliding_names_their_own_files():
+    store = ChordStore.build(("D","G","B","D"), [
+        ("F/A", "major", [], [(3,2,1,3)]),
+        ("F_A", "major", [], [(3,2,1,2)]),
+        ("Cm(maj7)", "minor", [], [(1,0,0,1)]),
+        ("Cm_maj7_", "minor", [], [(1,0,0,2)]),
+    ])
+    jobs = plan_export(store.shapes_by_name, store.names, store.tuning, modes=("zoom",), formats=("png",))
+    paths = [j.relpath for j in jobs]
+    assert len(set(paths)) == 4 and len({j.digest for j in jobs}) == 4
+    assert "zoom/F_A.png" in paths and "zoom/Cm_maj7_.png" in paths        # already-safe names keep theirs
+    assert paths[0].startswith("zoom/F_A_") and paths[0] != "zoom/F_A.png"
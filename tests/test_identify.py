@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import numpy as np
+
+from cavacohero.instrument.cavaco import CAVACO
+from cavacohero.theory.identify import chord_identifier
+from cavacohero.theory.library import load_library
+from cavacohero.theory.voicings import FORMULAS, generate_store
+
+LIB = Path(__file__).resolve().parents[1] / "presets" / "chords.yaml"
+
+
+def test_identify_inversions_omissions_and_spellings():
+    ident = chord_identifier(CAVACO.tuning)
+    assert ident.best((2, 0, 1, 2)).name == "C/E"
+    assert ident.best((2, 0, 1, 2)).inversion == 1
+    assert ident.best(("x", 5, 5, 5)).name == "C"
+    g7 = ident.best((0, 0, 0, 3))                      # D G B F: G7 over D
+    assert g7.name == "G7/D" and g7.quality == "dominant7"
+    bb = ident.best((0, 3, 3, 3))                      # D Bb D F
+    assert bb.name == "Bb/D" and bb.aliases == ("A#",)
+    assert ident.best((3, 1, 2, 3)).name == "C#/F"     # F Ab C# F, roots spelled as in ROOT_NAMES
+    readings = [str(m) for m in ident.identify((4, 2, 2, 2))]
+    assert readings[0] == "F#m7" and "A6/F#" in readings
+
+
+def test_batch_lookup_names_library_and_generated_shapes():
+    lib = load_library(LIB, use_cache=False)
+    ident = chord_identifier(lib.tuning, lib)
+    for name, shapes in lib.shapes_by_name.items():
+        for m in ident.identify_many(shapes):
+            assert m.name.split("/")[0] == name
+
+    store = generate_store(formulas=[FORMULAS["major"], FORMULAS["minor7"]], limit=None)
+    found = ident.identify_many(store.frets)
+    owner = store.chord_of_shape()
+    assert all(m is not None for m in found)
+    # every generated shape is named after its own pitch set (a library or formula name)
+    masks, bass = ident.masks(store.frets)
+    assert np.array_equal(ident.table[masks, bass] >= 0, np.ones(len(masks), bool))
+    same = sum(m.name.split("/")[0] == store.names[o] for m, o in zip(found, owner))
+    assert same > 0.7 * len(found)
@@ -12,4 +12,156 @@ def test_load_cavaco_yaml():
 def test_multi_digit_frets():
     from cavacohero.theory.tabs import parse_cavaco_shape
     shape = parse_cavaco_shape("Fake", [45, 34, 212, 112], strings_expected=4)
-    assert shape.frets == (5, 4, 12, 12)
\ No newline at end of file
+    assert shape.frets == (5, 4, 12, 12)
+
+
+def test_library_cache_roundtrip(tmp_path, monkeypatch):
+    from cavacohero.io import cache
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    src = tmp_path / "lib.yaml"
+    src.write_text("chords:\n  C:\n    quality: major\n    tags: [triad]\n    shapes:\n      - [42, 30, 21, 12]\n")
+
+    first = load_library(src)
+    assert cache.cache_path(src).exists()
+    assert load_library(src) == first
+
+    # content change invalidates the snapshot
+    src.write_text("chords:\n  C:\n    quality: major\n    shapes:\n      - [45, 35, 24, 15]\n")
+    _, shapes, meta, _ = load_library(src)
+    assert shapes["C"][0].frets == (5, 5, 4, 5)
+    assert meta["C"]["tags"] == set()
+
+
+def test_chord_store_views():
+    from cavacohero.theory.store import ChordStore, MUTE
+    store = ChordStore.build(("D","G","B","D"), [
+        ("C", "major", ["triad"], [(2,0,1,2), (5,5,5,"x")]),
+        ("Dm", "minor", [], [(3,2,3,3)]),
+    ])
+    assert store.frets.dtype.itemsize == 1
+    assert store.frets[1].tolist() == [5, 5, 5, MUTE]
+    assert [s.frets for s in store.shapes_by_name["C"]] == [(2,0,1,2), (5,5,5,"x")]
+    assert store.meta_by_name["Dm"] == {"quality": "minor", "tags": frozenset()}
+    assert store.quality_mask({"minor"}).tolist() == [False, True]
+    assert store.tag_mask({"triad"}).tolist() == [True, False]
+
+
+def test_watcher_reparses_only_changed_chords(tmp_path, monkeypatch):
+    import os
+    from cavacohero.io.watch import LibraryWatcher
+    from cavacohero.theory import library
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    src = tmp_path / "lib.yaml"
+    head = "chords:\n  C:\n    quality: major\n    shapes: [[42, 30, 21, 12]]\n"
+    src.write_text(head + "  Dm:\n    quality: minor\n    shapes: [[43, 32, 23, 13]]\n"
+                   "sets:\n  minors: 'quality: minor'\n")
+    lib = load_library(src)
+    watcher = LibraryWatcher(src, lib)
+    assert watcher.poll() is None
+
+    parsed = []
+    real = library.parse_shapes
+    monkeypatch.setattr(library, "parse_shapes", lambda rows, *a, **k: parsed.extend(rows) or real(rows, *a, **k))
+    src.write_text(head + "  Dm:\n    quality: minor\n    shapes: [[43, 32, 23, 11]]\n"
+                   "  Em:\n    quality: minor\n    shapes: [[42, 30, 20, 12]]\n"
+                   "sets:\n  minors: 'quality: minor'\n")
+    os.utime(src, ns=(1, 1))             # make sure the stat signature moves on coarse clocks
+    diff = watcher.poll()
+    assert parsed == [[43, 32, 23, 11], [42, 30, 20, 12]] and diff.reparsed == 2
+    assert (diff.added, diff.changed, diff.removed) == ({"Em"}, {"Dm"}, set())
+    assert diff.affects_selection() and not diff.sets_changed
+    assert watcher.lib.shapes_by_name["Dm"][0].frets == (3, 2, 3, 1)
+    assert lib.shapes_by_name["Dm"][0].frets == (3, 2, 3, 3)      # the old library is untouched
+    assert watcher.lib.shapes_by_name["C"] == lib.shapes_by_name["C"]
+
+
+def test_reload_reports_a_tuning_change(tmp_path, monkeypatch):
+    import os
+    from cavacohero.io.watch import LibraryWatcher
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    src = tmp_path / "lib.yaml"
+    body = "chords:\n  C: {quality: major, shapes: [[42, 30, 21, 12]]}\n"
+    src.write_text(body)
+    watcher = LibraryWatcher(src, load_library(src))
+    src.write_text("tuning: [D, G, B, E]\n" + body)
+    os.utime(src, ns=(1, 1))
+    diff = watcher.poll()
+    assert diff and diff.tuning_changed and "tuning changed" in str(diff)
+    assert watcher.lib.tuning == ("D", "G", "B", "E")
+
+
+def test_watcher_sees_files_added_below_a_recursive_glob(tmp_path, monkeypatch):
+    import os
+    from cavacohero.io.watch import LibraryWatcher
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "g" / "sub").mkdir(parents=True)
+    (tmp_path / "g" / "a.yaml").write_text("chords:\n  C: {shapes: [[42, 30, 21, 12]]}\n")
+    main = tmp_path / "main.yaml"
+    main.write_text("include: g/**/*.yaml\n")
+    watcher = LibraryWatcher(main, load_library(main))
+    assert watcher.poll() is None
+
+    (tmp_path / "g" / "sub" / "b.yaml").write_text("chords:\n  G: {shapes: [[45, 34, 23, 15]]}\n")
+    os.utime(tmp_path / "g" / "sub", ns=(1, 1))      # only the nested directory moves
+    diff = watcher.poll()
+    assert diff and diff.added == {"G"} and "G" in watcher.lib.shapes_by_name
+
+
+def test_bulk_parser_reports_every_problem_with_lines(tmp_path):
+    import pytest
+    from cavacohero.theory.library import LibraryError
+    from cavacohero.theory.tabs import parse_shapes, ShapeEncoding
+    src = tmp_path / "bad.yaml"
+    src.write_text("chords:\n"
+                   "  C:\n    shapes:\n      - [42, 30, 21, 12]\n      - [42, 20, 21, 12]\n"
+                   "  D: 5\n"
+                   "  E:\n    shapes:\n      - [42, 31, q]\n      - [42, 31, 20, 1300]\n")
+    with pytest.raises(LibraryError) as err:
+        load_library(src, use_cache=False)
+    found = [(i.chord, i.line) for i in err.value.issues]
+    assert found == [("C", 5), ("D", 6), ("E", 9), ("E", 10)]
+    assert "says string 2" in err.value.issues[0].message and "above 127" in err.value.issues[-1].message
+
+    # more than 9 strings: two digits for the string number
+    frets, errors = parse_shapes([["1003", "0912"] + ["x"] * 7 + ["01"]], 10, ShapeEncoding.for_strings(10))
+    assert not errors and frets[0, :2].tolist() == [3, 12] and frets[0, -1] == 0
+
+
+def test_included_files_merge_with_overrides(tmp_path, monkeypatch):
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "genres").mkdir()
+    (tmp_path / "base.yaml").write_text(
+        "chords:\n  C: {quality: major, shapes: [[42, 30, 21, 12]]}\n  Am: {quality: minor, shapes: [[42, 32, 21, 12]]}\n")
+    (tmp_path / "genres" / "choro.yaml").write_text(
+        "include: ../base.yaml\nchords:\n  E7: {quality: dominant7, shapes: [[42, 31, 20, 10], [42, 30, 21, 12]]}\n")
+    main = tmp_path / "main.yaml"
+    main.write_text("include: [base.yaml, genres/]\n"
+                    "chords:\n  C: {quality: major, shapes: [[45, 35, 24, 15]]}\n"
+                    "sets:\n  samba: {include: [C, Am, E7]}\n")
+
+    lib = load_library(main)
+    assert list(lib.shapes_by_name) == ["C", "Am", "E7"]
+    assert lib.shapes_by_name["C"][0].frets == (5, 5, 4, 5)          # the including file wins
+    assert lib.sets["samba"]["include"] == ["C", "Am", "E7"]
+    # identical shapes are shared, not duplicated per chord view
+    assert lib.shapes_by_name["Am"][0] is lib.shapes_by_name["Am"][0]
+
+    # a new file in an included directory invalidates the snapshot
+    (tmp_path / "genres" / "more.yaml").write_text("chords:\n  G: {shapes: [[45, 34, 23, 15]]}\n")
+    assert "G" in load_library(main).shapes_by_name
+    # several roots: later ones override earlier ones
+    both = load_library([tmp_path / "base.yaml", main], use_cache=False)
+    assert both.shapes_by_name["C"][0].frets == (5, 5, 4, 5)
+
+
+def test_merged_files_must_share_the_shape_encoding(tmp_path):
+    import pytest
+    (tmp_path / "a.yaml").write_text("chords:\n  C: {shapes: [[42, 30, 21, 12]]}\n")
+    (tmp_path / "b.yaml").write_text("string_digits: 2\nchords:\n  D: {shapes: ['04 03 02 04']}\n")
+    (tmp_path / "c.yaml").write_text("string_digits: 1\nmax_fret: 12\nchords:\n  Am: {shapes: [[42, 32, 21, 12]]}\n")
+    (tmp_path / "d.yaml").write_text("max_fret: 10\n")
+    with pytest.raises(ValueError, match="string_digits 2 differs from 1 in a.yaml"):
+        load_library([tmp_path / "a.yaml", tmp_path / "b.yaml"], use_cache=False)
+    assert "Am" in load_library([tmp_path / "a.yaml", tmp_path / "c.yaml"], use_cache=False).shapes_by_name
+    with pytest.raises(ValueError, match="max_fret 10 differs from 12"):
+        load_library([tmp_path / "c.yaml", tmp_path / "d.yaml"], use_cache=False)
@@ -0,0 +1,46 @@
+import itertools
+
+import numpy as np
+
+from cavacohero.theory.progression import (first_shapes, plan_variants, shape_cost, solve, transition_cost,
+                                           voiced_shapes, _rows)
+from cavacohero.theory.voicings import generate_store
+
+
+def _path_cost(rows, path, cyclic):
+    total = sum(shape_cost(rows[k])[v] for k, v in enumerate(path))
+    total += sum(transition_cost(rows[k - 1], rows[k])[path[k - 1], path[k]] for k in range(1, len(path)))
+    if cyclic:
+        total += transition_cost(rows[-1], rows[0])[path[-1], path[0]]
+    return total
+
+
+def test_solver_matches_brute_force():
+    store = generate_store(limit=3)
+    rng = np.random.default_rng(1)
+    for cyclic in (False, True):
+        for _ in range(5):
+            names = [store.names[i] for i in rng.integers(0, len(store), 5)]
+            rows = [_rows(store.shapes_by_name, n) for n in names]
+            best = min(itertools.product(*[range(len(r)) for r in rows]),
+                       key=lambda p: _path_cost(rows, p, cyclic))
+            plan, cost = solve(rows, cyclic=cyclic)
+            assert np.isclose(cost, _path_cost(rows, best, cyclic))
+            assert np.isclose(cost, _path_cost(rows, plan, cyclic))
+
+
+def test_plans_are_memoized_per_store_and_stay_near_the_hand():
+    store = generate_store(limit=None)
+    song = ["C", "Am", "F", "G"] * 50
+    plan = plan_variants(song, store.shapes_by_name)
+    assert plan_variants(song, store.shapes_by_name) is plan
+    assert len(plan) == len(song)
+
+    names = ["C", "Am", "F", "G"]
+    voiced = voiced_shapes(names, store.shapes_by_name)
+    rows = [_rows(store.shapes_by_name, n) for n in names]
+    chosen = tuple(voiced.variants[n] for n in names)
+    assert [voiced[n] for n in names] == [store.shapes_by_name[n][v] for n, v in zip(names, chosen)]
+    assert _path_cost(rows, chosen, True) < _path_cost(rows, (0, 0, 0, 0), True)
+    shuffled = first_shapes(names, store.shapes_by_name)       # no plan for an order not known yet
+    assert [shuffled[n] for n in names] == [store.shapes_by_name[n][0] for n in names]
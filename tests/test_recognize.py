@@ -0,0 +1,38 @@
+import wave
+
+import numpy as np
+
+from cavacohero.audio.recognize import Recognizer, library_templates, played
+from cavacohero.audio.wav import progression_shapes, write_wav
+from cavacohero.theory.voicings import generate_store
+
+
+def test_templates_follow_the_tuning_and_dedupe_equal_sounds():
+    store = generate_store(limit=3)
+    t = library_templates(store.shapes_by_name, store.tuning)
+    assert t.vectors.shape == (len(t.chord), 12)
+    assert np.allclose(np.linalg.norm(t.vectors, axis=1), 1.0)
+    assert len(np.unique(np.round(t.vectors, 4), axis=0)) == len(t.vectors)
+    c = t.vectors[t.chord == t.names.index("C")]
+    assert (c[:, [0, 4, 7]].min(axis=1) > c[:, [1, 3, 6, 8]].max(axis=1)).all()     # C E G, not the rest
+
+
+def test_recorded_progression_is_named_in_order(tmp_path):
+    store = generate_store(limit=3)
+    path = tmp_path / "take.wav"
+    write_wav(path, progression_shapes(["C", "Am", "F", "G"], store.shapes_by_name, loops=2),
+              store.tuning, period_s=2.0, ring_s=1.0)
+    recognizer = Recognizer(store.shapes_by_name, store.tuning)
+    batches = []
+    label = recognizer.label_frames
+    recognizer.label_frames = lambda frames: batches.append(len(frames)) or label(frames)
+    segments = recognizer.recognize(path)
+    # one chroma and template product per block of audio read, not one per frame
+    with wave.open(str(path)) as w:
+        assert len(batches) <= -(-w.getnframes() // (1 << 16))
+    assert min(batches[:-1]) > 1                       # every call labels a batch of frames
+    heard = [s for s in segments if s.name]
+    assert [s.name for s in heard] == ["C", "Am", "F", "G"] * 2
+    assert all(s.confidence > 0.9 for s in heard)
+    assert [round(s.start_s / 2) for s in heard] == list(range(8))   # each within a frame of its onset
+    assert 0.2 < played(segments, "Am") < 0.35         # a quarter of the chords, rings a bit longer
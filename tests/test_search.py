@@ -0,0 +1,42 @@
+import heapq
+import types
+
+from cavacohero.theory import search as search_module
+from cavacohero.theory.search import ChordSearch, chord_key, chord_search, resolve_names
+from cavacohero.theory.voicings import generate_store
+
+
+def test_aliases_enharmonics_and_typos_resolve_to_library_names():
+    store = generate_store(limit=1)
+    search = chord_search(store.shapes_by_name)
+    assert search is chord_search(store.shapes_by_name)          # one index per store
+    assert chord_key("Dbmin7") == chord_key("c#-7") == chord_key("C#m7")
+    assert chord_key("C6/9") == "0:6/9" and chord_key("C/E") == "0:/4"
+    for typed, name in [("Dbmin7", "C#m7"), ("A#", "Bb"), ("gsus", "Gsus4"), ("Fmaj", "F"),
+                        ("EM7", "Emaj7"), ("Em7", "Em7"), ("Amn7", "Am7"), ("Cdom7", "C7")]:
+        assert search.resolve(typed) == name, typed
+    names, missing = resolve_names(["C", "d-", "Xyz7", "Cmaj7x"], store.shapes_by_name)
+    assert names == ["C", "Dm", "Cmaj7"]
+    assert [typed for typed, _ in missing] == ["Xyz7"]
+
+
+def test_completion_prefers_the_typed_root_and_stays_fast(monkeypatch):
+    search = ChordSearch(generate_store(limit=1).names)
+    assert search.complete("F", limit=3) == ["F", "Fm", "Fdim"]
+    assert search.complete("Db", limit=2) == ["C#", "C#m"]
+    assert search.complete("c#-7", limit=2) == ["C#m7", "C#m7b5"]
+    assert search.complete("Fmaj") == ["Fmaj7", "Fmaj9"]
+
+    # the candidate lists are merged lazily: a completion reads a few ids, not every match
+    big = ChordSearch(f"{n}~{i}" for i in range(2000) for n in generate_store(limit=1).names[:25])
+    candidates, pulled = [], []
+
+    def merge(*lists):
+        candidates.append(sum(len(ids) for ids in lists))
+        for i in heapq.merge(*lists):
+            pulled.append(i)
+            yield i
+
+    monkeypatch.setattr(search_module, "heapq", types.SimpleNamespace(merge=merge))
+    assert big.complete("Ab", limit=8)[0].startswith("Ab")
+    assert candidates[0] > 1000 and len(pulled) < 4 * 8
@@ -0,0 +1,32 @@
+from cavacohero.theory.store import ChordStore
+from cavacohero.theory.library import Library
+from cavacohero.theory.select import select_chords
+
+
+def _lib(sets):
+    store = ChordStore.build(("D","G","B","D"), [
+        ("C", "major", ["triad"], [(2,0,1,2)]),
+        ("Cm", "minor", ["triad"], [(5,5,4,5)]),
+        ("C7", "major7", ["seventh"], [(2,3,1,2)]),
+        ("Dm7", "minor7", ["seventh"], [(3,2,1,3)]),
+    ])
+    return Library.from_store(store, sets)
+
+
+def test_select_set_algebra():
+    lib = _lib({
+        "dom": "tags: seventh AND NOT quality: minor7",
+        "mix": {"sets": ["dom"], "qualities": ["minor"], "exclude": ["Cm"]},
+    })
+    assert select_chords(*lib[1:], "dom") == ["C7"]
+    assert select_chords(*lib[1:], "mix") == ["C7"]
+    assert select_chords(*lib[1:], "tag: triad OR name: Dm7") == ["C", "Cm", "Dm7"]
+    assert select_chords(*lib[1:], ["Dm7", "nope", "C"]) == ["Dm7", "C"]
+
+
+def test_select_matches_plain_dicts():
+    lib = _lib({"s": {"tags": ["seventh"], "include": ["C"]}})
+    shapes = dict(lib.shapes_by_name)
+    meta = dict(lib.meta_by_name)
+    for sel in ("all", "major", "minor", "s", "NOT tag: triad"):
+        assert select_chords(*lib[1:], sel) == select_chords(shapes, meta, lib.sets, sel)
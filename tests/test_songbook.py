@@ -0,0 +1,36 @@
+import re
+
+from cavacohero.render.songbook import PageLayout, book_shapes, page_geometry, write_songbook
+from cavacohero.theory.tabs import TabShape
+from cavacohero.theory.voicings import generate_store
+
+TUNING = ("D", "G", "B", "D")
+
+
+def test_page_geometry_batches_every_diagram():
+    shapes = [TabShape("C", (2, 0, 1, 2)), TabShape("C#", ("x", 6, 6, 6)), TabShape("G", (0, 0, 0, 0))]
+    geo = page_geometry(shapes, "zoom", TUNING, cols=2)
+    # per diagram: 4 strings + one line per fret of its 5-fret window (the nut when it starts at 0)
+    assert len(geo["segments"]) == len(geo["widths"]) == 3 * (4 + 5)
+    assert (geo["widths"] == 3).sum() == 2                  # C and G start at the nut
+    assert len(geo["dots"]) == 3 + 3 and len(geo["mutes"]) == 1
+    cw, ch = geo["cell"]
+    assert geo["dots"][:, 0].max() < 2 * cw and geo["dots"][:, 1].min() > -2 * ch    # inside a 2x2 grid
+
+
+def test_songbook_pdf_has_few_artists_per_page(tmp_path):
+    store = generate_store(limit=4)
+    names = store.names
+    out = tmp_path / "book.pdf"
+    layout = PageLayout(cols=10, rows=8)
+    shapes = list(book_shapes(names, store.shapes_by_name, all_variants=True))
+    assert shapes[0].name == "C (1)"
+    summary = write_songbook(out, iter(shapes), layout=layout, title="all", total=len(shapes))
+    assert summary.chords == len(shapes) and summary.pages == -(-len(shapes) // 80)
+    assert summary.artists <= 4                             # whatever the page holds
+    assert len(re.findall(rb"/Type /Page\b", out.read_bytes())) == summary.pages
+
+    summary = write_songbook(tmp_path / "sheet.png", book_shapes(names[:3], store.shapes_by_name),
+                             mode="full", layout=PageLayout(cols=2, rows=1))
+    assert summary.pages == 2
+    assert sorted(p.name for p in tmp_path.glob("sheet-*.png")) == ["sheet-001.png", "sheet-002.png"]
@@ -0,0 +1,43 @@
+"""
+Startup budget for the cavacohero entry point, measured with -X importtime.
+Non-drawing commands must not import matplotlib or tkinter at all.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_MS = float(os.environ.get("CAVACOHERO_STARTUP_BUDGET_MS", "400"))
+HEAVY = ("matplotlib", "tkinter", "_tkinter", "PIL")
+
+
+def importtime(*args):
+    """Run python -X importtime; returns {module: cumulative_us}."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args],
+                          capture_output=True, text=True, cwd=ROOT, timeout=120)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return proc, times
+
+
+def test_entry_point_import_budget():
+    _, times = importtime("-c", "import cavacohero.app")
+    assert not [m for m in times if m.split(".")[0] in HEAVY]
+    ms = times["cavacohero.app"] / 1000
+    slowest = sorted(((t, m) for m, t in times.items() if m.startswith("cavacohero")), reverse=True)[:5]
+    assert ms < BUDGET_MS, f"import cavacohero.app took {ms:.0f} ms (budget {BUDGET_MS:.0f}): {slowest}"
+
+
+@pytest.mark.parametrize("command", [["list"], ["validate"], ["export", "{tmp}", "--plan"]])
+def test_non_drawing_commands_stay_light(command, tmp_path):
+    command = [c.format(tmp=tmp_path) for c in command]
+    proc, times = importtime("-m", "cavacohero", "--no-cache", *command)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert not [m for m in times if m.split(".")[0] in HEAVY]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from cavacohero import timing
+
+
+@pytest.fixture(autouse=True)
+def _off():
+    yield
+    timing.disable()
+    timing.reset()
+
+
+def test_disabled_records_nothing():
+    @timing.timed("work")
+    def work(x):
+        return x + 1
+
+    assert not timing.enabled()
+    assert timing.span("a") is timing.span("b")          # the shared no-op
+    with timing.span("a"):
+        pass
+    timing.count("hits")
+    assert work(1) == 2
+    assert timing.events() == [] and timing.counters() == {}
+    assert timing.summary() == []
+
+
+def test_profile_session_writes_trace_and_summary(tmp_path, monkeypatch):
+    from cavacohero.app import main
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    lib = tmp_path / "lib.yaml"
+    lib.write_text("chords:\n  C: {quality: major, shapes: [[42, 30, 21, 12]]}\n"
+                   "  Am: {quality: minor, shapes: [[42, 32, 21, 12]]}\n")
+    trace = tmp_path / "trace.json"
+    reports = []
+    with timing.session(trace, report=reports.append):
+        with pytest.raises(SystemExit) as done:
+            main(["--library", str(lib), "list"])
+        assert done.value.code in (None, 0)
+        for i in range(10):
+            with timing.span("step", i=i):
+                timing.count("steps")
+
+    rows = {r["name"]: r for r in timing.summary()}
+    assert rows["step"]["count"] == 10
+    assert rows["step"]["p50_ms"] <= rows["step"]["p99_ms"] <= rows["step"]["max_ms"]
+    assert "load_library" in rows and "select_chords" in rows
+    assert "steps: 10" in reports[0] and str(trace) in reports[1]
+
+    doc = json.loads(trace.read_text())
+    phases = {e["ph"] for e in doc["traceEvents"]}
+    assert phases == {"M", "X", "C"}
+    steps = [e for e in doc["traceEvents"] if e["name"] == "step"]
+    assert steps[3]["args"] == {"i": "3"} and all(e["dur"] >= 0 for e in steps)
+    assert not timing.enabled()
+
+
+def test_profile_flag_leaves_the_subcommand_alone(tmp_path, monkeypatch, capsys):
+    from cavacohero.app import build_parser, main
+    args = build_parser().parse_args(["--profile", "list"])
+    assert args.profile and args.command == "list"
+    assert str(args.profile_out) == "cavacohero-trace.json"
+
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    lib = tmp_path / "lib.yaml"
+    lib.write_text("chords:\n  C: {quality: major, shapes: [[42, 30, 21, 12]]}\n")
+    trace = tmp_path / "out" / "t.json"
+    with pytest.raises(SystemExit):
+        main(["--library", str(lib), "--profile", "--profile-out", str(trace), "list"])
+    out = capsys.readouterr().out
+    assert "C" in out and "load_library" in out
+    assert json.loads(trace.read_text())["traceEvents"]
@@ -0,0 +1,57 @@
+import numpy as np
+import yaml
+
+from cavacohero.theory.library import load_library, parse_library, reload_library
+from cavacohero.theory.select import select_chords
+from cavacohero.theory.transpose import transposed_name
+
+DOC = """
+tuning: [D, G, B, D]
+movable: true
+chords:
+  C:
+    quality: major
+    tags: [triad]
+    shapes: [[42, 30, 21, 12], [45, 35, 25, 15]]
+  Am7:
+    quality: minor7
+    tags: [seventh]
+    shapes: [[42, x, 21, 11]]
+  Db:
+    quality: major
+    movable: false
+    shapes: [[43, 31, 22, 13]]
+"""
+
+
+def test_movable_chords_derive_every_key_lazily():
+    lib = parse_library(yaml.safe_load(DOC))
+    store = lib.store
+    assert len(store) == 3 + 10 + 11               # C# comes from the library ('Db'), not from C
+    assert "C#" not in store and "F#m7" in store and store.materialized == 0
+
+    assert select_chords(*lib[1:], "tag: seventh")[:3] == ["Abm7", "Am7", "Bbm7"]
+    assert lib.meta_by_name["Ebm7"] == {"quality": "minor7", "tags": frozenset({"seventh"})}
+    assert store.materialized == 0                  # selection needs no shapes
+
+    assert [s.frets for s in lib.shapes_by_name["D"]] == [(4, 2, 3, 4), (7, 7, 7, 7)]
+    assert [s.frets for s in lib.shapes_by_name["B"]] == [(4, 4, 4, 4), (13, 11, 12, 13)]
+    assert lib.shapes_by_name["Bm7"][0].frets == (4, "x", 3, 3)      # mutes stay muted
+    assert store.materialized == 3
+    assert store.frets.max() <= store.max_fret and len(store.frets) == store.variant_counts().sum()
+
+    assert transposed_name("C/E", 1) == "C#/F" and transposed_name("C6/9", 2) == "D6/9"
+
+
+def test_snapshot_and_reload_keep_movable_chords(tmp_path, monkeypatch):
+    monkeypatch.setenv("CAVACOHERO_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "lib.yaml"
+    path.write_text(DOC)
+    load_library(path)
+    lib = load_library(path)                         # from the snapshot
+    assert len(lib.store) == 24 and np.array_equal(lib.store.base.frets[:2], [[2, 0, 1, 2], [5, 5, 5, 5]])
+
+    path.write_text(DOC.replace("[42, x, 21, 11]", "[42, 30, 21, 11]"))
+    new, diff = reload_library(path, lib)
+    assert "Am7" in diff.changed and "Bm7" in diff.changed and "D" not in diff.changed
+    assert new.shapes_by_name["Bm7"][0].frets == (4, 2, 3, 3)
@@ -0,0 +1,173 @@
+from matplotlib.figure import Figure
+from cavacohero.theory.tabs import TabShape
+from cavacohero.render.view import FretboardView
+
+
+def test_view_updates_in_place():
+    ax = Figure().add_subplot(111)
+    view = FretboardView(ax)
+    assert view.update(TabShape("C", (2, 0, 1, 2))) is True
+    n_artists = len(ax.get_children())
+
+    # same zoom window -> no relayout, same artists
+    assert view.update(TabShape("E", (2, 1, 0, 2))) is False
+    assert len(ax.get_children()) == n_artists
+    assert view._dots.get_offsets().tolist() == [[0, 1.5], [1, 0.5], [3, 1.5]]
+
+    assert view.update(TabShape("G", (5, 4, 3, "x"))) is True
+    assert view._mutes[3].get_visible()
+    assert view.update(TabShape("G", (5, 4, 3, 5)), mode="full") is True
+    assert ax.get_ylim() == (15.5, -0.5)
+
+
+def test_raster_cache_hits_and_budget():
+    from cavacohero.render import draw
+    from cavacohero.render.raster import RasterCache
+    cache = RasterCache(max_bytes=10**9)
+    c = TabShape("C", (2, 0, 1, 2))
+    img = draw(c, cache=cache)
+    assert img.ndim == 3 and img.shape[2] == 4
+    assert draw(c, cache=cache) is img
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.resize(img.nbytes)          # room for exactly one image
+    draw(TabShape("D", (4, 2, 3, 4)), cache=cache)
+    assert len(cache) == 1 and cache.evictions == 1
+
+
+def test_ansi_screen_rewrites_only_changed_cells():
+    import io
+    from cavacohero.render import draw
+    from cavacohero.render.ansi import AnsiScreen, board_cells
+
+    text = draw(TabShape("G", (5, 4, 3, "x")), backend="ansi")
+    assert text.splitlines()[2].strip() == "X" and text.count("●") == 3
+
+    out = io.StringIO()
+    screen = AnsiScreen(out, color=False)
+    first = screen.show(board_cells(TabShape("C", (2, 0, 1, 2))))
+    second = screen.show(board_cells(TabShape("E", (2, 1, 0, 2))))   # same window, two dots move
+    assert 0 < second < first / 5
+    assert screen.show(board_cells(TabShape("E", (2, 1, 0, 2)))) == 0
+
+
+def test_svg_backend_fills_cached_template():
+    import xml.etree.ElementTree as ET
+    from cavacohero.render import draw
+    from cavacohero.render.svg import template
+
+    template.cache_clear()
+    root = ET.fromstring(draw(TabShape("G", (5, 4, 3, "x")), backend="svg"))
+    ns = "{http://www.w3.org/2000/svg}"
+    assert len(root.findall(f"{ns}g/{ns}circle")) == 3
+    texts = [t.text for t in root.iter(f"{ns}text")]
+    assert texts.count("X") == 1 and "G" in texts and "6" in texts
+
+    draw(TabShape("C", (5, 3, 4, 3)), backend="svg")      # same (tuning, window, mode)
+    assert template.cache_info().hits == 1
+
+
+def test_frame_worker_drops_frames_it_cannot_keep_up_with():
+    import threading
+    import time
+    from cavacohero.render.worker import FrameWorker
+    gate = threading.Event()
+    rendered = []
+
+    def render(job):
+        gate.wait()
+        rendered.append(job)
+        return job * 10
+
+    worker = FrameWorker(render)
+    try:
+        worker.submit(1)                 # picked up, blocks on the gate
+        while worker._job is not None:
+            time.sleep(0.001)
+        worker.submit(2)
+        worker.submit(3)                 # replaces 2 before it started
+        gate.set()
+        frames = []
+        while worker.pending:
+            frame = worker.take()
+            if frame is not None:
+                frames.append(frame)
+            time.sleep(0.001)
+        frame = worker.take()
+        if frame is not None:
+            frames.append(frame)
+        assert 2 not in rendered and rendered[-1] == 3
+        assert frames[-1].rgba == 30 and frames[-1].seq == worker.latest
+        assert worker.dropped >= 1 and worker.stats()["render_ms"] >= 0
+    finally:
+        worker.close()
+
+
+def test_frame_worker_hands_back_failed_jobs():
+    import time
+    from cavacohero.render.worker import FrameWorker
+
+    def render(job):
+        if job == "bad":
+            raise ValueError("no such shape")
+        return job
+
+    worker = FrameWorker(render)
+    try:
+        frames = []
+        for job in ("bad", "ok"):
+            seq = worker.submit(job)
+            while worker.pending or not frames or frames[-1].seq != seq:
+                frame = worker.take()
+                if frame is not None:
+                    frames.append(frame)
+                time.sleep(0.001)
+        failed, ok = frames
+        assert failed.job == "bad" and failed.rgba is None and isinstance(failed.error, ValueError)
+        assert ok.rgba == "ok" and ok.error is None
+        assert worker.errors == 1 and not worker.pending
+    finally:
+        worker.close()
+
+
+def test_twin_render_matches_the_on_screen_view():
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from cavacohero.render.raster import RasterCache, present_rgba, render_twin, view_geometry
+    fig = Figure(figsize=(3, 4), dpi=50)
+    FigureCanvasAgg(fig)
+    view = FretboardView(fig.add_subplot(111))
+    shape = TabShape("G", (5, 4, 3, "x"))
+    view.show(shape)
+    on_screen = np.asarray(fig.canvas.buffer_rgba()).copy()
+
+    cache = RasterCache(10**8)
+    frame = render_twin(shape, view_geometry(view), cache)
+    assert np.array_equal(frame, on_screen)
+    assert render_twin(shape, view_geometry(view), cache) is frame      # second time from the cache
+    view.show(TabShape("C", (2, 0, 1, 2)))
+    assert present_rgba(fig.canvas, frame) and np.array_equal(np.asarray(fig.canvas.buffer_rgba()), on_screen)
+
+    from cavacohero.render.raster import twin_view
+    twin = twin_view(view_geometry(view))
+    assert twin_view(view_geometry(view)) is twin
+    fig.set_size_inches(4, 5)                                          # a resize replaces the twin
+    resized = twin_view(view_geometry(view))
+    assert resized is not twin and not twin.fig.axes and resized.fig.get_size_inches().tolist() == [4, 5]
+
+
+def test_cache_hit_keeps_the_view_on_the_shown_chord():
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from cavacohero.render.raster import RasterCache, show_cached
+    fig = Figure(figsize=(3, 4), dpi=50)
+    FigureCanvasAgg(fig)
+    view = FretboardView(fig.add_subplot(111), blit=True)
+    cache = RasterCache(10**8)
+    c, g = TabShape("C", (2, 0, 1, 2)), TabShape("G", (5, 4, 3, "x"))
+    assert not show_cached(view, c, cache) and not show_cached(view, g, cache)
+    assert show_cached(view, c, cache)
+    hit = np.asarray(fig.canvas.buffer_rgba()).copy()
+    fig.canvas.draw()                                 # a resize or expose redraws from the artists
+    assert view.ax.get_title() == "C"
+    assert np.array_equal(np.asarray(fig.canvas.buffer_rgba()), hit)
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from cavacohero.instrument.cavaco import CAVACO
+from cavacohero.theory.library import load_library
+from cavacohero.theory.notes import pitch_class, split_note
+from cavacohero.theory.voicings import FORMULAS, voicings, generate_store
+
+LIB = Path(__file__).resolve().parents[1] / "presets" / "chords.yaml"
+
+
+def test_voicings_cover_the_hand_written_library():
+    lib = load_library(LIB, use_cache=False)
+    for name, meta in lib.meta_by_name.items():
+        if meta["quality"] not in ("major", "minor"):
+            continue
+        root, _ = split_note(name)
+        generated = {s.frets for s in voicings(root, meta["quality"])}
+        for shape in lib.shapes_by_name[name]:
+            assert shape.frets in generated, name
+
+    best = voicings("C", "major", limit=3)
+    assert best[0].frets == (2, 0, 1, 2) and best[0].name == "C"
+
+
+def test_voicings_sound_only_chord_tones():
+    open_pc = [pitch_class(n) for n in CAVACO.tuning]
+    for shape in voicings("Bb", "dominant9"):
+        pcs = {(open_pc[s] + f) % 12 for s, f in enumerate(shape.frets) if f != "x"}
+        chord = {(10 + i) % 12 for i in FORMULAS["dominant9"].intervals}
+        assert pcs <= chord and {10, 2, 8, 0} <= pcs      # root, third, seventh, ninth
+
+
+def test_full_library_generation():
+    store = generate_store(limit=4)
+    assert len(store) == 12 * len(FORMULAS)
+    assert "F#m7" in store and store.variant_counts().max() == 4
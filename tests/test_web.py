@@ -0,0 +1,41 @@
+import asyncio
+from pathlib import Path
+
+from cavacohero.theory.library import load_library
+from cavacohero.web.server import DiagramService, start_server
+from cavacohero.web.loadtest import _request
+
+LIB = Path(__file__).resolve().parents[1] / "presets" / "chords.yaml"
+
+
+def test_serve_etags_and_response_cache():
+    service = DiagramService(load_library(LIB, use_cache=False), workers=1)
+
+    async def scenario():
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            status, headers, body = await _request(reader, writer, "x", "/chord/G7.svg?mode=full")
+            assert status == 200 and headers["content-type"] == "image/svg+xml" and body.startswith(b"<svg")
+            etag = headers["etag"]
+            # keep-alive: same connection, now revalidating
+            status, headers, body = await _request(reader, writer, "x", "/chord/G7.svg?mode=full", etag)
+            assert (status, body, headers["etag"]) == (304, b"", etag)
+
+            status, _, body = await _request(reader, writer, "x", "/chord/G7.png")
+            assert status == 200 and body.startswith(b"\x89PNG")
+            status, _, body = await _request(reader, writer, "x", "/select?q=tag:%20seventh")
+            assert status == 200 and b'"G7"' in body
+            status, _, _ = await _request(reader, writer, "x", "/chord/Nope.svg")
+            assert status == 404
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        service.close()
+    assert service.cache.hits == 1          # the revalidation was served from memory